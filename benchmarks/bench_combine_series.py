@@ -0,0 +1,76 @@
+"""Benchmark Interval._combine_series on synthetic channels with many disconnects.
+
+Builds a set of noisy channels whose combined index has up to 1e6 rows and 1e4 disconnect (NaN) events, then times
+the merge at several sizes to show that the run time grows linearly with the number of rows.  The original loop
+implementation, which re-scans the frame for every NaN, is timed at the smaller sizes for comparison.
+
+Usage::
+
+    python -m benchmarks.bench_combine_series [--rows 1000000] [--disconnects 10000] [--channels 4]
+"""
+import argparse
+import time
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from jlab_archiver_client.interval import Interval
+
+
+def make_series(rows: int, disconnects: int, channels: int, seed: int = 0) -> List[pd.Series]:
+    """Create channels that together have roughly rows events and disconnects NaNs."""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2019-08-01T00:00:00", "ms")
+    out = []
+    for i in range(channels):
+        n = rows // channels
+        offsets = np.sort(rng.choice(30 * 86_400_000, size=n, replace=False))
+        values = rng.normal(size=n)
+        values[rng.choice(n, size=max(disconnects // channels, 1), replace=False)] = np.nan
+        out.append(pd.Series(values, index=pd.DatetimeIndex(start + offsets), name=f"channel{i}"))
+    return out
+
+
+def combine_series_loop(series: List[pd.Series]) -> pd.DataFrame:
+    """The original per-NaN implementation of Interval._combine_series, kept for comparison."""
+    df = pd.concat(series, axis=1).sort_index().ffill()
+    for s in series:
+        nan_mask = s.isnull()
+        if sum(nan_mask) > 0:
+            next_ts = s.index.to_series().shift(-1)
+            for idx, is_true in nan_mask.items():
+                if is_true:
+                    if next_ts[idx] is pd.NaT:
+                        df.loc[df.index >= idx, s.name] = np.nan
+                    else:
+                        df.loc[(df.index >= idx) & (df.index < next_ts[idx]), s.name] = np.nan
+    return df
+
+
+def _time(func, series) -> float:
+    start = time.perf_counter()
+    func(series)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Total events at the largest size")
+    parser.add_argument("--disconnects", type=int, default=10_000, help="Total NaNs at the largest size")
+    parser.add_argument("--channels", type=int, default=4, help="Number of channels to combine")
+    parser.add_argument("--loop-max-rows", type=int, default=100_000,
+                        help="Largest size at which to also time the original loop implementation")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'nans':>8} {'vectorized (s)':>15} {'us/row':>8} {'loop (s)':>10}")
+    for scale in (0.01, 0.1, 1.0):
+        rows, disconnects = int(args.rows * scale), int(args.disconnects * scale)
+        series = make_series(rows, disconnects, args.channels)
+        vectorized = _time(Interval._combine_series, series)
+        loop = f"{_time(combine_series_loop, series):10.3f}" if rows <= args.loop_max_rows else f"{'-':>10}"
+        print(f"{rows:>10} {disconnects:>8} {vectorized:15.3f} {1e6 * vectorized / rows:8.3f} {loop}")
+
+
+if __name__ == "__main__":
+    main()
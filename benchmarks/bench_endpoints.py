@@ -0,0 +1,213 @@
+"""Benchmark every endpoint class against the stand-in myquery server.
+
+For each endpoint class the suite reports the size of the response body, on the wire and after decoding any content
+encoding, and four measurements:
+
+    * end-to-end: the time for run(), including the request, parsing and conversion
+    * parse: the time to decode a response body that was already received
+    * convert: the time to turn decoded content into the results fields of the endpoint class
+    * peak: the peak memory allocated during run(), measured with tracemalloc
+
+Times are the best of --repeat runs.  Interval and Point are run once for each datatype, MySampler queries --channels
+channels that cycle through the datatypes and MyStats queries the float channels among them.  Results can be saved with
+--save and compared against a saved baseline with --baseline, in which case the exit status is 1 if any measurement is
+slower or larger than the baseline by more than --tolerance.  --decoder selects the JSON decoder (see
+jlab_archiver_client.decoding), so the decoders can be compared by saving the results of one and using them as the
+baseline of another.  --compression makes the server compress responses, which the transport decodes as they are
+read.
+
+Usage::
+
+    python -m benchmarks.bench_endpoints [--events 100000] [--channels 10] [--datatype DBR_DOUBLE ...]
+                                         [--datasize 1] [--disconnect-rate 0.001] [--latency 0] [--repeat 5]
+                                         [--compression gzip ...] [--decoder auto] [--save results.json]
+                                         [--baseline results.json] [--tolerance 0.25]
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple
+
+from benchmarks.server import StandInServer, SyntheticData
+from jlab_archiver_client import decoding
+from jlab_archiver_client import (Channel, ChannelQuery, Interval, IntervalQuery, MySampler, MySamplerQuery, MyStats,
+                                  MyStatsQuery, Point, PointQuery)
+from jlab_archiver_client.config import config
+from jlab_archiver_client.interval import _CHUNK_SIZE
+from jlab_archiver_client.streaming import IntervalStreamParser
+from jlab_archiver_client.transport import Transport
+
+METRICS = ("end_to_end", "parse", "convert", "peak")
+
+# Differences smaller than these are noise for even the smallest responses
+MIN_DELTA = {"end_to_end": 0.001, "parse": 0.001, "convert": 0.001, "peak": 2 ** 16}
+
+
+class Case(NamedTuple):
+    """An endpoint object factory with the parse and convert steps of its run method"""
+    name: str
+    make: Callable[[], Any]
+    parse: Callable[[bytes, Any], Any]
+    convert: Callable[[Any, Any], None]
+
+
+def _parse_json(body: bytes, endpoint: Any) -> Any:
+    return decoding.loads(body)
+
+
+def _convert_json(endpoint: Any, content: Any) -> None:
+    endpoint._process_response(content)
+
+
+def _parse_interval(body: bytes, endpoint: Interval) -> IntervalStreamParser:
+    parser = IntervalStreamParser(enums_as_strings=endpoint.query.enums_as_strings)
+    for i in range(0, len(body), _CHUNK_SIZE):
+        parser.feed(body[i:i + _CHUNK_SIZE])
+    parser.close()
+    return parser
+
+
+def _convert_interval(endpoint: Interval, parser: IntervalStreamParser) -> None:
+    endpoint._set_results(parser.values.to_array(), parser.ts.to_array(), parser.disconnect_values,
+                          parser.disconnect_ts, parser.metadata)
+
+
+def make_cases(args: argparse.Namespace, transport: Transport) -> List[Case]:
+    """Create the benchmark cases for the command line options."""
+    begin = datetime(2019, 8, 12)
+    end = begin + timedelta(days=1)
+    pvlist = [f"channel{i}" for i in range(args.channels)]
+    step = max(86_400_000 // args.events, 1)
+
+    cases = []
+    for i, datatype in enumerate(args.datatype):
+        channel = f"channel{i}"
+        cases.append(Case(f"Interval[{datatype}]",
+                          lambda c=channel: Interval(IntervalQuery(c, begin, end), transport=transport),
+                          _parse_interval, _convert_interval))
+        cases.append(Case(f"Point[{datatype}]",
+                          lambda c=channel: Point(PointQuery(c, begin), transport=transport),
+                          _parse_json, _convert_json))
+    cases.extend([
+        Case("MySampler",
+             lambda: MySampler(MySamplerQuery(begin, interval=step, num_samples=args.events, pvlist=pvlist),
+                               transport=transport),
+             _parse_json, _convert_json),
+        Case("Channel", lambda: Channel(ChannelQuery("channel%"), transport=transport), _parse_json, _convert_json),
+    ])
+
+    # mystats only supports scalar float channels
+    floats = [pv for i, pv in enumerate(pvlist) if args.datatype[i % len(args.datatype)] in ("DBR_DOUBLE", "DBR_FLOAT")]
+    if len(floats) > 0 and args.datasize == 1:
+        cases.append(Case("MyStats",
+                          lambda: MyStats(MyStatsQuery(floats, begin, end, num_bins=args.bins), transport=transport),
+                          _parse_json, _convert_json))
+    return cases
+
+
+def _best(func: Callable[[], float], repeat: int) -> float:
+    return min(func() for _ in range(repeat))
+
+
+def measure(case: Case, transport: Transport, repeat: int) -> Dict[str, float]:
+    """Measure a benchmark case."""
+    endpoint = case.make()
+    body = transport.get(endpoint.url, params=endpoint.query.to_web_params()).content
+    wire = transport.transfers()[-1].wire_bytes
+
+    def end_to_end():
+        start = time.perf_counter()
+        case.make().run()
+        return time.perf_counter() - start
+
+    def parse():
+        start = time.perf_counter()
+        case.parse(body, endpoint)
+        return time.perf_counter() - start
+
+    def convert():
+        content = case.parse(body, endpoint)
+        start = time.perf_counter()
+        case.convert(case.make(), content)
+        return time.perf_counter() - start
+
+    end_to_end()  # Warm up the connection and the server's response cache
+    results = {'bytes': len(body), 'wire_bytes': wire, 'end_to_end': _best(end_to_end, repeat),
+               'parse': _best(parse, repeat), 'convert': _best(convert, repeat)}
+
+    tracemalloc.start()
+    case.make().run()
+    results['peak'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float) -> List[str]:
+    """Return a description of every measurement that regressed by more than the tolerance and the noise floor."""
+    regressions = []
+    for name, result in results.items():
+        for metric in METRICS:
+            if name not in baseline or metric not in baseline[name]:
+                continue
+            base = baseline[name][metric]
+            if base > 0 and result[metric] > base * (1 + tolerance) and result[metric] - base > MIN_DELTA[metric]:
+                regressions.append(f"{name} {metric}: {result[metric]:.4g} vs {base:.4g} "
+                                   f"(+{result[metric] / base - 1:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100_000,
+                        help="Events per interval query and samples per channel of mysampler queries")
+    parser.add_argument("--channels", type=int, default=10, help="Channels per mysampler, mystats and channel query")
+    parser.add_argument("--bins", type=int, default=1000, help="Bins per mystats query")
+    parser.add_argument("--datatype", action="append", help="Datatype of the channels.  May be repeated.")
+    parser.add_argument("--datasize", type=int, default=1, help="Number of elements in each value")
+    parser.add_argument("--disconnect-rate", type=float, default=0.001, help="Fraction of events that are disconnects")
+    parser.add_argument("--compression", action="append", default=[], choices=["gzip", "deflate", "br"],
+                        help="Content encoding the server compresses responses with.  May be repeated.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the server waits before each response")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement.  The best is reported.")
+    parser.add_argument("--decoder", default="auto", choices=["auto"] + decoding.available_decoders(),
+                        help="JSON decoder used to parse responses")
+    parser.add_argument("--save", help="Save the results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare the results to a file saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed fractional regression")
+    args = parser.parse_args()
+    if args.datatype is None:
+        args.datatype = ["DBR_DOUBLE"]
+
+    data = SyntheticData(events=args.events, channels=args.channels, datatypes=args.datatype,
+                         datasize=args.datasize, disconnect_rate=args.disconnect_rate, latency=args.latency,
+                         compression=args.compression)
+    results = {}
+    with StandInServer(data) as server, Transport() as transport:
+        config.set(myquery_server=server.server, protocol="http", json_decoder=args.decoder)
+        print(f"{'endpoint':>22} {'body (MiB)':>10} {'wire (MiB)':>10} {'e2e (s)':>9} {'parse (s)':>9} "
+              f"{'convert (s)':>11} {'peak (MiB)':>10}")
+        for case in make_cases(args, transport):
+            r = measure(case, transport, args.repeat)
+            results[case.name] = r
+            print(f"{case.name:>22} {r['bytes'] / 2 ** 20:10.2f} {r['wire_bytes'] / 2 ** 20:10.2f} "
+                  f"{r['end_to_end']:9.4f} {r['parse']:9.4f} {r['convert']:11.4f} {r['peak'] / 2 ** 20:10.1f}")
+
+    if args.save is not None:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if len(regressions) > 0:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
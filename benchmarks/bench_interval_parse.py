@@ -0,0 +1,91 @@
+"""Benchmark parsing of large myquery interval responses.
+
+Builds a synthetic interval response body and compares the peak memory and run time of decoding it with json.loads
+into Python lists (the approach used by Interval._process_response) against the streaming IntervalStreamParser used by
+Interval.run.  Peak memory is measured with tracemalloc and excludes the response body itself.  Time to first row is
+the time until the first events are available, which is what Interval.iter_chunks can hand out before the rest of the
+response has arrived.
+
+Usage::
+
+    python -m benchmarks.bench_interval_parse [--events 1000000] [--chunk-size 262144]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from jlab_archiver_client.streaming import IntervalStreamParser
+
+# One event in this many is a disconnect
+_DISCONNECT_EVERY = 1000
+
+
+def make_body(events: int, seed: int = 0) -> bytes:
+    """Create an interval response body for a scalar double channel with occasional disconnects."""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2019-08-01T00:00:00", "ms")
+    stamps = (start + np.sort(rng.choice(30 * 86_400_000, size=events, replace=False))).astype(str)
+    data = []
+    for i, (stamp, v) in enumerate(zip(stamps, rng.normal(size=events))):
+        d = stamp.replace("T", " ")
+        disconnect = (i + 1) % _DISCONNECT_EVERY == 0
+        data.append({'d': d, 'x': True, 't': 'NETWORK_DISCONNECTION'} if disconnect else {'d': d, 'v': v})
+    return json.dumps({'datatype': 'DBR_DOUBLE', 'datasize': 1, 'datahost': 'mya', 'ioc': None, 'active': True,
+                       'sampled': False, 'data': data, 'returnCount': events}).encode()
+
+
+def parse_lists(body: bytes, chunk_size: int) -> float:
+    """Decode the whole body, then copy the events into lists.  Returns the time the first row was available."""
+    content = json.loads(body)
+    values, ts = [], []
+    for item in content['data']:
+        ts.append(item['d'])
+        values.append(None if 'x' in item else item['v'])
+    np.array(values, dtype=float)
+    return time.perf_counter()
+
+
+def parse_stream(body: bytes, chunk_size: int) -> float:
+    """Feed the body to the streaming parser in chunks, as Interval.run does.  Returns the time the first row was
+    available."""
+    parser = IntervalStreamParser()
+    first = None
+    for i in range(0, len(body), chunk_size):
+        parser.feed(body[i:i + chunk_size])
+        if first is None and parser.ts is not None and len(parser.ts) > 0:
+            first = time.perf_counter()
+    parser.close()
+    parser.values.to_array()
+    parser.ts.to_array()
+    return time.perf_counter() if first is None else first
+
+
+def _measure(func, body: bytes, chunk_size: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = func(body, chunk_size)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, first - start, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1_000_000, help="Number of events in the response")
+    parser.add_argument("--chunk-size", type=int, default=256 * 1024, help="Bytes fed to the parser at a time")
+    args = parser.parse_args()
+
+    body = make_body(args.events)
+    print(f"events={args.events} body={len(body) / 2 ** 20:.1f} MiB")
+    print(f"{'method':>8} {'time (s)':>9} {'first row (s)':>14} {'peak (MiB)':>11}")
+    for name, func in (("lists", parse_lists), ("stream", parse_stream)):
+        elapsed, first, peak = _measure(func, body, args.chunk_size)
+        print(f"{name:>8} {elapsed:9.3f} {first:14.4f} {peak / 2 ** 20:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark the JSON decoders available to the endpoint classes.
+
+Builds interval, mysampler and mystats response bodies with the stand-in server's synthetic data and decodes each with
+every decoder registered in jlab_archiver_client.decoding.  Bodies are decoded from bytes, as the endpoint classes do.
+
+Usage::
+
+    python -m benchmarks.bench_json_decode [--events 100000] [--channels 10] [--repeat 5]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+from benchmarks.server import SyntheticData
+from jlab_archiver_client import IntervalQuery, MySamplerQuery, MyStatsQuery, decoding
+from jlab_archiver_client.config import config
+
+
+def make_bodies(data: SyntheticData, events: int) -> dict:
+    """Build a response body for each endpoint that returns a large document."""
+    begin = datetime(2019, 8, 12)
+    end = begin + timedelta(days=1)
+    pvlist = [f"channel{i}" for i in range(data.channels)]
+    queries = {
+        "interval": (config.interval_path, IntervalQuery("channel0", begin, end)),
+        "mysampler": (config.mysampler_path, MySamplerQuery(begin, interval=max(86_400_000 // events, 1),
+                                                            num_samples=events, pvlist=pvlist)),
+        "mystats": (config.mystats_path, MyStatsQuery(pvlist, begin, end, num_bins=max(events // 100, 1))),
+    }
+    bodies = {}
+    for name, (path, query) in queries.items():
+        params = {k: v for k, v in query.to_web_params().items() if v is not None}
+        bodies[name] = data.body(path, urlencode(params))
+    return bodies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100_000,
+                        help="Events per interval query and samples per channel of mysampler queries")
+    parser.add_argument("--channels", type=int, default=10, help="Channels per mysampler and mystats query")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement.  The best is reported.")
+    args = parser.parse_args()
+
+    bodies = make_bodies(SyntheticData(events=args.events, channels=args.channels), args.events)
+    decoders = decoding.available_decoders()
+    print(f"{'body':>10} {'MiB':>7} " + " ".join(f"{name + ' (s)':>12}" for name in decoders))
+    for name, body in bodies.items():
+        times = []
+        for decoder in decoders:
+            loads = decoding.get_decoder(decoder)
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                loads(body)
+                best = min(best, time.perf_counter() - start)
+            times.append(best)
+        print(f"{name:>10} {len(body) / 2 ** 20:7.2f} " + " ".join(f"{t:12.4f}" for t in times))
+
+
+if __name__ == "__main__":
+    main()
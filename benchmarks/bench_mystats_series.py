@@ -0,0 +1,66 @@
+"""Benchmark the construction of the MyStats (timestamp, stat) Series.
+
+Builds mystats channel objects like those myquery returns and compares the original per-record loop (one
+pd.to_datetime call per bin and MultiIndex.from_tuples) against MyStats._channel_series, which parses every timestamp
+in one call and builds the index with MultiIndex.from_product.
+
+Usage::
+
+    python -m benchmarks.bench_mystats_series [--bins 20000] [--channels 100]
+"""
+import argparse
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from jlab_archiver_client import MyStats
+
+STATS = ("duration", "eventCount", "integration", "max", "mean", "min", "rms", "stdev", "updateCount")
+
+
+def make_channels(bins: int, channels: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Create mystats channel objects with one-minute bins."""
+    rng = np.random.default_rng(seed)
+    begins = pd.date_range("2019-08-12", periods=bins, freq="min").strftime("%Y-%m-%d %H:%M:%S")
+    out = []
+    for _ in range(channels):
+        values = np.round(rng.normal(50, 10, size=(bins, len(STATS))), 4).tolist()
+        out.append({"data": [dict(zip(STATS, row), begin=b) for b, row in zip(begins, values)]})
+    return out
+
+
+def channel_series_loop(channel_obj: Dict[str, Any]) -> pd.Series:
+    """The original per-record construction, kept for comparison."""
+    tuples, vals = [], []
+    metrics = sorted(key for key in channel_obj["data"][0].keys() if key != "begin")
+    for rec in channel_obj["data"]:
+        ts = pd.to_datetime(rec["begin"])
+        for m in metrics:
+            tuples.append((ts, m))
+            vals.append(rec.get(m))
+    idx = pd.MultiIndex.from_tuples(tuples, names=["timestamp", "stat"])
+    return pd.Series(vals, index=idx)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bins", type=int, default=20_000, help="Number of bins per channel")
+    parser.add_argument("--channels", type=int, default=100, help="Number of channels")
+    args = parser.parse_args()
+
+    channels = make_channels(args.bins, args.channels)
+    pd.testing.assert_series_equal(channel_series_loop(channels[0]), MyStats._channel_series(channels[0]))
+
+    print(f"bins={args.bins} channels={args.channels}")
+    print(f"{'method':>8} {'time (s)':>9}")
+    for name, func in (("loop", channel_series_loop), ("vector", MyStats._channel_series)):
+        start = time.perf_counter()
+        for channel in channels:
+            func(channel)
+        print(f"{name:>8} {time.perf_counter() - start:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
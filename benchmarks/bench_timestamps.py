@@ -0,0 +1,65 @@
+"""Benchmark the conversion of myquery timestamp strings to a DatetimeIndex.
+
+Formats timestamps the way myquery does for each frac_time_digits setting and converts them with pd.to_datetime using
+format inference (the original path), pd.to_datetime with the explicit format, and timestamps.to_datetime_index.
+Epoch millisecond timestamps (unix_timestamps_ms) are timed as well.
+
+Usage::
+
+    python -m benchmarks.bench_timestamps [--count 10000000] [--digits 0 --digits 3 --digits 6] [--repeat 3]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from jlab_archiver_client.timestamps import timestamp_format, to_datetime_index
+
+# strftime's %f always writes six digits
+_STRFTIME_DIGITS = 6
+
+
+def make_timestamps(count: int, digits: int) -> list:
+    """Create myquery timestamp strings with the given number of fractional digits, about 1.2 s apart."""
+    times = np.datetime64("2019-08-12T00:00:00", "ns") + np.arange(count) * np.timedelta64(1_234_567_891, "ns")
+    text = pd.DatetimeIndex(times).strftime(timestamp_format(digits))
+    return list(text) if digits == 0 else [t[:20 + digits] if digits <= _STRFTIME_DIGITS
+                                           else t + "0" * (digits - _STRFTIME_DIGITS) for t in text]
+
+
+def best_time(func, repeat: int) -> float:
+    """Get the fastest of several runs of func."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10_000_000, help="Timestamps per conversion")
+    parser.add_argument("--digits", type=int, action="append", help="frac_time_digits settings.  Default 0, 3 and 6.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement.  The best is reported.")
+    args = parser.parse_args()
+
+    print(f"count={args.count}")
+    print(f"{'timestamps':>12} {'infer (s)':>10} {'format (s)':>10} {'client (s)':>10} {'speedup':>8}")
+    for digits in args.digits or [0, 3, 6]:
+        ts = make_timestamps(args.count, digits)
+        exp = pd.to_datetime(ts)
+        assert to_datetime_index(ts).equals(exp)
+        infer = best_time(lambda: pd.to_datetime(ts), args.repeat)
+        explicit = best_time(lambda: pd.to_datetime(ts, format=timestamp_format(digits)), args.repeat)
+        client = best_time(lambda: to_datetime_index(ts), args.repeat)
+        print(f"{f'f={digits}':>12} {infer:10.3f} {explicit:10.3f} {client:10.3f} {infer / client:7.1f}x")
+
+    ms = list(range(1_565_582_400_000, 1_565_582_400_000 + args.count))
+    client = best_time(lambda: to_datetime_index(ms), args.repeat)
+    print(f"{'epoch ms':>12} {'':>10} {'':>10} {client:10.3f}")
+
+
+if __name__ == "__main__":
+    main()
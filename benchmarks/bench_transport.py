@@ -0,0 +1,56 @@
+"""Compare a fresh connection per query against the pooled Transport.
+
+Issues many small point and interval queries against the stand-in server, once with a module-level requests.get for
+every call (a new TCP connection each time) and once through a pooled Transport that keeps connections alive.
+
+Usage::
+
+    python -m benchmarks.bench_transport [-n 2000]
+"""
+import argparse
+import time
+from datetime import datetime
+
+import requests
+
+from benchmarks.server import StandInServer
+from jlab_archiver_client import Interval, IntervalQuery, Point, PointQuery
+from jlab_archiver_client.config import config
+from jlab_archiver_client.transport import Transport
+
+
+class _Unpooled(Transport):
+    """A transport that opens a new connection for every request, like the module-level requests.get"""
+
+    def get(self, url, params=None, stream=False):
+        r = requests.get(url, params=params, timeout=self.timeout, stream=stream)
+        r.raise_for_status()
+        return r
+
+
+def _time_queries(make_endpoint, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        make_endpoint().run()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--num-queries", type=int, default=2000, help="Queries per endpoint and transport")
+    args = parser.parse_args()
+
+    t = datetime(2019, 8, 12)
+    with StandInServer() as server:
+        config.set(myquery_server=server.server, protocol="http")
+        for label, transport in (("unpooled", _Unpooled()), ("pooled", Transport())):
+            with transport:
+                point = _time_queries(lambda: Point(PointQuery("channel1", t), transport=transport), args.num_queries)
+                interval = _time_queries(lambda: Interval(IntervalQuery("channel1", t, t), transport=transport),
+                                         args.num_queries)
+            print(f"{label:>9}: point {args.num_queries / point:8.0f} q/s  "
+                  f"interval {args.num_queries / interval:8.0f} q/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark the conversion of vector (waveform) channels.
+
+Builds rows of the kind myquery returns for a waveform channel (a list of strings per event) and compares the original
+per-row Series.apply conversion against the single-pass conversion into one 2D block used by
+utils.convert_data_to_series.  Peak memory is measured with tracemalloc and excludes the input rows.
+
+Usage::
+
+    python -m benchmarks.bench_vector_conversion [--rows 20000] [--width 1000]
+"""
+import argparse
+import time
+import tracemalloc
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from jlab_archiver_client import utils
+
+
+def make_rows(rows: int, width: int, seed: int = 0) -> List[List[str]]:
+    """Create waveform rows as lists of strings with six significant figures."""
+    rng = np.random.default_rng(seed)
+    return [[f"{v:.6g}" for v in rng.normal(size=width)] for _ in range(rows)]
+
+
+def convert_apply(values, ts):
+    """The original per-row conversion, kept for comparison."""
+    data = pd.Series(values, index=ts, name="channel")
+    return data.apply(lambda x: np.array(np.array(x), dtype=float))
+
+
+def convert_block(values, ts):
+    metadata = {'datatype': 'DBR_DOUBLE', 'datasize': len(values[0]), 'returnCount': len(values)}
+    return utils.convert_data_to_series(values, ts, "channel", metadata, False)
+
+
+def _measure(func, values, ts):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(values, ts)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000, help="Number of events")
+    parser.add_argument("--width", type=int, default=1000, help="Number of elements per event")
+    args = parser.parse_args()
+
+    values = make_rows(args.rows, args.width)
+    ts = pd.date_range("2019-08-12", periods=args.rows, freq="s")
+    print(f"rows={args.rows} width={args.width}")
+    print(f"{'method':>8} {'time (s)':>9} {'peak (MiB)':>11}")
+    for name, func in (("apply", convert_apply), ("block", convert_block)):
+        elapsed, peak = _measure(func, values, ts)
+        print(f"{name:>8} {elapsed:9.3f} {peak / 2 ** 20:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
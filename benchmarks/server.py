@@ -0,0 +1,322 @@
+"""A lightweight stand-in for the myquery web service used by the benchmarks.
+
+The server answers the interval, mysampler, mystats, point and channel endpoints with synthetic responses so that
+client overhead can be measured without the docker compose stack.  It speaks HTTP/1.1 so that clients can keep
+connections alive.
+
+The size and shape of the responses are controlled by a SyntheticData object: the number of events per interval query,
+the number of channels matched by channel queries, the datatypes and size of the channels, the fraction of events that
+are disconnects, an added latency per request and the content encodings the server may compress responses with.
+Responses are deterministic for a given request, so repeated runs of a benchmark see the same data.
+
+Example::
+
+    >>> from benchmarks.server import StandInServer, SyntheticData
+    >>> with StandInServer(SyntheticData(events=100_000, datatypes=("DBR_DOUBLE", "DBR_ENUM"))) as server:
+    ...     print(server.base_url)
+    http://127.0.0.1:54321
+"""
+import fnmatch
+import functools
+import gzip
+import json
+import re
+import threading
+import time
+import zlib
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+_FLOAT_TYPES = ("DBR_DOUBLE", "DBR_FLOAT")
+_INTEGER_TYPES = ("DBR_SHORT", "DBR_LONG", "DBR_CHAR")
+_ENUM_LABELS = ["OFF", "ON", "FAULT", "UNKNOWN"]
+_DISCONNECT = "NETWORK_DISCONNECTION"
+
+
+class SyntheticData:
+    """Generates myquery responses of a configurable size and shape."""
+
+    def __init__(self, events: int = 10, channels: int = 10, datatypes: Sequence[str] = ("DBR_DOUBLE",),
+                 datasize: int = 1, disconnect_rate: float = 0.0, latency: float = 0.0, seed: int = 0,
+                 compression: Sequence[str] = ()):
+        """Construct a SyntheticData object.
+
+        Args:
+            events: The number of events returned by an interval query
+            channels: The number of channels known to the server, which is the most a channel query can match
+            datatypes: The datatypes of the channels.  Channel "channelN" has datatype datatypes[N % len(datatypes)].
+            datasize: The number of elements in each value.  Values of channels with a datasize above one are
+                      returned as lists of strings like myquery does for waveforms.
+            disconnect_rate: The fraction of events that are disconnects
+            latency: Seconds to wait before answering each request
+            seed: Seed mixed into the random values of every response
+            compression: Content encodings (gzip, deflate, br) in order of preference.  A response is compressed with
+                         the first one the client accepts.
+        """
+        self.events = events
+        self.channels = channels
+        self.datatypes = tuple(datatypes)
+        self.datasize = datasize
+        self.disconnect_rate = disconnect_rate
+        self.latency = latency
+        self.seed = seed
+        self.compression = tuple(compression)
+
+        # Building large bodies is slow and would dominate the end-to-end times of the client, so keep recent ones
+        self.body = functools.lru_cache(maxsize=32)(self._body)
+        self.encoded = functools.lru_cache(maxsize=32)(self._encoded)
+
+    def datatype(self, channel: str) -> str:
+        """Return the datatype of a channel."""
+        match = re.search(r"(\d+)$", channel)
+        index = int(match.group(1)) if match else zlib.crc32(channel.encode())
+        return self.datatypes[index % len(self.datatypes)]
+
+    def metadata(self, channel: str) -> Dict[str, Any]:
+        """Return the channel metadata myquery includes with each channel."""
+        return {"name": channel, "datatype": self.datatype(channel), "datasize": self.datasize, "datahost": "mya",
+                "ioc": None, "active": True}
+
+    def _body(self, path: str, query: str) -> Optional[bytes]:
+        """Build the encoded response body for a request, or None if the path is not a myquery endpoint."""
+        route = _ROUTES.get(path)
+        if route is None:
+            return None
+        params = {k: v[0] for k, v in parse_qs(query, keep_blank_values=True).items()}
+        rng = np.random.default_rng([self.seed, zlib.crc32(f"{path}?{query}".encode())])
+        return json.dumps(route(self, params, rng)).encode()
+
+    def _encoded(self, path: str, query: str, accept_encoding: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """Build the response body compressed with the preferred encoding the client accepts, and that encoding."""
+        body = self.body(path, query)
+        accepted = {e.split(";")[0].strip() for e in accept_encoding.split(",")}
+        for encoding in self.compression:
+            if body is not None and encoding in accepted:
+                return _ENCODERS[encoding](body), encoding
+        return body, None
+
+    def _values(self, channel: str, n: int, rng: np.random.Generator, enums_as_strings: bool) -> List[Any]:
+        """Generate n values for a channel."""
+        datatype = self.datatype(channel)
+        shape = (n, self.datasize) if self.datasize > 1 else n
+        if datatype in _FLOAT_TYPES:
+            values = np.round(rng.normal(50, 10, size=shape), 4)
+        elif datatype in _INTEGER_TYPES:
+            values = rng.integers(0, 1000, size=shape)
+        elif datatype == "DBR_ENUM":
+            values = rng.integers(0, len(_ENUM_LABELS), size=shape)
+            if enums_as_strings:
+                values = np.array(_ENUM_LABELS)[values]
+        else:
+            values = np.char.add("state ", rng.integers(0, 100, size=shape).astype(str))
+
+        # myquery sends each element of a waveform as a string
+        return (values.astype(str) if self.datasize > 1 else values).tolist()
+
+    def _events(self, channel: str, times: np.ndarray, params: Dict[str, str], rng: np.random.Generator,
+                enums_as_strings: bool) -> List[Dict[str, Any]]:
+        """Generate the events for a channel at the given times (datetime64[us])."""
+        stamps = _format_times(times, params)
+        values = self._values(channel, len(stamps), rng, enums_as_strings)
+        disconnects = np.zeros(len(stamps), dtype=bool)
+        if self.disconnect_rate > 0 and 'd' not in params:
+            disconnects = rng.random(len(stamps)) < self.disconnect_rate
+        return [{"d": d, "x": True, "t": _DISCONNECT} if x else {"d": d, "v": v}
+                for d, v, x in zip(stamps, values, disconnects.tolist())]
+
+    def _labels(self, channel: str, times: np.ndarray, params: Dict[str, str]) -> Dict[str, Any]:
+        """Return the enum labels myquery includes for enum channels."""
+        if self.datatype(channel) != "DBR_ENUM" or len(times) == 0:
+            return {}
+        return {"labels": [{"d": _format_times(times[:1], params)[0], "value": _ENUM_LABELS}]}
+
+
+def _format_times(times: np.ndarray, params: Dict[str, str]) -> List[Any]:
+    """Format datetime64 values like myquery does for the frac_time_digits and unix_timestamps_ms options."""
+    if 'u' in params:
+        return times.astype("datetime64[ms]").astype(np.int64).tolist()
+    digits = int(params.get('f', 0) or 0)
+    unit = 's' if digits <= 0 else 'ms' if digits <= 3 else 'us'  # noqa: PLR2004
+    return np.char.replace(np.datetime_as_string(times, unit=unit), "T", " ").tolist()
+
+
+def _parse_time(value: str) -> np.datetime64:
+    return np.datetime64(datetime.fromisoformat(value.replace(" ", "T")), "us")
+
+
+def _interval_response(data: SyntheticData, params: Dict[str, str], rng: np.random.Generator) -> Dict[str, Any]:
+    """Build an interval response with evenly spaced events between the begin and end of the query."""
+    channel = params.get('c', "channel0")
+    begin = _parse_time(params.get('b', "2019-08-12T00:00:00"))
+    end = _parse_time(params.get('e', "2019-08-13T00:00:00"))
+    n, sampled = data.events, False
+    if params.get('l', "") != "" and int(params['l']) < n:
+        n, sampled = int(params['l']), True
+
+    step = max((end - begin) // max(n, 1), np.timedelta64(1, "us"))
+    times = begin + step * np.arange(n)
+    content = dict(data.metadata(channel), sampled=sampled)
+    del content["name"]
+    content.update(data._labels(channel, times, params))
+    content["data"] = data._events(channel, times, params, rng, 's' in params)
+    content["returnCount"] = n
+    return content
+
+
+def _mysampler_response(data: SyntheticData, params: Dict[str, str],
+                        rng: np.random.Generator) -> Dict[str, Any]:
+    """Build a mysampler response with the requested samples for every channel."""
+    begin = _parse_time(params.get('b', "2019-08-12T00:00:00"))
+    step = np.timedelta64(int(params.get('s', 1000)), "ms")
+    times = begin + step * np.arange(int(params.get('n', 10)))
+
+    channels = {}
+    for channel in params.get('c', "channel0").split(","):
+        events = data._events(channel, times, params, rng, 'e' in params)
+        channels[channel] = {"metadata": data.metadata(channel), **data._labels(channel, times, params),
+                             "data": events, "returnCount": len(events)}
+    return {"channels": channels}
+
+
+def _mystats_response(data: SyntheticData, params: Dict[str, str], rng: np.random.Generator) -> Dict[str, Any]:
+    """Build a mystats response with plausible statistics for every float channel."""
+    begin = _parse_time(params.get('b', "2019-08-12T00:00:00"))
+    end = _parse_time(params.get('e', "2019-08-13T00:00:00"))
+    num_bins = int(params.get('n', 24))
+    width = (end - begin) // num_bins
+    begins = _format_times(begin + width * np.arange(num_bins), params)
+    duration = width / np.timedelta64(1, "s")
+
+    channels = {}
+    for channel in params.get('c', "channel0").split(","):
+        if data.datatype(channel) not in _FLOAT_TYPES or data.datasize > 1:
+            channels[channel] = {"error": "Only float types are supported"}
+            continue
+        mean = rng.normal(50, 10, size=num_bins)
+        stdev = rng.gamma(2, 2, size=num_bins)
+        events = rng.integers(1, 1000, size=num_bins)
+        updates = events - rng.binomial(events, data.disconnect_rate)
+        stats = {"duration": np.full(num_bins, duration), "eventCount": events, "integration": mean * duration,
+                 "max": mean + 2 * stdev, "mean": mean, "min": mean - 2 * stdev,
+                 "rms": np.sqrt(mean ** 2 + stdev ** 2), "stdev": stdev, "updateCount": updates}
+        stats = {k: np.round(v, 4).tolist() for k, v in stats.items()}
+        channels[channel] = {"metadata": data.metadata(channel),
+                             "data": [dict({"begin": b}, **{k: v[i] for k, v in stats.items()})
+                                      for i, b in enumerate(begins)]}
+    return {"channels": channels}
+
+
+def _point_response(data: SyntheticData, params: Dict[str, str], rng: np.random.Generator) -> Dict[str, Any]:
+    """Build a point response with a single event at the requested time."""
+    channel = params.get('c', "channel0")
+    times = np.array([_parse_time(params.get('t', "2019-08-12T00:00:00"))])
+    content = data.metadata(channel)
+    del content["name"], content["ioc"], content["active"]
+    content.update(data._labels(channel, times, params))
+    content["data"] = data._events(channel, times, params, rng, 's' in params)[0]
+    return content
+
+
+def _channel_response(data: SyntheticData, params: Dict[str, str], rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """Build a channel response listing the known channels that match the pattern, with myquery's % wildcard."""
+    pattern = params.get('q', "%").replace("%", "*")
+    names = fnmatch.filter((f"channel{i}" for i in range(data.channels)), pattern)
+    offset = int(params.get('o', 0) or 0)
+    limit = params.get('l', "")
+    names = names[offset:] if limit in ("", None) else names[offset:offset + int(limit)]
+    return [data.metadata(name) for name in names]
+
+
+_ROUTES = {
+    "/myquery/interval": _interval_response,
+    "/myquery/mysampler": _mysampler_response,
+    "/myquery/mystats": _mystats_response,
+    "/myquery/point": _point_response,
+    "/myquery/channel": _channel_response,
+}
+
+
+_ENCODERS = {"gzip": gzip.compress, "deflate": zlib.compress}
+if brotli is not None:
+    _ENCODERS["br"] = brotli.compress
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # noqa: N802
+        data = self.server.data
+        if data.latency > 0:
+            time.sleep(data.latency)
+
+        url = urlparse(self.path)
+        body, encoding = data.encoded(url.path, url.query, self.headers.get("Accept-Encoding", ""))
+        if body is None:
+            body = b"Not Found"
+            self.send_response(404)
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+
+class StandInServer:
+    """Run the stand-in myquery server on a background thread."""
+
+    def __init__(self, data: Optional[SyntheticData] = None, host: str = "127.0.0.1", port: int = 0):
+        """Construct a StandInServer.
+
+        Args:
+            data: Controls the responses.  The data attribute may be replaced between requests.  A SyntheticData with
+                  small responses is used if None supplied.
+            host: The address to listen on
+            port: The port to listen on.  A free port is chosen if 0.
+        """
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.data = SyntheticData() if data is None else data
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def data(self) -> SyntheticData:
+        return self.httpd.data
+
+    @data.setter
+    def data(self, data: SyntheticData) -> None:
+        self.httpd.data = data
+
+    @property
+    def server(self) -> str:
+        """The host:port of the server, suitable for config.myquery_server"""
+        host, port = self.httpd.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
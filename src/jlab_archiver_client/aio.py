@@ -0,0 +1,324 @@
+"""Asynchronous (asyncio) versions of the myquery endpoint classes.
+
+This module provides awaitable counterparts of Interval, MySampler, MyStats, Point, and Channel for applications that
+issue many archiver requests at once, such as dashboards that fan out hundreds of queries per page load.  All requests
+run on a single event loop through an AsyncTransport, which holds a pooled aiohttp session and bounds the number of
+requests in flight, so no thread pool is required.
+
+The async classes accept the same query objects as their synchronous counterparts and are built on the same results
+classes (IntervalResults, MySamplerResults, MyStatsResults, PointResults, and ChannelResults), so the data,
+disconnects, metadata, event, and matches fields are identical.  They are not subclasses of the synchronous classes:
+options that only the blocking classes implement (shards, cache, batch_size, max_workers, iter_chunks, run_bulk) are
+not available.  A non-OK response raises the same MyqueryHTTPError as the blocking transport.
+
+This module requires the optional aiohttp dependency (pip install jlab_archiver_client[async]).
+
+Classes:
+    AsyncTransport: Pooled aiohttp session with bounded concurrency.
+    AsyncInterval: Awaitable version of Interval.
+    AsyncMySampler: Awaitable version of MySampler.
+    AsyncMyStats: Awaitable version of MyStats.
+    AsyncPoint: Awaitable version of Point.
+    AsyncChannel: Awaitable version of Channel.
+
+Example::
+
+    >>> import asyncio
+    >>> from datetime import datetime
+    >>> from jlab_archiver_client import PointQuery
+    >>> from jlab_archiver_client.aio import AsyncPoint, AsyncTransport
+    >>>
+    >>> async def main():
+    ...     async with AsyncTransport(max_concurrency=200) as transport:
+    ...         points = [AsyncPoint(PointQuery(channel=f"channel{i}", time=datetime(2019, 8, 12)),
+    ...                              transport=transport) for i in range(1, 4)]
+    ...         await asyncio.gather(*(p.run() for p in points))
+    ...     return [p.event for p in points]
+    >>> events = asyncio.run(main())
+
+See Also:
+    jlab_archiver_client.transport: The synchronous transport used by the blocking endpoint classes
+"""
+from __future__ import annotations
+
+import asyncio
+from http import HTTPStatus
+from typing import Optional, Dict, Any, List, Tuple
+
+import pandas as pd
+
+try:
+    import aiohttp
+except ImportError as exc:  # pragma: no cover - depends on the environment
+    raise ImportError("jlab_archiver_client.aio requires aiohttp.  Install with "
+                      "'pip install jlab_archiver_client[async]'.") from exc
+
+from jlab_archiver_client import decoding
+from jlab_archiver_client.channel import ChannelResults
+from jlab_archiver_client.config import config
+from jlab_archiver_client.exceptions import MyqueryHTTPError
+from jlab_archiver_client.interval import IntervalResults
+from jlab_archiver_client.mysampler import MySamplerResults
+from jlab_archiver_client.mystats import MyStatsResults
+from jlab_archiver_client.point import PointResults
+from jlab_archiver_client.query import IntervalQuery, MySamplerQuery, MyStatsQuery, PointQuery, ChannelQuery
+
+__all__ = ["AsyncTransport", "AsyncInterval", "AsyncMySampler", "AsyncMyStats", "AsyncPoint", "AsyncChannel",
+           "default_async_transport"]
+
+
+class AsyncTransport:
+    """A pooled aiohttp client for issuing requests to myquery from an event loop.
+
+    The aiohttp session is created lazily inside the running event loop.  If the transport is later used from a
+    different event loop (e.g., successive asyncio.run calls), the old session is closed and a new one is created for
+    that loop.
+    """
+
+    def __init__(self, max_concurrency: int = 100, limit_per_host: int = 0, keep_alive: bool = True,
+                 timeout: Optional[float] = None):
+        """Construct an AsyncTransport.
+
+        Args:
+            max_concurrency: The maximum number of requests in flight at once.  Further requests wait their turn.
+            limit_per_host: The maximum number of open connections to a single host.  0 means no per-host limit
+                            beyond max_concurrency.
+            keep_alive: Should connections be reused between requests.
+            timeout: Total seconds to wait for each request.  None waits indefinitely.
+        """
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def __aenter__(self) -> AsyncTransport:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """Get the session for the running event loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # A session left over from another event loop still holds its connector and connections
+            await self.close()
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.limit_per_host,
+                                             force_close=not self.keep_alive)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._session
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Issue a GET request, check that the server responded OK, and decode the JSON body.
+
+        Args:
+            url: The endpoint to query
+            params: The query parameters to send.  Parameters with a value of None are dropped.
+
+        Returns:
+            The decoded JSON response.
+
+        Raises:
+            MyqueryHTTPError when the server does not respond OK
+        """
+        session = await self._ensure_session()
+        async with self._semaphore:
+            async with session.get(url, params=_to_aiohttp_params(params)) as r:
+                if r.status != HTTPStatus.OK:
+                    raise MyqueryHTTPError(f"Error contacting server. status={r.status} details={await r.text()}",
+                                           status=r.status)
+                return decoding.loads(await r.read())
+
+    async def close(self) -> None:
+        """Close the session and any pooled connections.  A new session is created on the next request."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def _to_aiohttp_params(params: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Match requests' handling of query parameters.  aiohttp does not accept None or non-str values."""
+    if params is None:
+        return {}
+    return {k: str(v) for k, v in params.items() if v is not None}
+
+
+default_async_transport = AsyncTransport()  # shared default
+
+
+class AsyncInterval(IntervalResults):
+    """An awaitable version of Interval.  See Interval for details on the results."""
+
+    def __init__(self, query: IntervalQuery, url: Optional[str] = None, transport: Optional[AsyncTransport] = None):
+        """Construct an instance for running a myquery interval.
+
+        Args:
+            query: The query to run
+            url: The location of the myquery/interval endpoint. Generated from config if None supplied.
+            transport: The AsyncTransport used to make requests.  The shared default_async_transport is used if None
+                       supplied.
+        """
+        super().__init__(query)
+        self.url = url
+        if url is None:
+            self.url = f"{config.protocol}://{config.myquery_server}{config.interval_path}"
+        self.transport = default_async_transport if transport is None else transport
+
+    async def run(self):
+        """Run a web-based myquery interval query.  This supports querying only one PV at a time.
+
+        Raises:
+            MyqueryHTTPError when the server does not respond OK
+        """
+        content = await self.transport.get_json(self.url, params=self.query.to_web_params())
+        self._process_response(content)
+
+    @staticmethod
+    async def run_parallel(pvlist: List[str], transport: Optional[AsyncTransport] = None,
+                           **kwargs) -> Tuple[pd.DataFrame, Dict[str, pd.Series], dict]:
+        """Run multiple IntervalQueries concurrently.  See Interval.run_parallel for details.
+
+        Concurrency is bounded by the transport's max_concurrency.
+
+        Args:
+            pvlist: A list of PVs to queries
+            transport: The AsyncTransport shared by all queries.  The shared default_async_transport is used if None
+                       supplied.
+
+        Returns:
+            A Pandas DataFrame of the combined PVs, a dictionry of per-channel disconnect series (keyed on channels),
+            and a dictionary of per-channel metadata (keyed on channel)
+        """
+        if "channel" in kwargs.keys():
+            del kwargs["channel"]
+        kwargs["prior_point"] = True
+
+        out = {pv: AsyncInterval(IntervalQuery(pv, **kwargs), transport=transport) for pv in pvlist}
+        await asyncio.gather(*(interval.run() for interval in out.values()))
+
+        data = IntervalResults._combine_series([out[channel].data for channel in out.keys()])
+        disconnects = {channel: out[channel].disconnects for channel in out.keys()}
+        metadata = {channel: out[channel].metadata for channel in out.keys()}
+
+        return data, disconnects, metadata
+
+
+class AsyncMySampler(MySamplerResults):
+    """An awaitable version of MySampler.  See MySampler for details on the results."""
+
+    def __init__(self, query: MySamplerQuery, url: Optional[str] = None, transport: Optional[AsyncTransport] = None):
+        """Construct an instance for running a mysampler query.
+
+        Args:
+            query: The query to run
+            url: The location of the mysampler endpoint.  Generated from config if None supplied.
+            transport: The AsyncTransport used to make requests.  The shared default_async_transport is used if None
+                       supplied.
+        """
+        super().__init__(query)
+        self.url = url
+        if url is None:
+            self.url = f"{config.protocol}://{config.myquery_server}{config.mysampler_path}"
+        self.transport = default_async_transport if transport is None else transport
+
+    async def run(self):
+        """Run a web-based mysampler query.
+
+        Raises:
+            MyqueryHTTPError when the server does not respond OK
+        """
+        content = await self.transport.get_json(self.url, params=self.query.to_web_params())
+        self._process_response(content)
+
+
+class AsyncMyStats(MyStatsResults):
+    """An awaitable version of MyStats.  See MyStats for details on the results."""
+
+    def __init__(self, query: MyStatsQuery, url: Optional[str] = None, transport: Optional[AsyncTransport] = None,
+                 layout: str = "long"):
+        """Construct an instance for running a mystats query.
+
+        Args:
+            query: The query to run
+            url: The location of the mystats endpoint.  Generated from config if None supplied.
+            transport: The AsyncTransport used to make requests.  The shared default_async_transport is used if None
+                       supplied.
+            layout: The layout of the data field, either "long" or "wide".
+        """
+        super().__init__(query, layout)
+        self.url = url
+        if url is None:
+            self.url = f"{config.protocol}://{config.myquery_server}{config.mystats_path}"
+        self.transport = default_async_transport if transport is None else transport
+
+    async def run(self):
+        """Run a web-based mystats query.
+
+        Raises:
+            MyqueryHTTPError when the server does not respond OK
+        """
+        content = await self.transport.get_json(self.url, params=self.query.to_web_params())
+        self._process_response(content)
+
+
+class AsyncPoint(PointResults):
+    """An awaitable version of Point.  See Point for details on the results."""
+
+    def __init__(self, query: PointQuery, url: Optional[str] = None, transport: Optional[AsyncTransport] = None):
+        """Construct an instance for running a myquery point query.
+
+        Args:
+            query: The query to run
+            url: The location of the myquery/point endpoint. Generated from config if None supplied.
+            transport: The AsyncTransport used to make requests.  The shared default_async_transport is used if None
+                       supplied.
+        """
+        super().__init__(query)
+        self.url = url
+        if url is None:
+            self.url = f"{config.protocol}://{config.myquery_server}{config.point_path}"
+        self.transport = default_async_transport if transport is None else transport
+
+    async def run(self):
+        """Run a web-based myquery point query.
+
+        Raises:
+            MyqueryHTTPError when the server does not respond OK
+        """
+        content = await self.transport.get_json(self.url, params=self.query.to_web_params())
+        self._process_response(content)
+
+
+class AsyncChannel(ChannelResults):
+    """An awaitable version of Channel.  See Channel for details on the results."""
+
+    def __init__(self, query: ChannelQuery, url: Optional[str] = None, transport: Optional[AsyncTransport] = None):
+        """Construct an instance for running a myquery channel call.
+
+        Args:
+            query: The query to run
+            url: The location of the myquery/channel endpoint. Generated from config if None supplied.
+            transport: The AsyncTransport used to make requests.  The shared default_async_transport is used if None
+                       supplied.
+        """
+        super().__init__(query)
+        self.url = url
+        if url is None:
+            self.url = f"{config.protocol}://{config.myquery_server}{config.channel_path}"
+        self.transport = default_async_transport if transport is None else transport
+
+    async def run(self):
+        """Run a web-based myquery channel query.
+
+        Raises:
+            MyqueryHTTPError when the server does not respond OK
+        """
+        content = await self.transport.get_json(self.url, params=self.query.to_web_params())
+        self._process_response(content)
@@ -0,0 +1,491 @@
+"""Local caches of myquery responses.
+
+Analysts often re-run the same channels over overlapping historical windows.  Archived history does not change once it
+is old enough, so there is no need to transfer it from myquery again.  This module provides a persistent cache that
+stores the events of interval queries on local disk and only requests the parts of a time range it does not yet hold.
+
+Tools that issue the same small point and channel lookups over and over can instead share an in-memory ResultCache,
+which keeps the decoded responses of recent requests.
+
+Classes:
+    IntervalCache: Persistent on-disk cache of interval events with range coalescing.
+    ResultCache: Thread-safe, size-bounded in-memory LRU cache of decoded responses with an optional time-to-live.
+
+Example::
+
+    >>> from datetime import datetime, timedelta
+    >>> from jlab_archiver_client import Interval, IntervalQuery
+    >>> from jlab_archiver_client.cache import IntervalCache
+    >>>
+    >>> cache = IntervalCache("~/.cache/jlab_archiver_client", horizon=timedelta(days=2))
+    >>> query = IntervalQuery("channel1", datetime(2019, 8, 12), datetime(2019, 8, 14))
+    >>> Interval(query, cache=cache).run()    # Fetches the whole range and stores it
+    >>> query = IntervalQuery("channel1", datetime(2019, 8, 13), datetime(2019, 8, 15))
+    >>> Interval(query, cache=cache).run()    # Only fetches 2019-08-14 to 2019-08-15
+    >>>
+    >>> from jlab_archiver_client import Point, PointQuery
+    >>> from jlab_archiver_client.cache import ResultCache
+    >>> lookups = ResultCache(maxsize=10_000, ttl=60)
+    >>> for _ in range(3):
+    ...     Point(PointQuery("channel1", datetime(2019, 8, 12)), cache=lookups).run()
+    >>> lookups.stats()
+    {'hits': 2, 'misses': 1, 'evictions': 0, 'expirations': 0, 'size': 1, 'maxsize': 10000}
+
+See Also:
+    jlab_archiver_client.interval: Interval class that uses IntervalCache
+    jlab_archiver_client.point: Point class that can use a ResultCache
+    jlab_archiver_client.channel: Channel class that can use a ResultCache
+"""
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from jlab_archiver_client import utils
+from jlab_archiver_client.concurrency import AdaptiveLimiter
+from jlab_archiver_client.query import IntervalQuery
+from jlab_archiver_client.streaming import IntervalStreamParser, _INTEGER_TYPES
+
+__all__ = ["IntervalCache", "ResultCache"]
+
+# A half-open [begin, end) time range
+Range = Tuple[datetime, datetime]
+
+_COLUMNS = ("time", "ts", "values", "types")
+
+
+class _Entry:
+    """The cached events of one channel and set of query options, and the time ranges they cover.
+
+    Events are held column-wise, sorted by time: time (datetime64), ts (timestamp string as returned by myquery),
+    values (float64 for numeric channels, otherwise str with vectors JSON encoded), and types (the non-update type,
+    or "" for updates).
+
+    priors holds the prior points requested from the point endpoint, as single rows of columns keyed by the begin time
+    they were requested for, or None if there was no earlier event.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], coverage: List[Range], metadata: Optional[Dict[str, Any]],
+                 kind: Optional[str], priors: Optional[Dict[datetime, Optional[Dict[str, np.ndarray]]]] = None):
+        self.columns = columns
+        self.coverage = coverage
+        self.metadata = metadata
+        self.kind = kind
+        self.priors = {} if priors is None else priors
+
+    @staticmethod
+    def empty() -> "_Entry":
+        return _Entry(_empty_columns(), [], None, None)
+
+    def mask(self, ranges: List[Range]) -> np.ndarray:
+        """Get a mask of the events that fall inside any of ranges."""
+        time = self.columns["time"]
+        mask = np.zeros(len(time), dtype=bool)
+        for begin, end in ranges:
+            lo, hi = time.searchsorted([np.datetime64(begin), np.datetime64(end)])
+            mask[lo:hi] = True
+        return mask
+
+    def select(self, mask: np.ndarray) -> Dict[str, np.ndarray]:
+        return {name: column[mask] for name, column in self.columns.items()}
+
+
+def _coalesce(ranges: List[Range], gap: timedelta = timedelta(0)) -> List[Range]:
+    """Merge ranges that overlap or are separated by no more than gap."""
+    out: List[Range] = []
+    for begin, end in sorted(ranges):
+        if end <= begin:
+            continue
+        if len(out) > 0 and begin - out[-1][1] <= gap:
+            out[-1] = (out[-1][0], max(out[-1][1], end))
+        else:
+            out.append((begin, end))
+    return out
+
+
+class IntervalCache:
+    """A persistent on-disk cache of the events returned by myquery's interval endpoint.
+
+    Events are stored per (server, deployment, channel, query options) in a NumPy .npz file holding one array per
+    column, along with the time ranges the file covers.  When a query is run, only the parts of its time range that are
+    not covered are requested from myquery, and the new events are merged into the file.  Touching ranges are coalesced
+    so the coverage list stays short.
+
+    Data newer than the horizon may still change on the server, so it is never recorded as covered and is always
+    requested.  Queries that fall entirely before the horizon are answered from disk without contacting myquery.  The
+    prior point of a query is taken from the cache when the covered range reaches back to an earlier event, otherwise it
+    is requested from the point endpoint.  A prior point requested for a begin time before the horizon is stored too,
+    so repeating a query with prior_point needs no request.
+
+    Only queries whose results can be split by time and stitched back together are cached.  Queries that are sampled
+    (bin_limit or sample_type), integrated, use unix or server adjusted timestamps, or pass extra options always go to
+    myquery.  Like the query itself, time ranges are resolved to whole seconds, and cached results hold the events in
+    [begin, end).
+    """
+
+    def __init__(self, directory: str, horizon: timedelta = timedelta(days=1), coalesce: timedelta = timedelta(0)):
+        """Construct an IntervalCache.
+
+        Args:
+            directory: The directory holding the cache files.  Created if it does not exist.
+            horizon: Data older than this (relative to now) is treated as immutable and never requested again once
+                     cached.
+            coalesce: Missing ranges separated by a covered range no longer than this are requested in a single call.
+        """
+        self.directory = os.path.expanduser(directory)
+        self.horizon = horizon
+        self.coalesce = coalesce
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def supports(self, query: IntervalQuery) -> bool:
+        """Can the results of this query be cached."""
+        return (query.bin_limit is None and query.sample_type is None and not query.integrate
+                and not query.unix_timestamps_ms and not query.adjust_time_to_server_offset
+                and len(query.extra_opts) == 0)
+
+    @staticmethod
+    def key(url: str, query: IntervalQuery) -> str:
+        """Get the key that identifies the cache file of a query's channel and options."""
+        ident = {'url': url, 'channel': query.channel, 'deployment': query.deployment,
+                 'frac_time_digits': query.frac_time_digits, 'sig_figs': query.sig_figs,
+                 'data_updates_only': query.data_updates_only, 'enums_as_strings': query.enums_as_strings}
+        return hashlib.sha256(json.dumps(ident, sort_keys=True).encode()).hexdigest()
+
+    def coverage(self, url: str, query: IntervalQuery) -> List[Range]:
+        """Get the time ranges cached for a query's channel and options."""
+        return list(self._load(self.key(url, query)).coverage)
+
+    def clear(self) -> None:
+        """Remove all cached events."""
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if name.endswith(".npz"):
+                    os.remove(os.path.join(self.directory, name))
+
+    def get(self, url: str, query: IntervalQuery, fetch: Callable[[IntervalQuery], IntervalStreamParser],
+            fetch_prior: Callable[[IntervalQuery], Optional[Dict[str, Any]]],
+            max_workers: Union[int, AdaptiveLimiter] = 1
+            ) -> Tuple[np.ndarray, np.ndarray, List[str], List[Any], Dict[str, Any]]:
+        """Get the events of an interval query, requesting only the time ranges that are not cached.
+
+        Args:
+            url: The location of the myquery/interval endpoint.  Part of the cache key.
+            query: The query to answer
+            fetch: Runs an interval query and returns the parsed response
+            fetch_prior: Returns the last event before the begin time of a query, or None if there is none
+            max_workers: The maximum number of missing ranges requested at once, or an AdaptiveLimiter
+
+        Returns:
+            The values, timestamps, disconnect values, disconnect timestamps, and metadata of the query
+        """
+        key = self.key(url, query)
+        begin = query.begin.replace(microsecond=0)
+        end = query.end.replace(microsecond=0)
+
+        entry = self._load(key)
+        missing = [(begin, end)] if entry.metadata is None else self._missing(entry.coverage, begin, end)
+        if len(missing) > 0:
+            tasks = [partial(self._fetch_range, fetch, query, b, e) for b, e in missing]
+            parsers = utils.run_in_parallel(tasks, max_workers=max_workers)
+            with self._lock:
+                # Another thread may have updated the file while the requests were in flight
+                entry = self._merge(self._load(key), missing, parsers)
+                self._save(key, self._immutable(entry, datetime.now() - self.horizon))
+
+        columns = entry.select(entry.mask([(begin, end)]))
+        if query.prior_point:
+            prior = self._prior(key, entry, begin, query, fetch_prior)
+            if prior is not None:
+                columns = {name: np.concatenate([prior[name], columns[name]]) for name in _COLUMNS}
+
+        return self._to_results(columns, entry)
+
+    def _missing(self, coverage: List[Range], begin: datetime, end: datetime) -> List[Range]:
+        """Get the parts of [begin, end) that are not covered, coalescing those separated by short covered ranges."""
+        missing = []
+        cursor = begin
+        for b, e in coverage:
+            if b >= end:
+                break
+            if e <= cursor:
+                continue
+            if b > cursor:
+                missing.append((cursor, b))
+            cursor = e
+        if cursor < end:
+            missing.append((cursor, end))
+        return _coalesce(missing, self.coalesce)
+
+    @staticmethod
+    def _fetch_range(fetch: Callable[[IntervalQuery], IntervalStreamParser], query: IntervalQuery, begin: datetime,
+                     end: datetime) -> IntervalStreamParser:
+        query = copy.copy(query)
+        query.begin = begin
+        query.end = end
+        query.prior_point = False
+        return fetch(query)
+
+    @staticmethod
+    def _merge(entry: _Entry, ranges: List[Range], parsers: List[IntervalStreamParser]) -> _Entry:
+        """Replace the cached events in each range with the events fetched for that range."""
+        parts = [entry.select(~entry.mask(ranges))]
+        for (begin, end), parser in zip(ranges, parsers):
+            columns, kind = _parser_columns(parser)
+            fetched = _Entry(columns, [], None, kind)
+            # myquery includes events at the end time.  Those belong to the range that starts there.
+            parts.append(fetched.select(fetched.mask([(begin, end)])))
+            entry.kind = kind if entry.kind is None else entry.kind
+            entry.metadata = {k: v for k, v in parser.metadata.items() if k != "returnCount"}
+            entry.metadata['sampled'] = False
+
+        columns = {name: np.concatenate([part[name] for part in parts]) for name in _COLUMNS}
+        order = np.argsort(columns["time"], kind="stable")
+        columns = {name: column[order] for name, column in columns.items()}
+        return _Entry(columns, _coalesce(entry.coverage + ranges), entry.metadata, entry.kind, entry.priors)
+
+    @staticmethod
+    def _immutable(entry: _Entry, limit: datetime) -> _Entry:
+        """Get the part of an entry that is older than limit, which is all that is stored."""
+        coverage = [(b, min(e, limit)) for b, e in entry.coverage if b < limit]
+        priors = {begin: row for begin, row in entry.priors.items() if begin <= limit}
+        return _Entry(entry.select(entry.mask(coverage)), coverage, entry.metadata, entry.kind, priors)
+
+    def _prior(self, key: str, entry: _Entry, begin: datetime, query: IntervalQuery,
+               fetch_prior: Callable[[IntervalQuery], Optional[Dict[str, Any]]]) -> Optional[Dict[str, np.ndarray]]:
+        """Get the prior point of a query as a single row of columns, timestamped at begin like myquery does."""
+        ts = begin.strftime("%Y-%m-%d %H:%M:%S")
+        if query.frac_time_digits > 0:
+            ts += "." + "0" * query.frac_time_digits
+
+        found, row = self._cached_prior(entry, begin)
+        if not found:
+            event = fetch_prior(query)
+            if event is not None:
+                parser = IntervalStreamParser(enums_as_strings=query.enums_as_strings)
+                parser.feed(json.dumps(dict(entry.metadata, data=[dict(event, d=ts)])).encode())
+                parser.close()
+                row, _ = _parser_columns(parser)
+            # The events before begin cannot change once it is older than the horizon, so neither can its prior point
+            if begin <= datetime.now() - self.horizon:
+                with self._lock:
+                    stored = self._load(key)
+                    stored.priors[begin] = row
+                    self._save(key, stored)
+        if row is None:
+            return None
+
+        row = {name: column.copy() for name, column in row.items()}
+        row["time"][:] = np.datetime64(begin)
+        row["ts"] = np.array([ts])
+        return row
+
+    @staticmethod
+    def _cached_prior(entry: _Entry, begin: datetime) -> Tuple[bool, Optional[Dict[str, np.ndarray]]]:
+        """Find the prior point of begin in an entry.
+
+        The prior point is the last cached event before begin in the covered range reaching begin.  If there is none,
+        it is the stored prior point of a begin time in that range, since no event falls between the two.
+
+        Returns:
+            Whether the prior point is known, and its row of columns or None if there is no earlier event
+        """
+        for b, e in entry.coverage:
+            if b <= begin <= e:
+                lo, hi = entry.columns["time"].searchsorted([np.datetime64(b), np.datetime64(begin)])
+                if hi > lo:
+                    return True, {name: column[hi - 1:hi] for name, column in entry.columns.items()}
+                known = [k for k in entry.priors if b <= k <= begin]
+                if len(known) > 0:
+                    return True, entry.priors[max(known)]
+        return False, None
+
+    @staticmethod
+    def _to_results(columns: Dict[str, np.ndarray],
+                    entry: _Entry) -> Tuple[np.ndarray, np.ndarray, List[str], List[Any], Dict[str, Any]]:
+        """Convert cached columns into the arguments of Interval._set_results."""
+        ts = columns["ts"].astype(object)
+        types = columns["types"]
+        disconnected = types != ""
+        metadata = dict(entry.metadata, returnCount=len(ts))
+
+        if entry.kind == "numeric":
+            values = columns["values"].astype(float)
+            if metadata.get("datatype") in _INTEGER_TYPES and not disconnected.any():
+                values = values.astype(np.int64)
+        else:
+            values = columns["values"].astype(object)
+            if entry.kind == "vector":
+                # Assign one at a time so the lists are not broadcast into a 2D array
+                for i in np.flatnonzero(~disconnected):
+                    values[i] = json.loads(values[i])
+            values[disconnected] = None
+
+        return values, ts, types[disconnected].tolist(), ts[disconnected].tolist(), metadata
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _load(self, key: str) -> _Entry:
+        """Read an entry from disk.  Files hold only plain arrays, so they are loaded without unpickling."""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return _Entry.empty()
+
+        with np.load(path, allow_pickle=False) as npz:
+            columns = {name: npz[name] for name in _COLUMNS}
+            # Files written before prior points were stored have none
+            prior_columns = {name: npz[f"prior_{name}"] for name in _COLUMNS if f"prior_{name}" in npz.files}
+            info = json.loads(str(npz["info"]))
+        coverage = [(datetime.fromisoformat(b), datetime.fromisoformat(e)) for b, e in info["coverage"]]
+
+        priors: Dict[datetime, Optional[Dict[str, np.ndarray]]] = {}
+        if len(prior_columns) > 0:
+            for i, time in enumerate(prior_columns["time"]):
+                priors[time.astype("datetime64[us]").item()] = {
+                    name: column[i:i + 1] for name, column in prior_columns.items()}
+        for begin in info.get("no_prior", []):
+            priors[datetime.fromisoformat(begin)] = None
+        return _Entry(columns, coverage, info["metadata"], info["kind"], priors)
+
+    def _save(self, key: str, entry: _Entry) -> None:
+        """Write an entry to disk.  The file is replaced atomically so readers never see a partial write."""
+        info = {'coverage': [(b.isoformat(), e.isoformat()) for b, e in entry.coverage],
+                'metadata': entry.metadata, 'kind': entry.kind,
+                'no_prior': [begin.isoformat() for begin, row in entry.priors.items() if row is None]}
+        # Prior point rows are stored under the begin time they answer
+        rows = [dict(row, time=np.array([np.datetime64(begin)], dtype="datetime64[ns]"))
+                for begin, row in entry.priors.items() if row is not None]
+        prior_columns = _empty_columns() if len(rows) == 0 else {
+            name: np.concatenate([row[name] for row in rows]) for name in _COLUMNS}
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, info=np.array(json.dumps(info)), **entry.columns,
+                         **{f"prior_{name}": column for name, column in prior_columns.items()})
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+
+def _empty_columns() -> Dict[str, np.ndarray]:
+    """Get cache columns holding no events."""
+    return {"time": np.array([], dtype="datetime64[ns]"), "ts": np.array([], dtype=str),
+            "values": np.array([], dtype=float), "types": np.array([], dtype=str)}
+
+
+def _parser_columns(parser: IntervalStreamParser) -> Tuple[Dict[str, np.ndarray], str]:
+    """Convert the events of a parsed interval response into cache columns and the kind of values they hold."""
+    ts = parser.ts.to_array()
+    values = parser.values.to_array()
+    types = np.full(len(ts), "", dtype=object)
+    types[parser.disconnect_index] = parser.disconnect_values
+
+    if values.dtype != object:
+        kind = "numeric"
+        values = values.astype(float)
+    else:
+        kind = "vector" if parser.metadata.get("datasize", 1) > 1 else "string"
+        encode = json.dumps if kind == "vector" else str
+        values = np.array(["" if t != "" else encode(v) for v, t in zip(values, types)], dtype=str)
+
+    columns = {"time": utils.to_datetime_index(ts).to_numpy(dtype="datetime64[ns]"), "ts": np.array(ts, dtype=str),
+               "values": values, "types": types.astype(str)}
+    return columns, kind
+
+
+class ResultCache:
+    """A thread-safe, size-bounded, in-memory LRU cache of decoded myquery responses.
+
+    Entries are keyed on the endpoint URL and the query's web parameters, so two queries with the same to_web_params()
+    output share an entry.  When the cache is full, the least recently used entry is evicted.  If a time-to-live is
+    given, entries older than it are treated as missing, which bounds how stale a lookup of recent data can be.
+
+    Stored responses are copied on the way in and out, so callers can modify what they get back without affecting the
+    cache.  Hit, miss, eviction, and expiration counts are available from stats().
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """Construct a ResultCache.
+
+        Args:
+            maxsize: The maximum number of responses held.
+            ttl: The number of seconds a response remains valid.  None keeps responses until they are evicted.
+
+        Raises:
+            ValueError when maxsize is less than one
+        """
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least one, not {maxsize}")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(url: str, params: Dict[str, Any]) -> Hashable:
+        """Get the cache key of a request."""
+        return url, tuple(sorted((k, str(v)) for k, v in params.items()))
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        """Get a response from the cache, or fetch and store it if it is missing or expired.
+
+        Args:
+            key: The key of the request, e.g. from ResultCache.key
+            fetch: Makes the request and returns the decoded response.  Not called on a hit.
+
+        Returns:
+            A copy of the response
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and now - entry[0] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            self.misses += 1
+
+        # Fetch without holding the lock so other lookups are not blocked by the network
+        value = fetch()
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        """Get a consistent snapshot of the cache counters."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'expirations': self.expirations, 'size': len(self._entries), 'maxsize': self.maxsize}
+
+    def clear(self) -> None:
+        """Remove all responses.  The counters are kept."""
+        with self._lock:
+            self._entries.clear()
@@ -29,44 +29,69 @@ See Also:
 """ # noqa: E501
 from typing import Optional, List, Any, Dict
 
-import requests
-
+from jlab_archiver_client.cache import ResultCache
+from jlab_archiver_client import decoding
 from jlab_archiver_client.config import config
+from jlab_archiver_client.transport import Transport, default_transport
 from jlab_archiver_client.query import ChannelQuery
 
 
-__all__ = ["Channel"]
+__all__ = ["Channel", "ChannelResults"]
+
+
+class ChannelResults:
+    """The results of a myquery channel query and the processing of a response into them.
+
+    Holds the matches field described by Channel.  Shared by Channel and the asyncio AsyncChannel, which differ only
+    in how the response is requested.
+    """
+
+    def __init__(self, query: ChannelQuery):
+        """Construct an instance holding no results yet.
+
+        Args:
+            query: The query whose results are held
+        """
+        self.query = query
+
+        self.matches: Optional[List[Dict:str, Any]] = None
+
+    def _process_response(self, content: List[Dict[str, Any]]):
+        """Process the decoded JSON response from myquery into the matches field."""
+        self.matches = content
 
 
-class Channel:
+class Channel(ChannelResults):
     """A class for running calls to myquery's channel endpoint.
 
     This class allows for the user to lookup channels in the archive by name using SQL patterns
     """
 
-    def __init__(self, query: ChannelQuery, url: Optional[str] = None):
+    def __init__(self, query: ChannelQuery, url: Optional[str] = None, transport: Optional[Transport] = None,
+                 cache: Optional[ResultCache] = None):
         """Construct an instance for running a myquery channel call.
 
         Args:
             query: The query to run
             url: The location of the myquery/interval endpoint. Generated from config if None supplied.
+            transport: The Transport used to make requests.  The shared default_transport is used if None supplied.
+            cache: A ResultCache shared between lookups.  Repeated queries are answered from it without a request.
         """
-        self.query = query
+        super().__init__(query)
         self.url = url
         if url is None:
             self.url = f"{config.protocol}://{config.myquery_server}{config.channel_path}"
-
-        self.matches: Optional[List[Dict:str, Any]] = None
+        self.transport = default_transport if transport is None else transport
+        self.cache = cache
 
     def run(self):
         """Run a web-based myquery channel query."""
 
         opts = self.query.to_web_params()
-        r = requests.get(self.url, params=opts)
-
-        if r.status_code != requests.codes.OK:
-            raise requests.RequestException(f"Error contacting server. status={r.status_code} details={r.text}")
+        if self.cache is None:
+            content = decoding.loads(self.transport.get(self.url, params=opts).content)
+        else:
+            content = self.cache.get_or_fetch(ResultCache.key(self.url, opts),
+                                              lambda: decoding.loads(self.transport.get(self.url, params=opts).content))
 
-        content = r.json()
-
-        self.matches = content
+        self._process_response(content)
@@ -0,0 +1,128 @@
+"""Adaptive concurrency for parallel queries.
+
+A fixed number of workers either underuses the myquery server when it is idle or overloads it when it is busy.  An
+AdaptiveLimiter replaces the fixed number with a limit that is adjusted as queries complete, using additive increase /
+multiplicative decrease (AIMD) like TCP congestion control:
+
+    * A query that succeeds while at least half the limit is in use raises the limit by increase / limit, i.e., by
+      about increase per round of queries, up to max_limit.
+    * A query that fails with a requests.RequestException (after the transport's retries), or that takes longer than
+      latency_target, multiplies the limit by backoff_ratio, down to min_limit.  Only one decrease is made per round, so
+      a burst of failures from queries that were started together is counted once.
+
+The limiter can be passed anywhere a max_workers is accepted for parallel requests: Interval.run_parallel, the
+max_workers of Interval, MySampler and MyStats, Point.run_batch and utils.run_in_parallel.  The limit is exposed by
+stats() so it can be monitored.  A limiter can be shared by several parallel runs so that what it learns carries over.
+
+Example::
+
+    >>> from jlab_archiver_client import Interval
+    >>> from jlab_archiver_client.concurrency import AdaptiveLimiter
+    >>> limiter = AdaptiveLimiter(initial=4, max_limit=32, latency_target=30)
+    >>> data, disconnects, metadata = Interval.run_parallel(pvlist, max_workers=limiter, begin=begin, end=end)
+    >>> limiter.stats()
+    {'limit': 9.2, 'in_flight': 0, 'completed': 120, 'dropped': 1, 'increases': 119, 'decreases': 1}
+
+See Also:
+    jlab_archiver_client.utils.run_in_parallel: Runs tasks under a fixed or adaptive limit
+"""
+import time
+from threading import Condition
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+__all__ = ["AdaptiveLimiter"]
+
+
+class AdaptiveLimiter:
+    """An AIMD limit on the number of tasks running at once, adjusted from their outcome and latency."""
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 32, increase: float = 1.0,
+                 backoff_ratio: float = 0.75, latency_target: Optional[float] = None):
+        """Construct an AdaptiveLimiter.
+
+        Args:
+            initial: The starting limit
+            min_limit: The lowest the limit may fall
+            max_limit: The highest the limit may grow.  Also the number of threads used by parallel runs.
+            increase: The growth of the limit per round of successful tasks
+            backoff_ratio: The factor applied to the limit when a task fails or is slow
+            latency_target: Tasks taking longer than this many seconds are treated like failures.  Ignored if None.
+        """
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= initial <= max_limit")
+        if not 0 < backoff_ratio < 1:
+            raise ValueError("backoff_ratio must be between 0 and 1")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.backoff_ratio = backoff_ratio
+        self.latency_target = latency_target
+
+        self._cond = Condition()
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._round = 0
+        self._completed = 0
+        self._dropped = 0
+        self._increases = 0
+        self._decreases = 0
+
+    @property
+    def limit(self) -> float:
+        """The current limit.  int(limit) tasks may run at once."""
+        with self._cond:
+            return self._limit
+
+    def acquire(self) -> int:
+        """Wait until another task may start and count it as running.  Returns a token to pass to release."""
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+            return self._round
+
+    def release(self, token: int, latency: float, failed: bool) -> None:
+        """Count a task as finished and adjust the limit.
+
+        Args:
+            token: The value returned by acquire when the task started
+            latency: The seconds the task took
+            failed: Did the task fail in a way that indicates the server is overloaded
+        """
+        with self._cond:
+            # Only grow a limit that is at least half used
+            in_use = self._in_flight * 2 >= self._limit
+            self._in_flight -= 1
+            self._completed += 1
+            if failed or (self.latency_target is not None and latency > self.latency_target):
+                self._dropped += 1
+                # Tasks started before the last decrease saw the old limit, so do not decrease again for them
+                if token == self._round:
+                    self._limit = max(float(self.min_limit), self._limit * self.backoff_ratio)
+                    self._round += 1
+                    self._decreases += 1
+            elif in_use and self._limit < self.max_limit:
+                self._limit = min(float(self.max_limit), self._limit + self.increase / self._limit)
+                self._increases += 1
+            self._cond.notify_all()
+
+    def run(self, task: Callable[[], Any]) -> Any:
+        """Run a task once the limit allows it and adjust the limit from its outcome."""
+        token = self.acquire()
+        start = time.monotonic()
+        failed = False
+        try:
+            return task()
+        except requests.RequestException:
+            failed = True
+            raise
+        finally:
+            self.release(token, time.monotonic() - start, failed)
+
+    def stats(self) -> Dict[str, float]:
+        """Get a consistent snapshot of the limit and counters."""
+        with self._cond:
+            return {'limit': self._limit, 'in_flight': self._in_flight, 'completed': self._completed,
+                    'dropped': self._dropped, 'increases': self._increases, 'decreases': self._decreases}
@@ -67,6 +67,12 @@ class _Config:
     mystats_path: str = "/myquery/mystats"
     """The path to the mystats endpoint"""
 
+    max_url_length: int = 8000
+    """The longest request URL to send.  mysampler and mystats queries with longer pvlists are split into batches."""
+
+    json_decoder: str = "auto"
+    """The JSON decoder used for responses (see decoding module).  "auto" uses orjson if installed, otherwise json."""
+
     def set(self, **kwargs) -> None:
         """mutate-in-place API so imports never go stale"""
         with _lock:
@@ -84,6 +90,8 @@ class _Config:
                 "channel_path": self.channel_path,
                 "point_path": self.point_path,
                 "mystats_path": self.point_path,
+                "max_url_length": self.max_url_length,
+                "json_decoder": self.json_decoder,
             }
 
 config = _Config()  # singleton
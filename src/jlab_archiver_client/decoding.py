@@ -0,0 +1,84 @@
+"""JSON decoding of myquery responses.
+
+Decoding the JSON body is the largest CPU cost of big interval and mysampler queries.  All endpoint classes decode
+through the loads function of this module, which uses the decoder named by config.json_decoder.  The default, "auto",
+uses orjson when it is installed and the standard library json module otherwise.  Responses are decoded straight from
+the bytes received, without first building a str of the whole body.
+
+Additional decoders can be registered by name.  A decoder is a callable taking bytes or str and returning the decoded
+object, and it must raise a ValueError (e.g., json.JSONDecodeError) for malformed input.
+
+Example::
+
+    >>> from jlab_archiver_client.config import config
+    >>> from jlab_archiver_client import decoding
+    >>> decoding.available_decoders()
+    ['json', 'orjson']
+    >>> config.set(json_decoder="json")   # Force the standard library decoder
+    >>>
+    >>> import simdjson
+    >>> decoding.register_decoder("simdjson", lambda data: simdjson.Parser().parse(data).as_dict())
+    >>> config.set(json_decoder="simdjson")
+
+See Also:
+    jlab_archiver_client.config: Configuration settings, including json_decoder
+"""
+import json
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from jlab_archiver_client.config import config
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+__all__ = ["loads", "get_decoder", "register_decoder", "available_decoders"]
+
+_decoders: Dict[str, Callable[[Union[bytes, str]], Any]] = {"json": json.loads}
+if orjson is not None:
+    _decoders["orjson"] = orjson.loads
+
+
+def register_decoder(name: str, func: Callable[[Union[bytes, str]], Any]) -> None:
+    """Make a decoder available for selection through config.json_decoder.
+
+    Args:
+        name: The name used to select the decoder.  "auto" is reserved.
+        func: Decodes bytes or str, raising a ValueError for malformed input.
+    """
+    if name == "auto":
+        raise ValueError("'auto' is not a valid decoder name")
+    _decoders[name] = func
+
+
+def available_decoders() -> List[str]:
+    """Return the names of the decoders that can be selected."""
+    return sorted(_decoders.keys())
+
+
+def get_decoder(name: Optional[str] = None) -> Callable[[Union[bytes, str]], Any]:
+    """Return a decoder by name.
+
+    Args:
+        name: The name of the decoder.  config.json_decoder is used if None supplied.  "auto" selects orjson if it is
+              installed and json otherwise.
+
+    Raises:
+        ValueError when the decoder is not available
+    """
+    name = config.json_decoder if name is None else name
+    if name == "auto":
+        name = "orjson" if "orjson" in _decoders else "json"
+    if name not in _decoders:
+        raise ValueError(f"Unknown JSON decoder '{name}'.  Available decoders: {available_decoders()}")
+    return _decoders[name]
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode a JSON document with the configured decoder.
+
+    Raises:
+        ValueError when the document is malformed
+    """
+    return get_decoder()(data)
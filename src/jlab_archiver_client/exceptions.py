@@ -9,6 +9,7 @@ application errors.
 
 Classes:
     MyqueryException: Base exception for myquery request and response errors.
+    MyqueryHTTPError: A non-OK response from myquery, raised by both the blocking and the asyncio transports.
 
 Example::
 
@@ -24,6 +25,9 @@ See Also:
     jlab_archiver_client.interval: Interval class that may raise these exceptions
     jlab_archiver_client.query: Query classes that may raise these exceptions
 """
+from typing import Optional
+
+import requests
 
 
 class MyqueryException(Exception):
@@ -40,3 +44,24 @@ class MyqueryException(Exception):
 
     def __str__(self) -> str:
         return self.message
+
+
+class MyqueryHTTPError(MyqueryException, requests.HTTPError):
+    """Exception representing a non-OK response from myquery.
+
+    Raised by the blocking Transport and by the asyncio AsyncTransport alike, so callers can catch either
+    MyqueryException or requests.HTTPError regardless of how the request was made.
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None,
+                 response: Optional[requests.Response] = None) -> None:
+        """Construct an instance of MyqueryHTTPError.
+
+        Args:
+            message: Description of exception cause
+            status: The HTTP status code of the response
+            response: The requests.Response, when the request was made by the blocking Transport
+        """
+        requests.HTTPError.__init__(self, message, response=response)
+        self.message = message
+        self.status = status
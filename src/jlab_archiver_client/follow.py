@@ -0,0 +1,288 @@
+"""Follow the newest events of many channels.
+
+Monitoring scripts that poll IntervalQuery with a sliding window (e.g., begin=now-5min) download the same events again
+on every poll.  An IntervalFollower instead remembers the timestamp of the last event it has seen for each channel and
+only asks myquery for what came after it.  New events are appended to a fixed-size RingBuffer per channel, so memory
+stays bounded however long the follower runs, and each poll transfers roughly only the new events.
+
+myquery's interval begin is inclusive and only resolved to whole seconds, so an incremental query can return events
+that were already seen.  These are dropped on the client by comparing their timestamps with the last one seen, and by
+counting the events already seen at exactly that timestamp.
+
+Classes:
+    RingBuffer: Fixed-capacity buffer of the most recent events of one channel.
+    IntervalFollower: Incrementally polls the interval endpoint for the new events of many channels.
+
+Example::
+
+    >>> from datetime import timedelta
+    >>> from jlab_archiver_client.follow import IntervalFollower
+    >>> follower = IntervalFollower(["channel1", "channel2"], capacity=10_000, lookback=timedelta(minutes=5))
+    >>> for new_events in follower.follow(interval=10):
+    ...     print(new_events)
+    ...     print(follower.data("channel1").tail())
+    {'channel1': 301, 'channel2': 4}
+    ...
+
+See Also:
+    jlab_archiver_client.interval: Interval class used for each incremental query
+"""
+import copy
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from jlab_archiver_client import utils
+from jlab_archiver_client.concurrency import AdaptiveLimiter
+from jlab_archiver_client.interval import Interval
+from jlab_archiver_client.query import IntervalQuery
+from jlab_archiver_client.transport import Transport
+
+__all__ = ["RingBuffer", "IntervalFollower"]
+
+
+class RingBuffer:
+    """Fixed-capacity buffer of the most recent events of one channel.
+
+    Timestamps are held as datetime64 and values in a NumPy array of the given dtype.  The types of non-update events
+    are held alongside, with None for updates.  Once full, each new event overwrites the oldest one.
+    """
+
+    def __init__(self, capacity: int, dtype: Any):
+        """Construct a RingBuffer.
+
+        Args:
+            capacity: The number of events kept
+            dtype: The NumPy dtype of the values.  float64 for numeric channels, otherwise object.
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least one, not {capacity}")
+        self.capacity = capacity
+        self._ts = np.empty(capacity, dtype="datetime64[ns]")
+        self._values = np.empty(capacity, dtype=dtype)
+        self._disconnects = np.full(capacity, None, dtype=object)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._values.dtype
+
+    def extend(self, ts: np.ndarray, values: np.ndarray, disconnects: np.ndarray) -> None:
+        """Append events in chronological order, dropping the oldest ones beyond capacity."""
+        # Only the newest capacity events can survive
+        ts, values, disconnects = ts[-self.capacity:], values[-self.capacity:], disconnects[-self.capacity:]
+        n = len(ts)
+        positions = (self._start + self._size + np.arange(n)) % self.capacity
+        self._ts[positions] = ts
+        self._values[positions] = values
+        self._disconnects[positions] = disconnects
+
+        overflow = max(self._size + n - self.capacity, 0)
+        self._start = (self._start + overflow) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def to_series(self, name: Optional[str] = None) -> pd.Series:
+        """Get the buffered values in chronological order, indexed by timestamp."""
+        order = self._order()
+        return pd.Series(self._values[order], index=pd.DatetimeIndex(self._ts[order]), name=name)
+
+    def disconnects(self, name: Optional[str] = None) -> pd.Series:
+        """Get the types of the buffered non-update events in chronological order, indexed by timestamp."""
+        order = self._order()
+        disconnects = self._disconnects[order]
+        keep = pd.notna(disconnects)
+        return pd.Series(disconnects[keep], index=pd.DatetimeIndex(self._ts[order][keep]), name=name, dtype=object)
+
+    def _order(self) -> np.ndarray:
+        """Get the positions of the buffered events from oldest to newest."""
+        return (self._start + np.arange(self._size)) % self.capacity
+
+
+class _Channel:
+    """What an IntervalFollower knows about one channel."""
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.buffer: Optional[RingBuffer] = None
+        self.metadata: Optional[Dict[str, Any]] = None
+        # The timestamp of the newest event seen and how many events were seen at exactly that time
+        self.last: Optional[np.datetime64] = None
+        self.seen_at_last = 0
+        # The end of the last successful query, used as the next begin until an event has been seen
+        self.checked: Optional[datetime] = None
+
+
+class IntervalFollower:
+    """Incrementally polls myquery's interval endpoint for the new events of many channels.
+
+    The first poll of a channel requests the lookback window before the poll time.  Later polls begin at the last
+    event seen (or at the end of the previous poll if there has been none) and only the events not seen before are
+    appended to the channel's RingBuffer.  The channels are queried concurrently.
+    """
+
+    def __init__(self, pvlist: List[str], capacity: int = 10_000, lookback: timedelta = timedelta(minutes=5),
+                 max_workers: Union[int, AdaptiveLimiter] = 8, url: Optional[str] = None,
+                 transport: Optional[Transport] = None, **kwargs):
+        """Construct an IntervalFollower.
+
+        Args:
+            pvlist: The channels to follow.  Duplicates are only followed once.
+            capacity: The number of most recent events kept per channel
+            lookback: How far before the first poll to request events
+            max_workers: The maximum number of concurrent queries, or an AdaptiveLimiter that adjusts it.
+            url: The location of the myquery/interval endpoint. Generated from config if None supplied.
+            transport: The Transport shared by all queries.  The shared default_transport is used if None supplied.
+            kwargs: The parameters of IntervalQuery other than channel, begin and end.  prior_point only applies to
+                    the first poll of each channel.
+
+        Raises:
+            ValueError when capacity is less than one, for integrated queries, which restart with every poll, or for
+            unix or server adjusted timestamps, which cannot be used as the local begin time of the next poll
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least one, not {capacity}")
+        if kwargs.get("integrate", False):
+            raise ValueError("Integrated queries cannot be followed since each poll would restart the integration")
+        if kwargs.get("unix_timestamps_ms", False) or kwargs.get("adjust_time_to_server_offset", False):
+            raise ValueError("Queries with unix or server adjusted timestamps cannot be followed since the next poll "
+                             "begins at the local time of the last event")
+
+        self.capacity = capacity
+        self.lookback = lookback
+        self.max_workers = max_workers
+        self.url = url
+        self.transport = transport
+        self.kwargs = {k: v for k, v in kwargs.items() if k not in ("channel", "begin", "end")}
+        self._channels = {pv: _Channel(pv) for pv in dict.fromkeys(pvlist)}
+
+        self._lock = threading.Lock()
+        self._polls = 0
+        self._queries = 0
+        self._events = 0
+        self._duplicates = 0
+
+    @property
+    def channels(self) -> List[str]:
+        """The channels being followed"""
+        return list(self._channels.keys())
+
+    def poll(self, end: Optional[datetime] = None) -> Dict[str, int]:
+        """Query every channel for the events since its last poll and append them to its buffer.
+
+        A channel whose query fails is left where it was and is caught up by the next poll.
+
+        Args:
+            end: The end of the queries.  Defaults to now.
+
+        Raises:
+            RequestException when a problem making one of the queries has occurred, after the other channels are
+            updated
+
+        Returns:
+            The number of new events of each channel
+        """
+        end = datetime.now() if end is None else end
+        states = list(self._channels.values())
+        counts = utils.run_in_parallel([partial(self._poll_channel, state, end) for state in states],
+                                       max_workers=self.max_workers)
+        with self._lock:
+            self._polls += 1
+        return {state.channel: count for state, count in zip(states, counts)}
+
+    def follow(self, interval: float, polls: Optional[int] = None) -> Iterator[Dict[str, int]]:
+        """Poll repeatedly, yielding the new event counts of each poll.
+
+        Args:
+            interval: The seconds from the start of one poll to the start of the next
+            polls: The number of polls to make.  Unbounded if None.
+        """
+        n = 0
+        while polls is None or n < polls:
+            start = time.monotonic()
+            yield self.poll()
+            n += 1
+            if polls is None or n < polls:
+                time.sleep(max(interval - (time.monotonic() - start), 0.0))
+
+    def data(self, channel: str) -> pd.Series:
+        """Get the buffered values of a channel in chronological order.  Non-update events are NaN or None."""
+        state = self._channels[channel]
+        if state.buffer is None:
+            return pd.Series([], index=pd.DatetimeIndex([]), name=channel, dtype=object)
+        return state.buffer.to_series(channel)
+
+    def disconnects(self, channel: str) -> pd.Series:
+        """Get the buffered non-update events of a channel in chronological order."""
+        state = self._channels[channel]
+        if state.buffer is None:
+            return pd.Series([], index=pd.DatetimeIndex([]), name=channel, dtype=object)
+        return state.buffer.disconnects(channel)
+
+    def metadata(self, channel: str) -> Optional[Dict[str, Any]]:
+        """Get the metadata of the most recent query of a channel, or None if it has not been polled."""
+        return self._channels[channel].metadata
+
+    def last(self) -> Dict[str, Optional[pd.Timestamp]]:
+        """Get the timestamp of the newest event seen for each channel, or None if none has been."""
+        return {pv: None if state.last is None else pd.Timestamp(state.last) for pv, state in self._channels.items()}
+
+    def stats(self) -> Dict[str, int]:
+        """Get a consistent snapshot of the poll counters."""
+        with self._lock:
+            return {'polls': self._polls, 'queries': self._queries, 'events': self._events,
+                    'duplicates': self._duplicates}
+
+    def _poll_channel(self, state: _Channel, end: datetime) -> int:
+        """Query one channel for its new events and append them to its buffer.  Returns the number appended."""
+        kwargs = copy.copy(self.kwargs)
+        if state.last is not None:
+            begin = pd.Timestamp(state.last).to_pydatetime()
+            kwargs["prior_point"] = False
+        elif state.checked is not None:
+            begin = state.checked
+            kwargs["prior_point"] = False
+        else:
+            begin = end - self.lookback
+        if begin > end:
+            return 0
+
+        query = IntervalQuery(state.channel, begin, end, **kwargs)
+        ts, values, disconnects, state.metadata = Interval(query, url=self.url, transport=self.transport).fetch_events()
+        state.checked = end
+        if len(ts) == 0:
+            with self._lock:
+                self._queries += 1
+            return 0
+
+        keep = np.ones(len(ts), dtype=bool)
+        if state.last is not None:
+            # Drop the events before the last one seen and as many at its timestamp as have already been seen
+            keep = ts > state.last
+            keep[np.flatnonzero(ts == state.last)[state.seen_at_last:]] = True
+        n = int(keep.sum())
+        with self._lock:
+            self._queries += 1
+            self._events += n
+            self._duplicates += len(ts) - n
+        if n == 0:
+            return 0
+
+        ts, values, disconnects = ts[keep], values[keep], disconnects[keep]
+        if state.buffer is None:
+            state.buffer = RingBuffer(self.capacity, np.float64 if values.dtype.kind in "iuf" else object)
+        state.buffer.extend(ts, values.astype(state.buffer.dtype), disconnects)
+
+        newest = ts[-1]
+        at_newest = int((ts == newest).sum())
+        state.seen_at_last = at_newest + (state.seen_at_last if newest == state.last else 0)
+        state.last = newest
+        return n
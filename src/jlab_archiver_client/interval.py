@@ -86,64 +86,110 @@ Examples:
         2019-08-12 01:00:01       3.0  [1565590000.0, 1565580000.0, 1565580000.0, 156...
         2019-08-12 01:14:06       0.0  [1565590000.0, 1565580000.0, 1565580000.0, 156...
 """ # noqa: E501
-import concurrent
+import copy
+import math
+import queue
+import threading
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
-from typing import Optional, Dict, List, Tuple
+from datetime import timedelta
+from typing import Optional, Dict, List, Tuple, Any, Sequence, Union, Iterator
 
 import numpy as np
 import pandas as pd
-import requests
 
 from jlab_archiver_client import utils
+from jlab_archiver_client.cache import IntervalCache
+from jlab_archiver_client.concurrency import AdaptiveLimiter
 from jlab_archiver_client.config import config
-from jlab_archiver_client.exceptions import MyqueryException
-from jlab_archiver_client.query import IntervalQuery
+from jlab_archiver_client.point import Point
+from jlab_archiver_client.query import IntervalQuery, PointQuery
+from jlab_archiver_client.streaming import IntervalStreamParser
+from jlab_archiver_client.transport import Transport, default_transport
 
-__all__ = ["Interval"]
+__all__ = ["Interval", "IntervalResults"]
 
-class Interval:
-    """A class for running calls to myquery's interval endpoint.
+# Bytes read from the response at a time when parsing a streamed interval response
+_CHUNK_SIZE = 256 * 1024
 
-    Values of the PV updates are stored as a pandas Series object in the data
-    field.  Non-update events are stored as None to allow better automatic type
-    detection by pandas.  Diconnect events are stored as a pandas Series in the
-    disconnects field.  Other response metadata is available in the metadata
-    field.
+# The forms of data returned by Interval.run_bulk
+_OUTPUTS = ("series", "long", "wide")
 
-    The interval endpoint is intended for retrieving the mya events over the
-    requested time interval.
+# The forms of the chunks yielded by Interval.iter_chunks
+_CHUNK_OUTPUTS = ("frame", "records")
+
+# Parsed pieces of a response buffered per shard by Interval.iter_chunks before the reader waits for the consumer
+_PIECES_AHEAD = 4
+
+# Seconds between checks for a stopped iteration while a reader waits for the consumer
+_STOP_POLL = 0.1
+
+
+class _BoundaryFilter:
+    """Drops the events that a shard shares with the shards before it.
+
+    Adjacent shards both include the time of their boundary, so events at that time are returned by both.  Since
+    timestamps are only shown to frac_time_digits, other events in the same displayed second (at the default precision)
+    also share the timestamp of the last event of the previous shard, so comparing timestamps alone would drop them.
+    Instead, only as many events at that timestamp as were already kept are dropped from the next shard.
+
+    Call start_shard before the events of each shard, then keep with its events in chronological order, in one or more
+    pieces.
     """
 
-    def __init__(self, query: IntervalQuery, url: Optional[str] = None):
-        """Construct an instance for running a myquery interval.
+    def __init__(self):
+        # The newest timestamp kept and the number of events kept at exactly that time
+        self.last: Optional[np.datetime64] = None
+        self.at_last = 0
+        self._boundary: Optional[np.datetime64] = None
+        self._duplicates = 0
+
+    def start_shard(self) -> None:
+        """Expect the events of the next shard."""
+        self._boundary = self.last
+        self._duplicates = self.at_last
+
+    def keep(self, ts: np.ndarray) -> np.ndarray:
+        """Get a mask of the events not already returned by a previous shard, and count the kept events as seen."""
+        keep = np.ones(len(ts), dtype=bool)
+        if self._boundary is not None:
+            keep = ts > self._boundary
+            at_boundary = np.flatnonzero(ts == self._boundary)
+            dropped = min(self._duplicates, len(at_boundary))
+            keep[at_boundary[dropped:]] = True
+            self._duplicates -= dropped
+
+        kept = ts[keep]
+        if len(kept) > 0:
+            newest = kept[-1]
+            at_newest = int((kept == newest).sum())
+            self.at_last = at_newest + (self.at_last if newest == self.last else 0)
+            self.last = newest
+        return keep
+
+
+class IntervalResults:
+    """The results of a myquery interval query and the processing of a response into them.
+
+    Holds the data, vectors, disconnects, and metadata fields described by Interval.  Shared by Interval and the
+    asyncio AsyncInterval, which differ only in how the response is requested.
+    """
+
+    def __init__(self, query: IntervalQuery):
+        """Construct an instance holding no results yet.
 
         Args:
-            query: The query to run
-            url: The location of the myquery/interval endpoint. Generated from config if None supplied.
+            query: The query whose results are held
         """
         self.query = query
-        self.url = url
-        if url is None:
-            self.url = f"{config.protocol}://{config.myquery_server}{config.interval_path}"
 
         self.data: Optional[pd.Series] = None
+        self.vectors: Optional[utils.VectorArray] = None
         self.disconnects: Optional[pd.Series] = None
         self.metadata: Optional[Dict[str, object]] = None
 
-    def run(self):
-        """Run a web-based myquery interval query.  This supports querying only one PV at a time.
-
-        Raises:
-            RequestException when a problem making the query has occurred
-        """
-
-        opts = self.query.to_web_params()
-        r = requests.get(self.url, params=opts)
-
-        if r.status_code != requests.codes.OK:
-            raise requests.RequestException(f"Error contacting server. status={r.status_code} details={r.text}")
-
-        content = r.json()
+    def _process_response(self, content: Dict[str, Any]):
+        """Process the decoded JSON response from myquery into the data, disconnects, and metadata fields."""
         values = []
         ts = []
         disconnect_ts = []
@@ -158,111 +204,497 @@ class Interval:
                 ts.append(item['d'])
                 values.append(item['v'])
 
+        metadata = {}
+        for key, value in content.items():
+            if key != "data":
+                metadata[key] = value
+
+        self._set_results(values, ts, disconnect_values, disconnect_ts, metadata)
+
+    def _set_results(self, values: Sequence[Any], ts: Sequence[Any], disconnect_values: List[str],
+                     disconnect_ts: List[Any], metadata: Dict[str, Any]):
+        """Convert the parsed events into the data, disconnects, and metadata fields."""
         # Default value for empty series is in flux.  Future will have dtype of object.  Skips a deprecation warning.
         if len(disconnect_values) == 0:
             disconnects = pd.Series(disconnect_values, index=disconnect_ts, name=self.query.channel, dtype=object)
         else:
             disconnects = pd.Series(disconnect_values, index=disconnect_ts, name=self.query.channel)
 
-        metadata = {}
-        for key, value in content.items():
-            if key != "data":
-                metadata[key] = value
-
-        self.data = utils.convert_data_to_series(values, ts, self.query.channel, metadata, self.query.enums_as_strings)
+        self.vectors = utils.convert_vector_data(values, ts, metadata, self.query.enums_as_strings)
+        if self.vectors is None:
+            self.data = utils.convert_data_to_series(values, ts, self.query.channel, metadata,
+                                                     self.query.enums_as_strings)
+        else:
+            self.data = self.vectors.to_series(self.query.channel)
         self.disconnects = disconnects
         self.metadata = metadata
 
     @staticmethod
-    def create_queries() -> List[IntervalQuery]:
-        """Create a list of IntervalQueries, one per PV, with otherwise identical parameters.
+    def _combine_series(series: List[pd.Series]) -> pd.DataFrame:
+        """Combine multiple series of PV history into a single DataFrame with shared DateTime Index.
 
-        See IntervalQuery for required parameters.
+        The series are concat'ed together and sorted so that rows appear in chronological order.  Missing values are
+        forward filled, but NaNs in the original data are preserved and forward filled as well.  The names of the
+        Series are used as column names in the resulting DataFrame.
+
+        Note: Series are assumed to have a DateTime index.
+
+        Args:
+            series: A list of Series objects to combine
+
+        Return:
+            A DataFrame of the combined Series objects.
         """
+        df = pd.concat(series, axis=1).sort_index().ffill()
 
-    @staticmethod
-    def run_parallel(pvlist: List[str], max_workers: int = 4, **kwargs) -> Tuple[
-        pd.DataFrame, Dict[str, pd.Series], dict]:
-        """Run multiple IntervalQueries in parallel.  The web endpoint does not support multiple PVs in a single query.
+        for s in series:
+            # Find where there is non-update values (None/NaN)
+            nan_mask = s.isnull().to_numpy()
 
-        All queries will have the same options other than channel, which is pulled from pvlist.  prior_point is forced
-        to True to ensure that we can intelligently fill NaN values from merging the disparate time stamps.
+            # Add back any missing NaNs from the original data
+            if nan_mask.any():
+                if not s.index.is_monotonic_increasing:
+                    order = np.argsort(s.index.to_numpy(), kind="stable")
+                    nan_mask = nan_mask[order]
+                    s_index = s.index[order]
+                else:
+                    s_index = s.index
+
+                # For each row, find the most recent update of this series at or before it.  Rows before the first
+                # update have no prior value (position -1) and are left alone.
+                pos = s_index.searchsorted(df.index, side="right") - 1
+                restore = (pos >= 0) & nan_mask[np.maximum(pos, 0)]
+
+                # Any row whose most recent update was an NaN is an NaN until the next "real" update.
+                df.loc[restore, s.name] = np.nan
+
+        return df
+
+
+class Interval(IntervalResults):
+    """A class for running calls to myquery's interval endpoint.
+
+    Values of the PV updates are stored as a pandas Series object in the data
+    field.  Non-update events are stored as None to allow better automatic type
+    detection by pandas.  Diconnect events are stored as a pandas Series in the
+    disconnects field.  Other response metadata is available in the metadata
+    field.
+
+    For numeric vector (waveform) channels, the values are also available as a
+    single contiguous 2D array with a mask of missing entries in the vectors
+    field.  The arrays in the data Series are views into that block.
+
+    The interval endpoint is intended for retrieving the mya events over the
+    requested time interval.
+    """
+
+    def __init__(self, query: IntervalQuery, url: Optional[str] = None, transport: Optional[Transport] = None,
+                 shards: int = 1, max_workers: Union[int, AdaptiveLimiter, None] = None,
+                 cache: Optional[IntervalCache] = None):
+        """Construct an instance for running a myquery interval.
 
         Args:
-            pvlist: A list of PVs to queries
-            max_workers: The maximum number of concurrent queries to run in parallel.
+            query: The query to run
+            url: The location of the myquery/interval endpoint. Generated from config if None supplied.
+            transport: The Transport used to make requests.  The shared default_transport is used if None supplied.
+            shards: The number of contiguous sub-ranges to split the query's time range into.  Shards are fetched
+                    concurrently and stitched back together.  Note that bin_limit and sample_type apply per shard.
+            max_workers: The maximum number of shards fetched at once, or an AdaptiveLimiter that adjusts it.
+                         Defaults to the number of shards.
+            cache: An IntervalCache holding previously fetched events.  Only the time ranges it does not cover are
+                   requested, concurrently (up to max_workers) instead of in shards.  Queries the cache does not
+                   support are run as usual.
+
+        Raises:
+            ValueError when shards is less than one, or when shards are requested for an integrated query
+        """
+        if shards < 1:
+            raise ValueError(f"shards must be at least one, not {shards}")
+        if shards > 1 and query.integrate:
+            raise ValueError("Integrated queries cannot be sharded since each shard would restart the integration")
+
+        super().__init__(query)
+        self.url = url
+        if url is None:
+            self.url = f"{config.protocol}://{config.myquery_server}{config.interval_path}"
+        self.transport = default_transport if transport is None else transport
+        self.shards = shards
+        self.max_workers = shards if max_workers is None else max_workers
+        self.cache = cache
+
+    def run(self):
+        """Run a web-based myquery interval query.  This supports querying only one PV at a time.
 
         Raises:
-            MyqueryException when a problem with one or more queries has occurred
+            RequestException when a problem making the query has occurred
+        """
+        if self.cache is not None and self.cache.supports(self.query):
+            self._set_results(*self.cache.get(self.url, self.query, self._fetch, self._fetch_prior,
+                                              max_workers=self.max_workers))
+            return
+
+        if self.shards > 1:
+            self._run_shards()
+            return
+
+        parser = self._fetch(self.query)
+        self._set_results(parser.values.to_array(), parser.ts.to_array(), parser.disconnect_values,
+                          parser.disconnect_ts, parser.metadata)
+
+    def fetch_events(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """Request the query once and return its events as arrays.  The results fields are not set.
+
+        Neither shards nor the cache are used.  Values are converted as they are for the data field.
 
         Returns:
-            A Pandas DataFrame of the combined PVs, a dictionry of per-channel disconnect series (keyed on channels),
-            and a dictionary of per-channel metadata (keyed on channel)
+            The datetime64 timestamps, values and disconnect types (None for updates) of the events, and the response
+            metadata
+
+        Raises:
+            RequestException when a problem making the query has occurred
         """
-        if "channel" in kwargs.keys():
-            del kwargs["channel"]
-        kwargs["prior_point"] = True
+        parser = self._fetch(self.query)
+        events = self._drain_piece(parser, self.query)
+        if events is None:
+            events = (np.empty(0, dtype="datetime64[ns]"), np.empty(0, dtype=object), np.empty(0, dtype=object))
+        return (*events, parser.metadata)
 
-        queries = []
-        for pv in pvlist:
-            queries.append(IntervalQuery(pv, **kwargs))
+    def iter_chunks(self, chunk_size: int = 100_000, output: str = "frame",
+                    prefetch: int = 1) -> Iterator[Union[pd.DataFrame, np.recarray]]:
+        """Iterate over the events of the query in chunks of a fixed number of events, with bounded memory.
 
-        out = {}
+        Chunks are yielded while the response is still being read.  When the instance has shards, the shards are read
+        in order and up to prefetch later shards are fetched in the background while the current one is consumed.
+        Each shard buffers at most a few pieces of its response ahead of the consumer, so memory use depends on
+        chunk_size and prefetch but not on the length of the time range.  An event on the boundary between two shards
+        is only yielded once.  The cache is not used.
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = []
-            for query in queries:
-                out[query.channel] = Interval(query)
-                futures.append(executor.submit(out[query.channel].run))
+        Unlike the data field, values of integer channels are float64 (NaN for non-update events) in every chunk since
+        later events are not known when a chunk is yielded.  Vector values are arrays, as in the data field.
 
-            # The futures won't hold results, only the status of the jobs.  Look at out for future.
-            done, not_done = concurrent.futures.wait(futures, return_when=concurrent.futures.ALL_COMPLETED)
+        Args:
+            chunk_size: The number of events per chunk.  The last chunk may be shorter.
+            output: The form of each chunk:
+                    "frame": a DataFrame indexed by timestamp with value and disconnect columns.  disconnect holds the
+                    type of non-update events and None for updates.
+                    "records": a NumPy record array with timestamp, value and disconnect fields.
+            prefetch: The number of later shards fetched while the current one is consumed
 
-        if len(not_done) > 0:
-            raise MyqueryException("Some PV queries did not complete.")
+        Raises:
+            ValueError when chunk_size or prefetch is out of range or output is not one of the supported forms
+            RequestException when a problem making the query has occurred
 
-        data = Interval._combine_series([out[channel].data for channel in out.keys()])
-        disconnects = {channel: out[channel].disconnects for channel in out.keys()}
-        metadata = {channel: out[channel].metadata for channel in out.keys()}
+        Returns:
+            An iterator over the chunks in chronological order
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least one, not {chunk_size}")
+        if prefetch < 0:
+            raise ValueError(f"prefetch must be at least zero, not {prefetch}")
+        if output not in _CHUNK_OUTPUTS:
+            raise ValueError(f"output must be one of {_CHUNK_OUTPUTS}")
+
+        # Validate eagerly, then hand back the generator
+        return self._iter_chunks(chunk_size, output, prefetch)
+
+    def _iter_chunks(self, chunk_size: int, output: str,
+                     prefetch: int) -> Iterator[Union[pd.DataFrame, np.recarray]]:
+        """Generate the chunks of iter_chunks."""
+        queries = self._shard_queries() if self.shards > 1 else [self.query]
+        stop = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=prefetch + 1)
+
+        def start(query: IntervalQuery) -> queue.Queue:
+            pieces = queue.Queue(maxsize=_PIECES_AHEAD)
+            pool.submit(self._stream_pieces, query, pieces, stop)
+            return pieces
+
+        try:
+            # Only prefetch + 1 shards are started at a time, so their readers always include the one being consumed
+            streams = deque(start(query) for query in queries[:prefetch + 1])
+            pending = []
+            size = 0
+            # Events on the boundary between two shards may be returned by both of them
+            boundary = _BoundaryFilter()
+            for i in range(len(queries)):
+                pieces = streams.popleft()
+                if i + prefetch + 1 < len(queries):
+                    streams.append(start(queries[i + prefetch + 1]))
+
+                boundary.start_shard()
+                while (piece := pieces.get()) is not None:
+                    if isinstance(piece, Exception):
+                        raise piece
+                    keep = boundary.keep(piece[0])
+                    piece = tuple(column[keep] for column in piece)
+                    if len(piece[0]) == 0:
+                        continue
+
+                    pending.append(piece)
+                    size += len(piece[0])
+                    while size >= chunk_size:
+                        events = tuple(np.concatenate(columns) for columns in zip(*pending))
+                        pending = [tuple(column[chunk_size:] for column in events)]
+                        size -= chunk_size
+                        yield self._format_chunk(tuple(column[:chunk_size] for column in events), output)
+
+            if size > 0:
+                yield self._format_chunk(tuple(np.concatenate(columns) for columns in zip(*pending)), output)
+        finally:
+            # Also reached when the caller stops iterating early.  Readers notice and close their responses.
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _stream_pieces(self, query: IntervalQuery, pieces: queue.Queue, stop: threading.Event):
+        """Read a query's response and put its events on a queue in pieces as they are parsed.
+
+        The pieces are followed by None when the response is complete, or by the exception that ended the read.
+        """
+        try:
+            parser = IntervalStreamParser(enums_as_strings=query.enums_as_strings)
+            with self.transport.get(self.url, params=query.to_web_params(), stream=True) as r:
+                for chunk in r.iter_content(chunk_size=_CHUNK_SIZE):
+                    if stop.is_set():
+                        return
+                    parser.feed(chunk)
+                    if not self._put_piece(pieces, self._drain_piece(parser, query), stop):
+                        return
+            parser.close()
+            if self._put_piece(pieces, self._drain_piece(parser, query), stop):
+                self._put_piece(pieces, None, stop, force=True)
+        except Exception as exc:  # Handed to the consumer, which raises it
+            self._put_piece(pieces, exc, stop, force=True)
 
-        return data, disconnects, metadata
+    @staticmethod
+    def _drain_piece(parser: IntervalStreamParser,
+                     query: IntervalQuery) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Take the parsed events from a parser as timestamp, value and disconnect arrays, or None if there are none."""
+        ts, values, disconnect_index, disconnect_values = parser.drain()
+        if len(ts) == 0:
+            return None
+
+        vectors = utils.convert_vector_data(values, ts, parser.metadata, query.enums_as_strings)
+        if vectors is not None:
+            values = vectors.to_series("value").to_numpy()
+        disconnects = np.full(len(ts), None, dtype=object)
+        disconnects[disconnect_index] = disconnect_values
+        return utils.to_datetime_index(ts).to_numpy(), values, disconnects
 
     @staticmethod
-    def _combine_series(series: List[pd.Series]) -> pd.DataFrame:
-        """Combine multiple series of PV history into a single DataFrame with shared DateTime Index.
+    def _put_piece(pieces: queue.Queue, piece: Any, stop: threading.Event, force: bool = False) -> bool:
+        """Wait for room on the queue and put a piece on it.  Returns False if the iteration was stopped instead.
 
-        The series are concat'ed together and sorted so that rows appear in chronological order.  Missing values are
-        forward filled, but NaNs in the original data are preserved and forward filled as well.  The names of the
-        Series are used as column names in the resulting DataFrame.
+        Empty pieces are skipped unless force is True.
+        """
+        if piece is None and not force:
+            return True
+        while not stop.is_set():
+            try:
+                pieces.put(piece, timeout=_STOP_POLL)
+                return True
+            except queue.Full:
+                pass
+        return False
 
-        Note: Series are assumed to have a DateTime index.
+    @staticmethod
+    def _format_chunk(events: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                      output: str) -> Union[pd.DataFrame, np.recarray]:
+        """Build a chunk of iter_chunks from timestamp, value and disconnect arrays."""
+        ts, values, disconnects = events
+        if output == "records":
+            return np.rec.fromarrays([ts, values, disconnects], names=["timestamp", "value", "disconnect"])
+        return pd.DataFrame({'value': values, 'disconnect': disconnects}, index=pd.DatetimeIndex(ts, name="timestamp"))
+
+    def _fetch(self, query: IntervalQuery) -> IntervalStreamParser:
+        """Request a query from myquery and parse the response."""
+        # Parse the response as it arrives instead of holding the whole body and its decoded form in memory
+        parser = IntervalStreamParser(enums_as_strings=query.enums_as_strings)
+        with self.transport.get(self.url, params=query.to_web_params(), stream=True) as r:
+            for chunk in r.iter_content(chunk_size=_CHUNK_SIZE):
+                parser.feed(chunk)
+        parser.close()
+        return parser
+
+    def _fetch_prior(self, query: IntervalQuery) -> Optional[Dict[str, Any]]:
+        """Get the last event before the begin time of a query from the point endpoint, or None if there is none."""
+        point = Point(PointQuery(query.channel, query.begin, deployment=query.deployment,
+                                 frac_time_digits=query.frac_time_digits, sig_figs=query.sig_figs,
+                                 data_updates_only=query.data_updates_only, exclude_given_time=True,
+                                 enums_as_strings=query.enums_as_strings), transport=self.transport)
+        point.run()
+        event = point.event.get('data')
+        return event if event else None
+
+    def _shard_queries(self) -> List[IntervalQuery]:
+        """Split the query into contiguous sub-queries.
+
+        myquery only accepts whole seconds, so the boundaries between shards are placed on whole seconds as well.  Only
+        the first shard keeps the prior_point option since the others pick up where the previous shard left off.
+        """
+        begin = self.query.begin.replace(microsecond=0)
+        span = math.ceil((self.query.end - begin).total_seconds())
+        step = max(math.ceil(span / self.shards), 1)
+        boundaries = [begin + timedelta(seconds=step * i) for i in range(1, self.shards)]
+        boundaries = [b for b in boundaries if b < self.query.end]
+
+        queries = []
+        for i, (b, e) in enumerate(zip([self.query.begin] + boundaries, boundaries + [self.query.end])):
+            query = copy.copy(self.query)
+            query.begin = b
+            query.end = e
+            if i > 0:
+                query.prior_point = False
+            queries.append(query)
+
+        return queries
+
+    def _run_shards(self):
+        """Fetch each shard concurrently and stitch the results together in chronological order."""
+        shards = [Interval(query, url=self.url, transport=self.transport) for query in self._shard_queries()]
+        utils.run_in_parallel([shard.run for shard in shards], max_workers=self.max_workers)
+
+        data = []
+        vectors = []
+        disconnects = []
+        # Events on the boundary between two shards may be returned by both of them.  Disconnects are a subset of the
+        # events, so their duplicates are counted separately.
+        data_filter = _BoundaryFilter()
+        disconnect_filter = _BoundaryFilter()
+        for shard in shards:
+            data_filter.start_shard()
+            disconnect_filter.start_shard()
+            keep = data_filter.keep(shard.data.index.to_numpy())
+            shard_data = shard.data[keep]
+            shard_vectors = shard.vectors
+            if shard_vectors is not None:
+                shard_vectors = utils.VectorArray(shard_vectors.index[keep], shard_vectors.values[keep],
+                                                  shard_vectors.mask[keep])
+            shard_disconnects = shard.disconnects[
+                disconnect_filter.keep(utils.to_datetime_index(shard.disconnects.index).to_numpy())]
+
+            # Skip empty shards.  Their object dtype would otherwise be forced onto the combined Series.
+            if len(shard_data) > 0:
+                data.append(shard_data)
+                if shard_vectors is not None:
+                    vectors.append(shard_vectors)
+            if len(shard_disconnects) > 0:
+                disconnects.append(shard_disconnects)
+
+        self.data = pd.concat(data) if len(data) > 0 else shards[0].data
+        self.vectors = utils.concat_vector_arrays(vectors) if len(vectors) > 0 else shards[0].vectors
+        self.disconnects = pd.concat(disconnects) if len(disconnects) > 0 else shards[0].disconnects
+
+        self.metadata = dict(shards[0].metadata)
+        if "sampled" in self.metadata:
+            self.metadata["sampled"] = any(shard.metadata.get("sampled", False) for shard in shards)
+        self.metadata["returnCount"] = len(self.data)
+
+    @staticmethod
+    def create_queries(pvlist: List[str], **kwargs) -> List[IntervalQuery]:
+        """Create a list of IntervalQueries, one per PV, with otherwise identical parameters.
+
+        See IntervalQuery for required parameters.
 
         Args:
-            series: A list of Series objects to combine
+            pvlist: The PVs to query.  Duplicates are only queried once.
+            kwargs: The parameters of IntervalQuery other than channel, which is ignored if given.
 
-        Return:
-            A DataFrame of the combined Series objects.
+        Returns:
+            The queries in the order of pvlist
         """
-        df = pd.concat(series, axis=1).sort_index().ffill()
+        kwargs = {k: v for k, v in kwargs.items() if k != "channel"}
+        return [IntervalQuery(pv, **kwargs) for pv in dict.fromkeys(pvlist)]
 
-        for s in series:
-            # Find where there is non-update values (None/NaN)
-            nan_mask = s.isnull()
+    @staticmethod
+    def run_bulk(pvlist: List[str], output: str = "series", max_workers: Union[int, AdaptiveLimiter] = 4,
+                 transport: Optional[Transport] = None, cache: Optional[IntervalCache] = None,
+                 **kwargs) -> Tuple[Any, Dict[str, pd.Series], Dict[str, dict]]:
+        """Run an IntervalQuery for each of many PVs concurrently and return the events in the requested form.
 
-            # Add back any missing NaNs from the original data
-            if sum(nan_mask) > 0:
-                # This identifies all the timestamps following an NaN.  If the last value is NaN, then the following
-                # timestamp will be pd.NaT (not a time)
-                next_ts = s.index.to_series().shift(-1)
-
-                # For each row, check if it was originally an NaN, then add back in the NaNs.
-                for idx, is_true in nan_mask.items():
-                    if is_true:
-                        # idx is the last row so we go to the end
-                        if next_ts[idx] is pd.NaT:
-                            df.loc[df.index >= idx, s.name] = np.nan
-                        else:
-                            # Fill in any value between "here" and the next "real" update.
-                            df.loc[(df.index >= idx) & (df.index < next_ts[idx]), s.name] = np.nan
+        Queries are built with create_queries and share one pooled transport.  Unlike run_parallel, the query options
+        are used as given and the results are only merged if asked for, so callers that want the raw events of each
+        channel do not pay for aligning them on a common index.
 
-        return df
+        Args:
+            pvlist: The PVs to query
+            output: The form of the returned data:
+                    "series": a dictionary of the data Series of each channel, exactly as Interval.run produces it.
+                    "long": a DataFrame of every event with timestamp, channel (categorical) and value columns, sorted
+                    by timestamp.  Events of different channels at the same time keep the order of pvlist.
+                    "wide": a DataFrame with a column per channel on the union of all timestamps, forward filled as
+                    by run_parallel.
+            max_workers: The maximum number of concurrent queries, or an AdaptiveLimiter that adjusts it.
+            transport: The Transport shared by all queries.  The shared default_transport is used if None supplied.
+            cache: An IntervalCache shared by all queries.  No caching is done if None supplied.
+            kwargs: The parameters of IntervalQuery other than channel
+
+        Raises:
+            ValueError when output is not one of the supported forms
+            RequestException when a problem making one of the queries has occurred
+
+        Returns:
+            The data in the requested form, a dictionary of per-channel disconnect series, and a dictionary of
+            per-channel metadata, both keyed on channel
+        """
+        if output not in _OUTPUTS:
+            raise ValueError(f"output must be one of {_OUTPUTS}")
+
+        intervals = {query.channel: Interval(query, transport=transport, cache=cache)
+                     for query in Interval.create_queries(pvlist, **kwargs)}
+        utils.run_in_parallel([interval.run for interval in intervals.values()], max_workers=max_workers)
+
+        series = {channel: interval.data for channel, interval in intervals.items()}
+        disconnects = {channel: interval.disconnects for channel, interval in intervals.items()}
+        metadata = {channel: interval.metadata for channel, interval in intervals.items()}
+        if output == "long":
+            data = Interval._long_table(series)
+        elif output == "wide":
+            data = Interval._combine_series(list(series.values()))
+        else:
+            data = series
+
+        return data, disconnects, metadata
+
+    @staticmethod
+    def run_parallel(pvlist: List[str], max_workers: Union[int, AdaptiveLimiter] = 4,
+                     transport: Optional[Transport] = None, cache: Optional[IntervalCache] = None,
+                     **kwargs) -> Tuple[pd.DataFrame, Dict[str, pd.Series], dict]:
+        """Run multiple IntervalQueries in parallel.  The web endpoint does not support multiple PVs in a single query.
+
+        All queries will have the same options other than channel, which is pulled from pvlist.  prior_point is forced
+        to True to ensure that we can intelligently fill NaN values from merging the disparate time stamps.  Use
+        run_bulk for the events of each channel without merging them.
+
+        Args:
+            pvlist: A list of PVs to queries
+            max_workers: The maximum number of concurrent queries to run in parallel, or an AdaptiveLimiter that
+                         adjusts it from the latency and failures of the queries.
+            transport: The Transport shared by all queries.  The shared default_transport is used if None supplied.
+            cache: An IntervalCache shared by all queries.  No caching is done if None supplied.
+
+        Raises:
+            RequestException when a problem making one or more queries has occurred
+
+        Returns:
+            A Pandas DataFrame of the combined PVs, a dictionry of per-channel disconnect series (keyed on channels),
+            and a dictionary of per-channel metadata (keyed on channel)
+        """
+        kwargs["prior_point"] = True
+        return Interval.run_bulk(pvlist, output="wide", max_workers=max_workers, transport=transport, cache=cache,
+                                 **kwargs)
+
+    @staticmethod
+    def _long_table(series: Dict[str, pd.Series]) -> pd.DataFrame:
+        """Stack the data Series of several channels into one table of events sorted by timestamp."""
+        channels = list(series.keys())
+        frames = [pd.DataFrame({'timestamp': s.index, 'value': s.to_numpy()}) for s in series.values()]
+        lengths = [len(frame) for frame in frames]
+        if len(frames) == 0:
+            return pd.DataFrame({'timestamp': pd.DatetimeIndex([]),
+                                 'channel': pd.Categorical([], categories=channels), 'value': []})
+
+        table = pd.concat(frames, ignore_index=True)
+        codes = np.repeat(np.arange(len(channels)), lengths)
+        table.insert(1, 'channel', pd.Categorical.from_codes(codes, categories=channels))
+        order = np.argsort(table['timestamp'].to_numpy(), kind="stable")
+        return table.take(order).reset_index(drop=True)
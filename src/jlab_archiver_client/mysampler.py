@@ -67,73 +67,47 @@ See Also:
     jlab_archiver_client.query.MySamplerQuery: Query builder for mysampler requests
     jlab_archiver_client.config: Configuration settings for archiver endpoints
 """ # noqa: E501
-from typing import Optional, Dict
+import copy
+import math
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Union
+from urllib.parse import urlencode
 
 import pandas as pd
-import requests
 
-from jlab_archiver_client import utils
+from jlab_archiver_client import decoding, utils
+from jlab_archiver_client.concurrency import AdaptiveLimiter
 from jlab_archiver_client.query import MySamplerQuery
 from jlab_archiver_client.config import config
+from jlab_archiver_client.transport import Transport, default_transport
 
 
-__all__ = ["MySampler"]
+__all__ = ["MySampler", "MySamplerResults"]
 
 
-class MySampler:
-    """A class for running a myquery mysampler request and holding the results.
-
-    Data from all PVs are stored the data field as a single DataFrame as they
-    share a common time index.  Non-update events are stored as None in the
-    data field.  This should allow pandas automatic type detection to work
-    in the case of non-update events.
+class MySamplerResults:
+    """The results of a myquery mysampler query and the processing of a response into them.
 
-    The diconnects field contains a dictionary that is keyed on each PV with
-    values that are a Series of only the disconnect events.  The values of this
-    Series contain the original text associated with the non-update events.
-
-    Additional metadata from the myquery/mysampler response is contained in a
-    dictionary under the metadata field.
-
-    The mysampler endpoint is intended to provide the value of a set of PVs at
-    regularly spaced time intervals.
+    Holds the data, disconnects, and metadata fields described by MySampler.  Shared by MySampler and the asyncio
+    AsyncMySampler, which differ only in how the response is requested.
     """
 
-    def __init__(self, query: MySamplerQuery, url: Optional[str] = None):
-        """Construct an instance for running a mysampler query.
+    def __init__(self, query: MySamplerQuery):
+        """Construct an instance holding no results yet.
 
         Args:
-            query: The query to run
-            url: The location of the mysampler endpoint.  Generated from config if None supplied.
+            query: The query whose results are held
         """
         self.query = query
-        self.url = url
-        if url is None:
-            self.url = f"{config.protocol}://{config.myquery_server}{config.mysampler_path}"
 
         self.data: Optional[pd.DataFrame] = None
         self.disconnects: Optional[Dict[str, pd.Series]] = None
         self.metadata: Optional[Dict[str, object]] = None
 
-    def run(self):
-        """Run a web-based mysampler query.
-
-        Results will be stored in the data, disconnects, and metadata fields.
-
-        Raises:
-            RequestException when a problem making the query has occurred
-        """
-
-        # Make the request
-        opts = self.query.to_web_params()
-        r = requests.get(self.url, params=opts)
-
-        # Check if we have any errors
-        if r.status_code != requests.codes.OK:
-            raise requests.RequestException(f"Error contacting server. status={r.status_code} details={r.text}")
-
+    def _process_response(self, content: Dict[str, Any]):
+        """Process the decoded JSON response from myquery into the data, disconnects, and metadata fields."""
         # Single top level key is channels
-        channels = r.json()['channels']
+        channels = content['channels']
 
         # This will hold the information for the data, disconnects, and metadata fields respectively
         samples = {'Date': []}
@@ -173,3 +147,131 @@ class MySampler:
         self.data = utils.convert_data_to_dataframe(samples, metadata, self.query.enums_as_strings)
         self.disconnects = disconnects
         self.metadata = metadata
+
+
+class MySampler(MySamplerResults):
+    """A class for running a myquery mysampler request and holding the results.
+
+    Data from all PVs are stored the data field as a single DataFrame as they
+    share a common time index.  Non-update events are stored as None in the
+    data field.  This should allow pandas automatic type detection to work
+    in the case of non-update events.
+
+    The diconnects field contains a dictionary that is keyed on each PV with
+    values that are a Series of only the disconnect events.  The values of this
+    Series contain the original text associated with the non-update events.
+
+    Additional metadata from the myquery/mysampler response is contained in a
+    dictionary under the metadata field.
+
+    The mysampler endpoint is intended to provide the value of a set of PVs at
+    regularly spaced time intervals.
+
+    Large pvlists are split into batches that are requested concurrently.  A
+    batch holds at most batch_size PVs and its request URL is no longer than
+    config.max_url_length.  Queries for many samples can also be split into
+    shards, i.e., contiguous windows of the sample times that are requested
+    concurrently.  The results are the same as for a single request.
+    """
+
+    def __init__(self, query: MySamplerQuery, url: Optional[str] = None, transport: Optional[Transport] = None,
+                 batch_size: Optional[int] = None, max_workers: Union[int, AdaptiveLimiter] = 4, shards: int = 1):
+        """Construct an instance for running a mysampler query.
+
+        Args:
+            query: The query to run
+            url: The location of the mysampler endpoint.  Generated from config if None supplied.
+            transport: The Transport used to make requests.  The shared default_transport is used if None supplied.
+            batch_size: The most PVs requested at once.  Only the URL length limits batches if None supplied.
+            max_workers: The maximum number of requests made at once, or an AdaptiveLimiter that adjusts it.
+            shards: The number of windows of sample times to split the query into.  Each window is converted as it
+                    arrives, but the results of every window are kept until they are concatenated, so peak memory
+                    still follows the size of the whole query.
+        """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+
+        super().__init__(query)
+        self.url = url
+        if url is None:
+            self.url = f"{config.protocol}://{config.myquery_server}{config.mysampler_path}"
+        self.transport = default_transport if transport is None else transport
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.shards = shards
+
+    def run(self):
+        """Run a web-based mysampler query.
+
+        Results will be stored in the data, disconnects, and metadata fields.
+
+        Raises:
+            RequestException when a problem making the query has occurred
+        """
+        if self.shards > 1:
+            self._run_shards()
+            return
+
+        # Request each batch of PVs, then merge the channels as though they came from a single response
+        contents = utils.run_in_parallel([lambda p=p: decoding.loads(self.transport.get(self.url, params=p).content)
+                                          for p in self._batch_params()], max_workers=self.max_workers)
+        channels = {}
+        for content in contents:
+            channels.update(content['channels'])
+
+        self._process_response({'channels': channels})
+
+    def _batch_params(self) -> List[Dict[str, Any]]:
+        """Return the web parameters of each batch of the pvlist."""
+        opts = self.query.to_web_params()
+        base_length = len(self.url) + len("?") + len(urlencode(dict(opts, c="")))
+        batches = utils.batch_pvlist(self.query.pvlist, self.batch_size, config.max_url_length - base_length)
+        return [dict(opts, c=",".join(batch)) for batch in batches]
+
+    def _shard_queries(self) -> List[MySamplerQuery]:
+        """Split the query into contiguous windows of sample times.
+
+        myquery only accepts whole seconds for the start of a query, so each window holds a multiple of the number of
+        samples that spans a whole number of seconds.  The sample times of every window then line up with those of the
+        full query.  A query for no samples is not split.
+        """
+        num_samples = self.query.num_samples
+        if num_samples < 1:
+            return [self.query]
+
+        start = datetime.fromisoformat(self.query.start)
+        interval = self.query.interval
+        align = 1000 // math.gcd(interval, 1000)
+        size = math.ceil(math.ceil(num_samples / self.shards) / align) * align
+
+        queries = []
+        for first in range(0, num_samples, size):
+            query = copy.copy(self.query)
+            query.start = (start + timedelta(milliseconds=first * interval)).isoformat(sep=" ")
+            query.num_samples = min(size, num_samples - first)
+            queries.append(query)
+
+        return queries
+
+    def _run_shards(self):
+        """Fetch each window concurrently and concatenate the results in chronological order."""
+        # The batches of each window are requested one at a time so that max_workers bounds the requests in flight
+        shards = [MySampler(query, url=self.url, transport=self.transport, batch_size=self.batch_size, max_workers=1)
+                  for query in self._shard_queries()]
+        utils.run_in_parallel([shard.run for shard in shards], max_workers=self.max_workers)
+
+        # A window with only non-update events for a channel has an object column, which would carry into the result
+        self.data = pd.concat([shard.data for shard in shards]).infer_objects()
+
+        disconnects = {}
+        for shard in shards:
+            for channel, series in shard.disconnects.items():
+                disconnects.setdefault(channel, []).append(series)
+        self.disconnects = {channel: pd.concat(series) for channel, series in disconnects.items()}
+
+        self.metadata = copy.deepcopy(shards[0].metadata)
+        for channel, metadata in self.metadata.items():
+            if "returnCount" in metadata:
+                metadata["returnCount"] = sum(shard.metadata[channel].get("returnCount", 0) for shard in shards)
@@ -104,40 +104,65 @@ See Also:
     jlab_archiver_client.query.MyStatsQuery: Query builder for mystats requests
     jlab_archiver_client.config: Configuration settings for archiver endpoints
 """# noqa: E501
+import copy
+import math
 import warnings
-from typing import Optional, Dict, Any
+from datetime import timedelta
+from typing import Optional, Dict, Any, List, NamedTuple, Union
+from urllib.parse import urlencode
 
+import numpy as np
 import pandas as pd
-import requests
 
+from jlab_archiver_client import decoding, utils
+from jlab_archiver_client.concurrency import AdaptiveLimiter
 from jlab_archiver_client.query import MyStatsQuery
 from jlab_archiver_client.config import config
+from jlab_archiver_client.transport import Transport, default_transport
 
-__all__ = ["MyStats"]
+__all__ = ["MyStats", "MyStatsResults", "StatsArray"]
 
+_LAYOUTS = ("long", "wide")
 
-class MyStats:
-    """A class for running a myquery mystats request and holding the results.  Only float PVs supported.
 
-    Statistics are stored in the data field.  This is a DataFrame with a MultiIndex on the start of the bin and the
-    metric name.
+class StatsArray(NamedTuple):
+    """The statistics of several channels held in one (bins x channels x stats) array.
 
-    Metadata is stored in a dictionary key on each channel.
+    Attributes:
+        index: The start of each bin
+        channels: The channel names along the second axis
+        stats: The statistic names along the third axis
+        values: A float64 array of shape (len(index), len(channels), len(stats)).  Missing statistics are NaN.
+    """
+    index: pd.DatetimeIndex
+    channels: List[str]
+    stats: List[str]
+    values: np.ndarray
 
-    The mystats endpoint is intended to provide the value of a set of PVs at regularly spaced time intervals.
+    def stat(self, name: str) -> pd.DataFrame:
+        """Return one statistic as a (bins x channels) DataFrame that shares memory with values."""
+        return pd.DataFrame(self.values[:, :, self.stats.index(name)], index=self.index, columns=self.channels)
+
+
+class MyStatsResults:
+    """The results of a myquery mystats query and the processing of a response into them.
+
+    Holds the data and metadata fields described by MyStats in the requested layout.  Shared by MyStats and the
+    asyncio AsyncMyStats, which differ only in how the response is requested.
     """
 
-    def __init__(self, query: MyStatsQuery, url: Optional[str] = None):
-        """Construct an instance for running a mystats query.
+    def __init__(self, query: MyStatsQuery, layout: str = "long"):
+        """Construct an instance holding no results yet.
 
         Args:
-            query: The query to run
-            url: The location of the mystats endpoint.  Generated from config if None supplied.
+            query: The query whose results are held
+            layout: The layout of the data field, either "long" or "wide".
         """
+        if layout not in _LAYOUTS:
+            raise ValueError(f"layout must be one of {_LAYOUTS}")
+
         self.query = query
-        self.url = url
-        if url is None:
-            self.url = f"{config.protocol}://{config.myquery_server}{config.mystats_path}"
+        self.layout = layout
 
         self.data: Optional[pd.DataFrame] = None
         self.metadata: Optional[Dict[str, object]] = None
@@ -145,22 +170,141 @@ class MyStats:
     @staticmethod
     def _channel_series(channel_obj: Dict[str, Any]):
         """Return a Series indexed by (timestamp, stat) holding the metric values."""
-        tuples, vals = [], []
+        records = channel_obj["data"]
 
         # Look at the first entry to determine what metrics to include
-        metrics = []
-        for key in channel_obj["data"][0].keys():
-            if key != "begin":
-                metrics.append(key)
-        metrics = sorted(metrics)
-
-        for rec in channel_obj["data"]:
-            ts = pd.to_datetime(rec["begin"])
-            for m in metrics:
-                tuples.append((ts, m))
-                vals.append(rec.get(m))
-        idx = pd.MultiIndex.from_tuples(tuples, names=["timestamp", "stat"])
-        return pd.Series(vals, index=idx)
+        metrics = sorted(key for key in records[0].keys() if key != "begin")
+
+        # Parse all timestamps at once and lay the values out bin by bin, matching the order of the index
+        timestamps = utils.to_datetime_index([rec["begin"] for rec in records])
+        values = np.array([[rec.get(m) for m in metrics] for rec in records], dtype=float).ravel()
+        idx = pd.MultiIndex.from_product([timestamps, metrics], names=["timestamp", "stat"])
+        return pd.Series(values, index=idx)
+
+    def _process_response(self, content: Dict[str, Any]):
+        """Process the decoded JSON response from myquery into the data and metadata fields."""
+        # Single top level key is channels
+        channels = content['channels']
+
+        # Process one channel at a time, then concat Series into a DataFrame.  The wide layout is built from the records
+        # directly, skipping the long index.
+        by_channel = {}
+        self.metadata = {}
+        for ch_name, ch_obj in channels.items():
+            if "error" in ch_obj.keys():
+                warnings.warn(f"Error querying {ch_name}: {ch_obj['error']}")
+            else:
+                by_channel[ch_name] = ch_obj["data"] if self.layout == "wide" else self._channel_series(ch_obj)
+                self.metadata[ch_name] = ch_obj['metadata']
+
+        if self.layout == "wide":
+            self.data = self._wide_records(by_channel)
+        else:
+            self.data = pd.concat(by_channel, axis=1).sort_index()
+
+    @staticmethod
+    def _wide_records(records_by_channel: Dict[str, List[Dict[str, Any]]]) -> pd.DataFrame:
+        """Build the wide layout straight from the records of each channel."""
+        stats = sorted({key for records in records_by_channel.values() for key in records[0].keys() if key != "begin"})
+        channels = list(records_by_channel.keys())
+        index = None
+        frames = {}
+        for channel, records in records_by_channel.items():
+            timestamps = utils.to_datetime_index([rec["begin"] for rec in records])
+            values = np.array([[rec.get(m) for m in stats] for rec in records], dtype=float)
+            frames[channel] = (timestamps, values)
+            index = timestamps if index is None or index.equals(timestamps) else index.union(timestamps)
+
+        if index is None:
+            index = pd.DatetimeIndex([])
+        index = index.rename("timestamp")
+
+        # Fill one (bins x channels x stats) block so that the frame holds a single contiguous array
+        block = np.full((len(index), len(channels), len(stats)), np.nan)
+        for j, (timestamps, values) in enumerate(frames.values()):
+            rows = slice(None) if index.equals(timestamps) else index.get_indexer(timestamps)
+            block[rows, j, :] = values
+
+        columns = pd.MultiIndex.from_product([channels, stats], names=["channel", "stat"])
+        return pd.DataFrame(block.reshape(len(index), -1), index=index, columns=columns)
+
+    @staticmethod
+    def _wide_frame(data: pd.DataFrame) -> pd.DataFrame:
+        """Convert data in the long layout to the wide layout."""
+        channels = list(data.columns)
+        stats = sorted(data.index.get_level_values("stat").unique())
+        wide = data.unstack("stat")
+        columns = pd.MultiIndex.from_product([channels, stats], names=["channel", "stat"])
+        block = wide.reindex(columns=columns).to_numpy(dtype=float)
+        return pd.DataFrame(block, index=wide.index.rename("timestamp"), columns=columns)
+
+    def to_array(self) -> StatsArray:
+        """Return the statistics as a (bins x channels x stats) array.  This is a view of the data in the wide layout.
+
+        Raises:
+            ValueError when the query has not been run
+        """
+        if self.data is None:
+            raise ValueError("The query has not been run")
+        wide = self.data if self.layout == "wide" else self._wide_frame(self.data)
+        channels = list(wide.columns.get_level_values("channel").unique())
+        stats = list(wide.columns.get_level_values("stat").unique())
+        values = wide.to_numpy(dtype=float).reshape(len(wide), len(channels), len(stats))
+        return StatsArray(wide.index, channels, stats, values)
+
+
+class MyStats(MyStatsResults):
+    """A class for running a myquery mystats request and holding the results.  Only float PVs supported.
+
+    Statistics are stored in the data field.  By default (layout="long") this is a DataFrame with a MultiIndex on the
+    start of the bin and the metric name, and a column per channel.  With layout="wide" it is a DataFrame indexed only
+    by the start of the bin with a float64 column per (channel, stat), e.g., data["channel1", "mean"], which avoids
+    MultiIndex lookups and the long index.  to_array() returns the statistics as a (bins x channels x stats) array.
+
+    Metadata is stored in a dictionary key on each channel.
+
+    The mystats endpoint is intended to provide the value of a set of PVs at regularly spaced time intervals.
+
+    Large pvlists are split into batches that are requested concurrently.  A batch holds at most batch_size PVs and its
+    request URL is no longer than config.max_url_length.  The results are the same as for a single request.
+
+    Long time ranges can be split into shards along bin boundaries that are requested concurrently.  For a few coarse
+    bins, each bin can also be computed from sub_bins finer bins that are merged on the client (see _merge_sub_bins),
+    which lets even a single bin be split into shards.  The merged eventCount and updateCount are upper bounds.
+    """
+
+    def __init__(self, query: MyStatsQuery, url: Optional[str] = None, transport: Optional[Transport] = None,
+                 batch_size: Optional[int] = None, max_workers: Union[int, AdaptiveLimiter] = 4, shards: int = 1,
+                 sub_bins: int = 1, layout: str = "long"):
+        """Construct an instance for running a mystats query.
+
+        Args:
+            query: The query to run
+            url: The location of the mystats endpoint.  Generated from config if None supplied.
+            transport: The Transport used to make requests.  The shared default_transport is used if None supplied.
+            batch_size: The most PVs requested at once.  Only the URL length limits batches if None supplied.
+            max_workers: The maximum number of requests made at once, or an AdaptiveLimiter that adjusts it.
+            shards: The number of sub-queries to split the time range into.  Shards hold whole bins and start a whole
+                    number of seconds after the start of the query, so fewer shards are used if the bins do not allow
+                    it.
+            sub_bins: The number of finer bins each bin is computed from.  The merged counts are upper bounds.
+            layout: The layout of the data field, either "long" or "wide".
+        """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        if sub_bins < 1:
+            raise ValueError("sub_bins must be at least 1")
+        super().__init__(query, layout)
+        self.url = url
+        if url is None:
+            self.url = f"{config.protocol}://{config.myquery_server}{config.mystats_path}"
+        self.transport = default_transport if transport is None else transport
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.shards = shards
+        self.sub_bins = sub_bins
 
     def run(self):
         """Run a web-based mysampler query.
@@ -170,26 +314,105 @@ class MyStats:
         Raises:
             RequestException when a problem making the query has occurred
         """
+        if self.shards > 1 or self.sub_bins > 1:
+            self._run_shards()
+            return
+
+        # Request each batch of PVs, then merge the channels as though they came from a single response
+        contents = utils.run_in_parallel([lambda p=p: decoding.loads(self.transport.get(self.url, params=p).content)
+                                          for p in self._batch_params()], max_workers=self.max_workers)
+        channels = {}
+        for content in contents:
+            channels.update(content['channels'])
 
-        # Make the request
+        self._process_response({'channels': channels})
+
+    def _batch_params(self) -> List[Dict[str, Any]]:
+        """Return the web parameters of each batch of the pvlist."""
         opts = self.query.to_web_params()
-        r = requests.get(self.url, params=opts)
+        base_length = len(self.url) + len("?") + len(urlencode(dict(opts, c="")))
+        batches = utils.batch_pvlist(self.query.pvlist, self.batch_size, config.max_url_length - base_length)
+        return [dict(opts, c=",".join(batch)) for batch in batches]
 
-        # Check if we have any errors
-        if r.status_code != requests.codes.OK:
-            raise requests.RequestException(f"Error contacting server. status={r.status_code} details={r.text}")
+    def _shard_queries(self) -> List[MyStatsQuery]:
+        """Split the query for num_bins * sub_bins bins into contiguous sub-queries along bin boundaries.
 
-        # Single top level key is channels
-        channels = r.json()['channels']
+        Bin i starts span * i / num_bins after the start of the query.  Shards only start on boundaries that are a whole
+        number of seconds after the start, which are those where i is a multiple of align.
+        """
+        num_bins = self.query.num_bins * self.sub_bins
+        span = (self.query.end - self.query.start) // timedelta(microseconds=1)
+        align = num_bins * 10 ** 6 // math.gcd(span, num_bins * 10 ** 6)
+        size = math.ceil(math.ceil(num_bins / self.shards) / align) * align
+
+        queries = []
+        for first in range(0, num_bins, size):
+            last = min(first + size, num_bins)
+            query = copy.copy(self.query)
+            query.start = self.query.start + timedelta(microseconds=span * first // num_bins)
+            if last < num_bins:
+                query.end = self.query.start + timedelta(microseconds=span * last // num_bins)
+            query.num_bins = last - first
+            queries.append(query)
+
+        return queries
 
-        # Process one channel at a time, then concat Series into a DataFrame
-        series_by_channel = {}
+    def _run_shards(self):
+        """Fetch each shard concurrently, concatenate the bins, and merge sub-bins if requested."""
+        # The batches of each shard are requested one at a time so that max_workers bounds the requests in flight
+        shards = [MyStats(query, url=self.url, transport=self.transport, batch_size=self.batch_size, max_workers=1)
+                  for query in self._shard_queries()]
+        utils.run_in_parallel([shard.run for shard in shards], max_workers=self.max_workers)
+
+        data = pd.concat([shard.data for shard in shards]).sort_index()
+        if self.sub_bins > 1:
+            data = self._merge_sub_bins(data, self.sub_bins)
+        self.data = data if self.layout == "long" else self._wide_frame(data)
         self.metadata = {}
-        for ch_name, ch_obj in channels.items():
-            if "error" in ch_obj.keys():
-                warnings.warn(f"Error querying {ch_name}: {ch_obj['error']}")
-            else:
-                series_by_channel[ch_name] = self._channel_series(ch_obj)
-                self.metadata[ch_name] = ch_obj['metadata']
+        for shard in shards:
+            self.metadata.update(shard.metadata)
+
+    @staticmethod
+    def _merge_sub_bins(data: pd.DataFrame, sub_bins: int) -> pd.DataFrame:
+        """Merge each run of sub_bins consecutive bins into one bin.
+
+        myquery statistics are time weighted, so they are merged through the time each sub-bin holds data (duration):
+        durations and integrations are summed, mean is integration / duration, rms is the duration weighted quadratic
+        mean of the sub-bin rms values, and stdev is sqrt(rms^2 - mean^2).  min and max are the extremes of the
+        sub-bins.
+
+        eventCount and updateCount are the sums of the sub-bin counts.  myquery counts the value carried into a bin
+        along with the events inside it, so each sub-bin after the first can count an event already counted in the one
+        before.  The merged counts are therefore upper bounds on those myquery reports for the coarse bin.
+
+        Args:
+            data: Statistics with a (timestamp, stat) MultiIndex, as held in the data field
+            sub_bins: The number of bins to merge into one
+
+        Returns:
+            The merged statistics in the same layout, indexed by the start of the first sub-bin of each bin.
+        """
+        # One DataFrame (timestamp x channel) per stat
+        stats = {stat: df.droplevel("stat") for stat, df in data.groupby(level="stat")}
+        timestamps = stats["duration"].index
+        group = np.arange(len(timestamps)) // sub_bins
 
-        self.data = pd.concat(series_by_channel, axis=1).sort_index()
+        duration = stats["duration"].groupby(group).sum(min_count=1)
+        integration = stats["integration"].groupby(group).sum(min_count=1)
+        mean = integration / duration.where(duration > 0)
+        rms = np.sqrt((stats["rms"] ** 2 * stats["duration"]).groupby(group).sum(min_count=1)
+                      / duration.where(duration > 0))
+        merged = {
+            "duration": duration,
+            "eventCount": stats["eventCount"].groupby(group).sum(min_count=1),
+            "integration": integration,
+            "max": stats["max"].groupby(group).max(),
+            "mean": mean,
+            "min": stats["min"].groupby(group).min(),
+            "rms": rms,
+            "stdev": np.sqrt((rms ** 2 - mean ** 2).clip(lower=0)),
+            "updateCount": stats["updateCount"].groupby(group).sum(min_count=1),
+        }
+        merged = pd.concat({stat: df.set_axis(timestamps[::sub_bins]) for stat, df in merged.items()
+                            if stat in stats}, names=["stat", "timestamp"])
+        return merged.swaplevel().sort_index()
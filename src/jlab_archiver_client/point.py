@@ -37,22 +37,58 @@ Example::
     >>> point.run()
     >>> point.event  # Dictionary containing event data
     {'datatype': 'DBR_DOUBLE', 'datasize': 1, 'datahost': 'mya', 'data': {'d': '2019-08-12 11:55:22', 'v': 6.20794}}
+    >>>
+    >>> # Get the values of several channels at several times as a DataFrame
+    >>> times = [datetime(2019, 8, 12, 12), datetime(2019, 8, 12, 13)]
+    >>> df = Point.run_batch(["channel1", "channel2"], times, deployment="docker")
 
 See Also:
     jlab_archiver_client.query.PointQuery: Query builder for point requests
     jlab_archiver_client.config: Configuration settings for archiver endpoints
 """
-from typing import Optional, Dict, Any
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Union
 
-import requests
+import numpy as np
+import pandas as pd
 
+from jlab_archiver_client import decoding, utils
+from jlab_archiver_client.cache import ResultCache
+from jlab_archiver_client.concurrency import AdaptiveLimiter
 from jlab_archiver_client.config import config
-from jlab_archiver_client.query import PointQuery
+from jlab_archiver_client.transport import Transport, default_transport
+from jlab_archiver_client.query import PointQuery, IntervalQuery
+
+__all__ = ["Point", "PointResults"]
+
+# The PointQuery options that the interval queries of Point.run_batch answer the same way as point queries
+_DENSE_OPTIONS = ("deployment", "sig_figs", "data_updates_only", "enums_as_strings", "frac_time_digits")
+
+
+class PointResults:
+    """The result of a myquery point query and the processing of a response into it.
+
+    Holds the event field described by Point.  Shared by Point and the asyncio AsyncPoint, which differ only in how
+    the response is requested.
+    """
+
+    def __init__(self, query: PointQuery):
+        """Construct an instance holding no result yet.
+
+        Args:
+            query: The query whose result is held
+        """
+        self.query = query
+
+        self.event: Optional[Dict[str, Any]] = None
 
-__all__ = ["Point"]
+    def _process_response(self, content: Dict[str, Any]):
+        """Process the decoded JSON response from myquery into the event field."""
+        self.event = content
+        self.event['name'] = self.query.channel
 
 
-class Point:
+class Point(PointResults):
     """A class for running calls to myquery's point endpoint.
 
     This endpoint returns a single channel event.  The user supplies the channel name and a timestamp, and myquery
@@ -63,19 +99,22 @@ class Point:
     before/after an event you already know of.
     """
 
-    def __init__(self, query: PointQuery, url: Optional[str] = None):
+    def __init__(self, query: PointQuery, url: Optional[str] = None, transport: Optional[Transport] = None,
+                 cache: Optional[ResultCache] = None):
         """Construct an instance for running a myquery interval.
 
         Args:
             query: The query to run
             url: The location of the myquery/interval endpoint. Generated from config if None supplied.
+            transport: The Transport used to make requests.  The shared default_transport is used if None supplied.
+            cache: A ResultCache shared between lookups.  Repeated queries are answered from it without a request.
         """
-        self.query = query
+        super().__init__(query)
         self.url = url
         if url is None:
             self.url = f"{config.protocol}://{config.myquery_server}{config.point_path}"
-
-        self.event: Optional[Dict[str, Any]] = None
+        self.transport = default_transport if transport is None else transport
+        self.cache = cache
 
     def run(self):
         """Run a web-based myquery interval query.  This supports querying only one PV at a time.
@@ -85,10 +124,114 @@ class Point:
         """
 
         opts = self.query.to_web_params()
-        r = requests.get(self.url, params=opts)
-
-        if r.status_code != requests.codes.OK:
-            raise requests.RequestException(f"Error contacting server. status={r.status_code} details={r.text}")
+        if self.cache is None:
+            content = decoding.loads(self.transport.get(self.url, params=opts).content)
+        else:
+            content = self.cache.get_or_fetch(ResultCache.key(self.url, opts),
+                                              lambda: decoding.loads(self.transport.get(self.url, params=opts).content))
+
+        self._process_response(content)
+
+    @staticmethod
+    def run_batch(channels: List[str], times: List[datetime], max_workers: Union[int, AdaptiveLimiter] = 8,
+                  transport: Optional[Transport] = None, cache: Optional[ResultCache] = None,
+                  dense_threshold: Optional[int] = None, **kwargs) -> pd.DataFrame:
+        """Look up the values of many channels at many times.
+
+        Each (channel, time) pair of the grid is answered as a point query would answer it: the value of the last event
+        at or before the time.  Like PointQuery, times are resolved to whole seconds, and duplicate channels or times
+        are only looked up once.  Lookups run concurrently on a bounded pool of threads.
+
+        Making one request per grid cell is slow for dense grids.  When dense_threshold is given, each channel looked
+        up at that many distinct times or more is instead answered from a single interval query spanning its times.
+        This pays off when the channel updates less often than it is looked up, and costs more than point queries when
+        it updates much more often.  Interval queries honour the deployment, sig_figs, data_updates_only,
+        enums_as_strings and frac_time_digits options and share the cache.  Setting any other option (e.g.,
+        forward_time_search) falls back to point queries.
 
-        self.event = r.json()
-        self.event['name'] = self.query.channel
+        Args:
+            channels: The channels to look up
+            times: The times to look up each channel at
+            max_workers: The maximum number of requests in flight at once, or an AdaptiveLimiter that adjusts it
+            transport: The Transport shared by all requests.  The shared default_transport is used if None supplied.
+            cache: A ResultCache shared by the point queries, and by the interval queries of a dense grid.
+            dense_threshold: The number of distinct times at which a channel is answered from an interval query.
+                             None always uses point queries.
+            kwargs: Other options of PointQuery, applied to every lookup (e.g., deployment, enums_as_strings)
+
+        Returns:
+            A DataFrame indexed by the sorted, distinct times with one column per channel.  Cells with no event at or
+            before their time, or whose event is a non-update event (e.g., a disconnect), hold NaN.
+        """
+        # Imported here since the interval module uses Point to find prior points
+        from jlab_archiver_client.interval import Interval  # noqa: PLC0415
+
+        channels = list(dict.fromkeys(channels))
+        index = pd.DatetimeIndex(pd.to_datetime(times)).unique().sort_values()
+        seconds = index.floor("s").unique()
+
+        # Interval queries only answer backward searches that include the given time, so any other option that is set
+        # falls back to point queries
+        dense = (dense_threshold is not None and len(seconds) >= dense_threshold
+                 and all(k in _DENSE_OPTIONS or not v for k, v in kwargs.items()))
+
+        tasks = []
+        if dense:
+            opts = {k: v for k, v in kwargs.items() if k in _DENSE_OPTIONS}
+            # Full fractional seconds so events within the last second are placed correctly.  The results are indexed
+            # by the times looked up, so the caller's frac_time_digits would not change them.
+            opts["frac_time_digits"] = 6
+            intervals = {channel: Interval(IntervalQuery(channel, seconds[0].to_pydatetime(),
+                                                         seconds[-1].to_pydatetime(), prior_point=True, **opts),
+                                           transport=transport)
+                         for channel in channels}
+            tasks = [lambda interval=interval: Point._run_dense(interval, cache) for interval in intervals.values()]
+        else:
+            points = {(channel, t): Point(PointQuery(channel, t.to_pydatetime(), **kwargs), transport=transport,
+                                          cache=cache)
+                      for channel in channels for t in seconds}
+            tasks = [point.run for point in points.values()]
+
+        utils.run_in_parallel(tasks, max_workers=max_workers)
+
+        floored = index.floor("s")
+        columns = {}
+        for channel in channels:
+            if dense:
+                # As-of lookup of the last event at or before each time
+                series = intervals[channel].data
+                pos = series.index.searchsorted(floored, side="right") - 1
+                values = series.to_numpy()[np.maximum(pos, 0)] if len(series) > 0 else np.full(len(index), np.nan)
+                columns[channel] = pd.Series(values, index=index).where(pos >= 0)
+            else:
+                series = Point._events_to_series(channel, seconds, [points[(channel, t)] for t in seconds],
+                                                 kwargs.get("enums_as_strings", False))
+                columns[channel] = pd.Series(series.reindex(floored).to_numpy(), index=index)
+
+        return pd.DataFrame(columns, index=index, columns=channels)
+
+    @staticmethod
+    def _run_dense(interval: Any, cache: Optional[ResultCache]) -> None:
+        """Run the interval query of a dense run_batch channel, answering it from the cache if one is given."""
+        if cache is None:
+            interval.run()
+            return
+
+        def fetch() -> pd.Series:
+            interval.run()
+            return interval.data
+
+        interval.data = cache.get_or_fetch(ResultCache.key(interval.url, interval.query.to_web_params()), fetch)
+
+    @staticmethod
+    def _events_to_series(channel: str, seconds: pd.DatetimeIndex, points: List["Point"],
+                          enums_as_strings: bool) -> pd.Series:
+        """Convert the events of a channel's point queries into a Series indexed by the times looked up."""
+        values = [point.event.get('data', {}).get('v') for point in points]
+        found = [i for i, v in enumerate(values) if v is not None]
+        if len(found) == 0:
+            return pd.Series([], index=pd.DatetimeIndex([]), name=channel, dtype=float)
+
+        metadata = dict(points[found[0]].event, returnCount=len(found))
+        return utils.convert_data_to_series([values[i] for i in found], seconds[found], channel, metadata,
+                                            enums_as_strings)
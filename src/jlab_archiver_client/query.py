@@ -86,7 +86,8 @@ class IntervalQuery(Query):
             prior_point: Should the query use the most recent update prior to the start to give a value at the start of
                          the query.
             enums_as_strings:  Should enum PV values be returned as their named strings instead of ints
-            unix_timestamps_ms:  Should timestamps be returned as millis since unix epoch
+            unix_timestamps_ms:  Should timestamps be returned as millis since unix epoch (UTC).  Faster to
+                                 convert than the default strings, which are in the server's local time.
             adjust_time_to_server_offset: Should the timestamp be localized to the myquery server
             integrate: Should the values be integrated (ony supported for float PVs)
             kwargs: Any extra parameters to be supplied to the interval web end point.  Will produce a warning if used
@@ -177,7 +178,8 @@ class MySamplerQuery(Query):
             data_updates_only: Should the response ignore events such as "NETWORK_DISCONNECT" and assume the previous
                                 value is still in effect  (Default: False)
             enums_as_strings: Should enum PV values be returned as their names instead of ints
-            unix_timestamps_ms: Should timestamps be returned as millis since unix epoch
+            unix_timestamps_ms: Should timestamps be returned as millis since unix epoch (UTC).  Faster to
+                                convert than the default strings, which are in the server's local time.
             adjust_time_to_server_offset: Should the timestamp be localized to the myquery server
             extra_opts: Extra options to pass to the mysampler endpoint.  Helps to future-proof, produces a warning to
                         avoid accidental use.
@@ -281,7 +283,8 @@ class PointQuery(Query):
             forward_time_search: Look forward in time from the given time for the next event (if True)
             exclude_given_time:  Don't include the given time in the search space for the next event (if True)
             enums_as_strings:  Should enum PV values be returned as their named strings instead of ints
-            unix_timestamps_ms:  Should timestamps be returned as millis since unix epoch
+            unix_timestamps_ms:  Should timestamps be returned as millis since unix epoch (UTC).  Faster to
+                                 convert than the default strings, which are in the server's local time.
             adjust_time_to_server_offset: Should the timestamp be localized to the myquery server
             integrate: Should the values be integrated (ony supported for float PVs)
             kwargs: Any extra parameters to be supplied to the interval web end point.  Will produce a warning if used
@@ -367,7 +370,8 @@ class MyStatsQuery(Query):
             data_updates_only: Should the response ignore events such as "NETWORK_DISCONNECT" and assume the previous
                                 value is still in effect  (Default: False)
             enums_as_strings: Should enum PV values be returned as their names instead of ints
-            unix_timestamps_ms: Should timestamps be returned as millis since unix epoch
+            unix_timestamps_ms: Should timestamps be returned as millis since unix epoch (UTC).  Faster to
+                                convert than the default strings, which are in the server's local time.
             adjust_time_to_server_offset: Should the timestamp be localized to the myquery server
             kwargs: Extra options to pass to the mysampler endpoint.  Helps to future-proof, produces a warning to
                         avoid accidental use.
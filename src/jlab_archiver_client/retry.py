@@ -0,0 +1,110 @@
+"""Retry policy for requests to myquery.
+
+Under load the myquery server can answer with transient errors (502, 503, 504) or drop connections.  A RetryPolicy
+tells a Transport which failures to retry, how long to back off between attempts and how long a request may take in
+total.  Every endpoint class issues its requests through a Transport, so the policy applies to all of them.
+
+Backoff is exponential with full jitter: before retry n (counting from zero) the transport waits a random time between
+zero and min(max_backoff, backoff * 2**n) seconds, or the server's Retry-After if that is longer.  Retries are limited
+by a retry budget shared by all requests using the policy, which follows the gRPC retry throttling scheme: the budget
+starts at budget_tokens, every retryable failure removes one token, every success adds budget_ratio tokens (up to
+budget_tokens), and retries are only made while more than half of the tokens remain.  When the server is failing
+most requests, clients therefore stop multiplying the load with retries.
+
+Only idempotent methods are retried.  All myquery endpoints are read only GET requests.
+
+Example::
+
+    >>> from jlab_archiver_client.retry import RetryPolicy
+    >>> from jlab_archiver_client.transport import default_transport
+    >>> # Retry up to five times and give up on any request that has not succeeded within two minutes
+    >>> default_transport.set(retry=RetryPolicy(max_retries=5, deadline=120))
+    >>> default_transport.stats()['retries'], default_transport.stats()['retry_wait']
+    (3, 2.41)
+
+See Also:
+    jlab_archiver_client.transport: The Transport that applies the policy
+"""
+import random
+from threading import RLock
+from typing import Optional, Sequence
+
+import requests
+
+__all__ = ["RetryPolicy"]
+
+
+class RetryPolicy:
+    """Decides which failed requests are retried and how long to wait before each retry."""
+
+    def __init__(self, max_retries: int = 3, backoff: float = 0.5, max_backoff: float = 30.0, jitter: bool = True,
+                 statuses: Sequence[int] = (429, 502, 503, 504), methods: Sequence[str] = ("GET", "HEAD", "OPTIONS"),
+                 budget_tokens: float = 10.0, budget_ratio: float = 0.1, deadline: Optional[float] = None):
+        """Construct a RetryPolicy.
+
+        Args:
+            max_retries: The most times a single request is retried.  Zero disables retries.
+            backoff: The base of the exponential backoff in seconds
+            max_backoff: The longest wait before a retry in seconds
+            jitter: Should waits be drawn at random between zero and the exponential backoff (True) or be exactly the
+                    exponential backoff (False)
+            statuses: The HTTP status codes that are retried.  Connection errors and timeouts are always retryable.
+            methods: The HTTP methods that are retried.  These should be idempotent.
+            budget_tokens: The size of the retry budget.  Retries are made while more than half of it remains.
+            budget_ratio: The tokens returned to the budget by each successful request
+            deadline: The most seconds a request may take, including all retries and waits.  The timeout of each
+                      attempt is shortened to the time remaining.  Unbounded if None.
+        """
+        if max_retries < 0:
+            raise ValueError("max_retries must be >= 0")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(m.upper() for m in methods)
+        self.budget_tokens = budget_tokens
+        self.budget_ratio = budget_ratio
+        self.deadline = deadline
+
+        self._lock = RLock()
+        self._tokens = budget_tokens
+
+    def is_retryable(self, method: str, error: requests.RequestException) -> bool:
+        """Is a failed request retryable, ignoring the retry count and budget."""
+        if method.upper() not in self.methods:
+            return False
+        if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            return True
+        return error.response is not None and error.response.status_code in self.statuses
+
+    def wait_time(self, retry: int, retry_after: Optional[float] = None) -> float:
+        """Get the seconds to wait before a retry.
+
+        Args:
+            retry: The number of retries already made for the request
+            retry_after: The delay the server asked for in a Retry-After header, if any
+        """
+        wait = min(self.max_backoff, self.backoff * 2 ** retry)
+        if self.jitter:
+            wait = random.uniform(0, wait)
+        if retry_after is not None:
+            wait = max(wait, min(retry_after, self.max_backoff))
+        return wait
+
+    def record_success(self) -> None:
+        """Return budget_ratio tokens to the retry budget."""
+        with self._lock:
+            self._tokens = min(self.budget_tokens, self._tokens + self.budget_ratio)
+
+    def record_failure(self) -> bool:
+        """Remove a token from the retry budget for a retryable failure.  Returns True if a retry is allowed."""
+        with self._lock:
+            self._tokens = max(0.0, self._tokens - 1)
+            return self._tokens > self.budget_tokens / 2
+
+    @property
+    def budget(self) -> float:
+        """The tokens remaining in the retry budget"""
+        with self._lock:
+            return self._tokens
@@ -12,7 +12,11 @@ Available Commands:
     * jac-channel: Search for channel names using SQL patterns
 
 Each command supports JSON or CSV output and can be configured to use different
-myquery server deployments.
+myquery server deployments.  jac-interval, jac-mysampler and jac-mystats can also write
+Parquet (.parquet) or Arrow IPC (.arrow or .feather) files when pyarrow is installed
+(pip install jlab_archiver_client[arrow]).  These are much smaller and faster to write and
+reload than CSV.  The disconnects and metadata are stored as JSON in the file-level
+metadata under the keys jlab_archiver_client.disconnects and jlab_archiver_client.metadata.
 
 Example::
 
@@ -31,6 +35,9 @@ Example::
     # Search for channels
     $ jac-channel -p "channel10%" -o output.json
 
+    # Save a large extract as zstd compressed Parquet
+    $ jac-interval -c channel100 -b "2019-08-01" -e "2019-09-01" -o output.parquet --compression zstd
+
 See Also:
     jlab_archiver_client.query: Query builder classes
     jlab_archiver_client.config: Configuration settings
@@ -39,8 +46,17 @@ import argparse
 import sys
 import json
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather, parquet
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = feather = parquet = None
 
+from jlab_archiver_client.cache import IntervalCache
 from jlab_archiver_client.config import config
 from jlab_archiver_client.query import (
     IntervalQuery, MySamplerQuery, MyStatsQuery, PointQuery, ChannelQuery
@@ -52,6 +68,11 @@ from jlab_archiver_client.point import Point
 from jlab_archiver_client.channel import Channel
 from jlab_archiver_client.utils import json_normalize
 
+# Output files written with pyarrow
+_ARROW_SUFFIXES = ('.parquet', '.arrow', '.feather')
+# Prefix of the file-level metadata keys holding the disconnects and metadata
+_ARROW_METADATA_PREFIX = 'jlab_archiver_client.'
+
 
 def _parse_datetime(dt_str: str) -> datetime:
     """Parse a datetime string in ISO format or common formats.
@@ -99,6 +120,84 @@ def _configure_server(server: Optional[str], protocol: Optional[str]):
         config.set(protocol=protocol)
 
 
+def _add_arrow_arguments(parser: argparse.ArgumentParser):
+    """Add the options of Parquet and Arrow IPC output to a parser."""
+    parser.add_argument('--compression', type=str, default=None,
+                        help='Compression codec of .parquet (snappy, gzip, brotli, zstd, lz4 or none) or '
+                             '.arrow/.feather (lz4, zstd or uncompressed) output (default: snappy for Parquet and lz4 '
+                             'for Arrow)')
+    parser.add_argument('--row-group-size', type=int, default=None,
+                        help='Maximum rows per Parquet row group or Arrow record batch (default: chosen by pyarrow)')
+
+
+def _write_arrow(path: str, data: Any, disconnects: Any, metadata: Any, compression: Optional[str] = None,
+                 row_group_size: Optional[int] = None):
+    """Write results to a Parquet (.parquet) or Arrow IPC (.arrow or .feather) file.
+
+    The index of data is kept as columns.  The disconnects and metadata are JSON encoded into the file-level metadata,
+    alongside the pandas metadata that pyarrow uses to restore the DataFrame when read.
+
+    Args:
+        path: Output file path, ending in one of _ARROW_SUFFIXES
+        data: The data field of the query results, a Series or DataFrame
+        disconnects: The disconnects field of the query results, or None
+        metadata: The metadata field of the query results
+        compression: Compression codec.  The pyarrow default of the format if None.
+        row_group_size: Maximum rows per Parquet row group or Arrow record batch.  The pyarrow default if None.
+
+    Raises:
+        ImportError when pyarrow is not installed
+    """
+    if pa is None:
+        raise ImportError("Writing .parquet, .arrow or .feather files requires pyarrow.  Install with "
+                          "'pip install jlab_archiver_client[arrow]'.")
+    if row_group_size is not None and row_group_size < 1:
+        raise ValueError(f"row_group_size must be at least one, not {row_group_size}")
+
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    table = pa.Table.from_pandas(frame, preserve_index=True)
+    file_metadata = dict(table.schema.metadata or {})
+    for key, value in (('disconnects', disconnects), ('metadata', metadata)):
+        encoded = json.dumps(json_normalize(value), default=str)
+        file_metadata[f"{_ARROW_METADATA_PREFIX}{key}".encode()] = encoded.encode()
+    table = table.replace_schema_metadata(file_metadata)
+
+    if path.endswith('.parquet'):
+        parquet.write_table(table, path, compression='snappy' if compression is None else compression,
+                            row_group_size=row_group_size)
+    else:
+        feather.write_feather(table, path, compression=compression, chunksize=row_group_size)
+
+
+def _save_results(output: Optional[str], results: Dict[str, Any], compression: Optional[str] = None,
+                  row_group_size: Optional[int] = None):
+    """Save the results of an interval, mysampler or mystats query.
+
+    Args:
+        output: Output file path.  The extension selects the format.  Printed to stdout as JSON if None.
+        results: The data, disconnects (if any) and metadata fields of the query results
+        compression: Compression codec of Parquet and Arrow IPC files
+        row_group_size: Maximum rows per Parquet row group or Arrow record batch
+    """
+    if output is None:
+        # Output to stdout as JSON
+        print(json.dumps(json_normalize(results), indent=2, default=str))
+        return
+
+    if output.endswith('.json'):
+        with open(output, 'w') as f:
+            json.dump(json_normalize(results), f, indent=2, default=str)
+    elif output.endswith('.csv'):
+        results['data'].to_csv(output)
+    elif output.endswith(_ARROW_SUFFIXES):
+        _write_arrow(output, results['data'], results.get('disconnects'), results['metadata'],
+                     compression=compression, row_group_size=row_group_size)
+    else:
+        print("Error: Output file must be .csv, .json, .parquet, .arrow or .feather", file=sys.stderr)
+        sys.exit(1)
+    print(f"Successfully saved results to {output}")
+
+
 def interval_main():
     """Command-line interface for the interval endpoint.
 
@@ -116,7 +215,8 @@ def interval_main():
     parser.add_argument('-e', '--end', required=True, type=str,
                         help='End time (ISO format or "YYYY-MM-DD HH:MM:SS")')
     parser.add_argument('-o', '--output', required=False, type=str, default=None,
-                        help='Output file path (.csv or .json). If not specified, outputs to stdout')
+                        help='Output file path (.csv, .json, .parquet, .arrow or .feather). If not specified, '
+                             'outputs to stdout')
 
     # Optional query parameters
     parser.add_argument('-m', '--deployment', type=str, default='history',
@@ -145,6 +245,18 @@ def interval_main():
     parser.add_argument('-i', '--integrate', action='store_true',
                         help='Integrate values (float PVs only)')
 
+    # Parallel fetching
+    parser.add_argument('--shards', type=int, default=1,
+                        help='Split the time range into this many sub-ranges fetched concurrently (default: 1)')
+    parser.add_argument('--max-workers', type=int, default=None,
+                        help='Maximum number of shards fetched at once (default: number of shards)')
+    parser.add_argument('--cache-dir', type=str, default=None,
+                        help='Directory of a local cache of historical events.  Only uncached time ranges are '
+                             'requested (default: no cache)')
+
+    # Parquet and Arrow output
+    _add_arrow_arguments(parser)
+
     # Server configuration
     parser.add_argument('--server', type=str, default=None,
                         help='Myquery server hostname (default: epicsweb.jlab.org)')
@@ -158,8 +270,7 @@ def interval_main():
 
     # Parse datetimes
     try:
-        begin = _parse_datetime(args.begin)
-        end = _parse_datetime(args.end)
+        begin, end = _parse_datetime(args.begin), _parse_datetime(args.end)
     except ValueError as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -184,33 +295,13 @@ def interval_main():
 
     # Execute query
     try:
-        interval = Interval(query)
+        interval = Interval(query, shards=args.shards, max_workers=args.max_workers,
+                            cache=None if args.cache_dir is None else IntervalCache(args.cache_dir))
         interval.run()
 
         # Save output
-        if args.output is None:
-            # Output to stdout as JSON
-            output_data = json_normalize({
-                'data': interval.data,
-                'disconnects': interval.disconnects,
-                'metadata': interval.metadata
-            })
-            print(json.dumps(output_data, indent=2, default=str))
-        elif args.output.endswith('.json'):
-            output_data = json_normalize({
-                'data': interval.data,
-                'disconnects': interval.disconnects,
-                'metadata': interval.metadata
-            })
-            with open(args.output, 'w') as f:
-                json.dump(output_data, f, indent=2, default=str)
-            print(f"Successfully saved results to {args.output}")
-        elif args.output.endswith('.csv'):
-            interval.data.to_csv(args.output)
-            print(f"Successfully saved results to {args.output}")
-        else:
-            print("Error: Output file must be .csv or .json", file=sys.stderr)
-            sys.exit(1)
+        _save_results(args.output, {'data': interval.data, 'disconnects': interval.disconnects,
+                                    'metadata': interval.metadata}, args.compression, args.row_group_size)
 
     except Exception as e:
         print(f"Error executing query: {e}", file=sys.stderr)
@@ -236,7 +327,8 @@ def mysampler_main():
     parser.add_argument('-n', '--num-samples', required=True, type=int,
                         help='Number of samples to retrieve')
     parser.add_argument('-o', '--output', required=False, type=str, default=None,
-                        help='Output file path (.csv or .json). If not specified, outputs to stdout')
+                        help='Output file path (.csv, .json, .parquet, .arrow or .feather). If not specified, '
+                             'outputs to stdout')
 
     # Optional query parameters
     parser.add_argument('-m', '--deployment', type=str, default='history',
@@ -252,6 +344,18 @@ def mysampler_main():
     parser.add_argument('-a', '--adjust-time-to-server-offset', action='store_true',
                         help='Localize timestamps to myquery server timezone')
 
+    # Parallel fetching
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='Request at most this many channels at once (default: limited only by URL length)')
+    parser.add_argument('--max-workers', type=int, default=4,
+                        help='Maximum number of requests made at once (default: 4)')
+    parser.add_argument('--shards', type=int, default=1,
+                        help='Split the samples into this many windows of sample times fetched concurrently '
+                             '(default: 1)')
+
+    # Parquet and Arrow output
+    _add_arrow_arguments(parser)
+
     # Server configuration
     parser.add_argument('--server', type=str, default=None,
                         help='Myquery server hostname (default: epicsweb.jlab.org)')
@@ -285,33 +389,12 @@ def mysampler_main():
 
     # Execute query
     try:
-        mysampler = MySampler(query)
+        mysampler = MySampler(query, batch_size=args.batch_size, max_workers=args.max_workers, shards=args.shards)
         mysampler.run()
 
         # Save output
-        if args.output is None:
-            # Output to stdout as JSON
-            output_data = json_normalize({
-                'data': mysampler.data,
-                'disconnects': mysampler.disconnects,
-                'metadata': mysampler.metadata
-            })
-            print(json.dumps(output_data, indent=2, default=str))
-        elif args.output.endswith('.json'):
-            output_data = json_normalize({
-                'data': mysampler.data,
-                'disconnects': mysampler.disconnects,
-                'metadata': mysampler.metadata
-            })
-            with open(args.output, 'w') as f:
-                json.dump(output_data, f, indent=2, default=str)
-            print(f"Successfully saved results to {args.output}")
-        elif args.output.endswith('.csv'):
-            mysampler.data.to_csv(args.output)
-            print(f"Successfully saved results to {args.output}")
-        else:
-            print("Error: Output file must be .csv or .json", file=sys.stderr)
-            sys.exit(1)
+        _save_results(args.output, {'data': mysampler.data, 'disconnects': mysampler.disconnects,
+                                    'metadata': mysampler.metadata}, args.compression, args.row_group_size)
 
     except Exception as e:
         print(f"Error executing query: {e}", file=sys.stderr)
@@ -335,11 +418,15 @@ def mystats_main():
     parser.add_argument('-e', '--end', required=True, type=str,
                         help='End time (ISO format or "YYYY-MM-DD HH:MM:SS")')
     parser.add_argument('-o', '--output', required=False, type=str, default=None,
-                        help='Output file path (.csv or .json). If not specified, outputs to stdout')
+                        help='Output file path (.csv, .json, .parquet, .arrow or .feather). If not specified, '
+                             'outputs to stdout')
 
     # Optional query parameters
     parser.add_argument('--num-bins', type=int, default=1,
                         help='Number of time bins for statistics (default: 1)')
+    parser.add_argument('--layout', type=str, default='long', choices=['long', 'wide'],
+                        help='Rows per (bin, stat) with a column per channel, or rows per bin with a column per '
+                             '(channel, stat) (default: long)')
     parser.add_argument('-m', '--deployment', type=str, default='history',
                         help='MYA deployment (default: history)')
     parser.add_argument('-f', '--frac-time-digits', type=int, default=0,
@@ -357,6 +444,21 @@ def mystats_main():
     parser.add_argument('-a', '--adjust-time-to-server-offset', action='store_true',
                         help='Localize timestamps to myquery server timezone')
 
+    # Parallel fetching
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='Request at most this many channels at once (default: limited only by URL length)')
+    parser.add_argument('--max-workers', type=int, default=4,
+                        help='Maximum number of requests made at once (default: 4)')
+    parser.add_argument('--shards', type=int, default=1,
+                        help='Split the time range into this many sub-ranges of whole bins fetched concurrently '
+                             '(default: 1)')
+    parser.add_argument('--sub-bins', type=int, default=1,
+                        help='Compute each bin from this many finer bins merged locally.  Counts are then upper bounds '
+                             '(default: 1)')
+
+    # Parquet and Arrow output
+    _add_arrow_arguments(parser)
+
     # Server configuration
     parser.add_argument('--server', type=str, default=None,
                         help='Myquery server hostname (default: epicsweb.jlab.org)')
@@ -393,31 +495,13 @@ def mystats_main():
 
     # Execute query
     try:
-        mystats = MyStats(query)
+        mystats = MyStats(query, batch_size=args.batch_size, max_workers=args.max_workers, shards=args.shards,
+                          sub_bins=args.sub_bins, layout=args.layout)
         mystats.run()
 
         # Save output
-        if args.output is None:
-            # Output to stdout as JSON
-            output_data = json_normalize({
-                'data': mystats.data,
-                'metadata': mystats.metadata
-            })
-            print(json.dumps(output_data, indent=2, default=str))
-        elif args.output.endswith('.json'):
-            output_data = json_normalize({
-                'data': mystats.data,
-                'metadata': mystats.metadata
-            })
-            with open(args.output, 'w') as f:
-                json.dump(output_data, f, indent=2, default=str)
-            print(f"Successfully saved results to {args.output}")
-        elif args.output.endswith('.csv'):
-            mystats.data.to_csv(args.output)
-            print(f"Successfully saved results to {args.output}")
-        else:
-            print("Error: Output file must be .csv or .json", file=sys.stderr)
-            sys.exit(1)
+        _save_results(args.output, {'data': mystats.data, 'metadata': mystats.metadata}, args.compression,
+                      args.row_group_size)
 
     except Exception as e:
         print(f"Error executing query: {e}", file=sys.stderr)
@@ -0,0 +1,343 @@
+"""Incremental parsing of myquery interval responses.
+
+The interval endpoint can return millions of events for a single channel.  Decoding the whole body with r.json() and
+then copying it into Python lists before pandas sees it holds several copies of the data in memory at once.  This
+module parses the response as it streams from the server, writing timestamps and values directly into NumPy buffers
+that grow as needed, so only one compact copy of the events is held at any time.
+
+Classes:
+    GrowableArray: A NumPy buffer that grows geometrically as values are appended.
+    IntervalStreamParser: Incremental parser for the myquery interval response body.
+
+Example::
+
+    >>> from jlab_archiver_client.streaming import IntervalStreamParser
+    >>> parser = IntervalStreamParser()
+    >>> parser.feed(b'{"datatype":"DBR_DOUBLE","datasize":1,"data":[{"d":"2019-08-12 00:00:00","v":1.5},')
+    >>> parser.feed(b'{"d":"2019-08-12 00:00:01","x":true,"t":"NETWORK_DISCONNECTION"}],"returnCount":2}')
+    >>> parser.close()
+    >>> parser.values.to_array()
+    array([1.5, nan])
+    >>> parser.metadata
+    {'datatype': 'DBR_DOUBLE', 'datasize': 1, 'returnCount': 2}
+
+See Also:
+    jlab_archiver_client.interval: Interval class that uses this parser
+"""
+import codecs
+import json
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from jlab_archiver_client import decoding
+from jlab_archiver_client.exceptions import MyqueryException
+
+__all__ = ["GrowableArray", "IntervalStreamParser"]
+
+# Datatypes whose scalar values can be held in a float buffer (NaN marks non-update events).
+_NUMERIC_TYPES = ("DBR_DOUBLE", "DBR_FLOAT", "DBR_SHORT", "DBR_LONG", "DBR_CHAR", "DBR_ENUM")
+# Datatypes that pandas would infer as int64 when there are no non-update events.
+_INTEGER_TYPES = ("DBR_SHORT", "DBR_LONG", "DBR_CHAR", "DBR_ENUM")
+
+_WS = re.compile(rb"[ \t\n\r]*")
+_TEXT_WS = re.compile(r"[ \t\n\r]*")
+_OPEN_ARRAY, _CLOSE_ARRAY, _OPEN_OBJECT, _CLOSE_OBJECT, _COMMA = b"[]{},"
+
+# Parser states
+_START, _KEY, _EVENTS, _DONE = range(4)
+
+
+class GrowableArray:
+    """A NumPy buffer that grows geometrically as values are appended."""
+
+    def __init__(self, dtype: Any, capacity: int = 1024):
+        """Construct a GrowableArray.
+
+        Args:
+            dtype: The NumPy dtype of the buffer
+            capacity: The initial number of elements to allocate
+        """
+        self._buffer = np.empty(max(capacity, 1), dtype=dtype)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._buffer.dtype
+
+    def extend(self, values: Sequence[Any]) -> None:
+        """Append a sequence of values, growing the buffer if needed."""
+        n = len(values)
+        needed = self._size + n
+        if needed > len(self._buffer):
+            capacity = len(self._buffer)
+            while capacity < needed:
+                capacity *= 2
+            self._grow(capacity)
+
+        if self._buffer.dtype == object:
+            # Assign element by element so that list values (vector PVs) are not broadcast
+            self._buffer[self._size:needed] = np.fromiter(values, dtype=object, count=n)
+        else:
+            self._buffer[self._size:needed] = values
+        self._size = needed
+
+    def _grow(self, capacity: int) -> None:
+        """Change the capacity of the buffer, keeping the appended values."""
+        if self._buffer.dtype == object:
+            # Resizing in place would leave NULL references in an object array.  Copy the references instead.
+            buffer = np.empty(capacity, dtype=object)
+            n = min(capacity, self._size)
+            buffer[:n] = self._buffer[:n]
+            self._buffer = buffer
+        else:
+            # Reallocate in place to avoid holding two copies of the data
+            self._buffer.resize(capacity, refcheck=False)
+
+    def to_array(self) -> np.ndarray:
+        """Return the appended values, releasing any unused capacity."""
+        if len(self._buffer) != self._size:
+            self._grow(self._size)
+        return self._buffer
+
+
+class IntervalStreamParser:
+    """Incremental parser for the body of a myquery interval response.
+
+    Feed the raw response bytes as they arrive, then call close().  Top level keys other than "data" are collected in
+    the metadata field.  Event timestamps and values are collected in the ts and values GrowableArrays, and
+    non-update events are additionally collected in the disconnect_ts and disconnect_values lists, with their positions
+    in the event buffers in disconnect_index.
+
+    Values of scalar numeric channels are stored as float64 with NaN for non-update events.  If the channel has an
+    integer type and there are no non-update events, they are converted to int64 on close, which matches the dtype
+    pandas infers for the same data.  All other values (strings, vectors) are stored as objects with None for
+    non-update events.
+
+    Events can be removed from the buffers with drain() as they are parsed so that a long response is processed with
+    bounded memory.  Values are then left as float64 on close so that every batch has the same dtype.
+
+    The body is buffered as bytes and the complete events in the buffer are handed to decoding.loads as one byte slice,
+    so the events are never copied into a str.  Only the few top level metadata members are decoded as text.
+    """
+
+    def __init__(self, enums_as_strings: bool = False):
+        """Construct an IntervalStreamParser.
+
+        Args:
+            enums_as_strings: Were enum values requested as strings.  Determines if enum values are numeric.
+        """
+        self.enums_as_strings = enums_as_strings
+
+        self.metadata: Dict[str, Any] = {}
+        self.ts: Optional[GrowableArray] = None
+        self.values: Optional[GrowableArray] = None
+        self.disconnect_ts: List[Any] = []
+        self.disconnect_values: List[str] = []
+        self.disconnect_index: List[int] = []
+
+        self._json = json.JSONDecoder()
+        self._buf = bytearray()
+        self._pos = 0
+        self._state = _START
+        self._drained = False
+
+    def feed(self, chunk: bytes) -> None:
+        """Parse the next chunk of the response body."""
+        # Drop the parsed bytes in place rather than building a new buffer for every chunk.  Deleting from the front of
+        # a bytearray does not move the rest.  The byte before the parse position is kept for _parse_events, which
+        # overwrites it with the '[' of the batch it decodes.
+        consumed = max(self._pos - 1, 0)
+        del self._buf[:consumed]
+        self._buf += chunk
+        self._pos -= consumed
+        self._parse()
+
+    def close(self) -> None:
+        """Finish parsing.
+
+        Raises:
+            MyqueryException when the response was incomplete or malformed
+        """
+        self._parse()
+        if self._state != _DONE or _WS.match(self._buf, self._pos).end() < len(self._buf):
+            raise MyqueryException("Incomplete or malformed interval response from myquery")
+
+        if self.ts is None:
+            self._init_buffers(ts_sample=None)
+        if self.values.dtype == np.float64 and self.metadata.get("datatype") in _INTEGER_TYPES:
+            if len(self.disconnect_ts) == 0 and not self._drained:
+                values = self.values.to_array()
+                self.values = GrowableArray(np.int64, capacity=len(values))
+                self.values.extend(values)
+
+    def drain(self) -> Tuple[np.ndarray, np.ndarray, List[int], List[str]]:
+        """Remove the events parsed so far from the buffers.
+
+        Returns:
+            The timestamps and values of the events, and the positions and values (types) of the non-update events among
+            them
+        """
+        self._drained = True
+        if self.ts is None:
+            return np.empty(0, dtype=object), np.empty(0, dtype=object), [], []
+
+        ts = self.ts.to_array()
+        values = self.values.to_array()
+        disconnect_index = self.disconnect_index
+        disconnect_values = self.disconnect_values
+        self.ts = GrowableArray(ts.dtype, capacity=len(ts))
+        self.values = GrowableArray(values.dtype, capacity=len(values))
+        self.disconnect_ts = []
+        self.disconnect_values = []
+        self.disconnect_index = []
+        return ts, values, disconnect_index, disconnect_values
+
+    def _parse(self) -> None:
+        """Consume as much of the buffered body as possible."""
+        buf = self._buf
+        while self._state != _DONE:
+            pos = _WS.match(buf, self._pos).end()
+            if pos >= len(buf):
+                return
+
+            if self._state == _START:
+                if buf[pos] != _OPEN_OBJECT:
+                    preview = buf[:80].decode(errors="replace")
+                    raise MyqueryException(f"Unexpected interval response from myquery: {preview}")
+                self._pos = pos + 1
+                self._state = _KEY
+            elif buf[pos] == _COMMA:
+                self._pos = pos + 1
+            elif self._state == _KEY and buf[pos] == _CLOSE_OBJECT:
+                self._pos = pos + 1
+                self._state = _DONE
+            elif self._state == _EVENTS and buf[pos] == _CLOSE_ARRAY:
+                self._pos = pos + 1
+                self._state = _KEY
+            else:
+                parse = self._parse_member if self._state == _KEY else self._parse_events
+                if not parse(buf, pos):
+                    return
+
+    def _parse_member(self, buf: bytearray, pos: int) -> bool:
+        """Parse one top level key and its value.  Returns False if more data is needed."""
+        text = _decode(buf, pos)
+        try:
+            key, i = json.decoder.scanstring(text, 1)
+        except json.JSONDecodeError:
+            return False
+
+        i = _TEXT_WS.match(text, i).end()
+        if i < len(text) and text[i] != ":":
+            raise MyqueryException(f"Unexpected interval response from myquery near '{text[i:i + 80]}'")
+        i = _TEXT_WS.match(text, i + 1).end()
+        if i >= len(text):
+            return False
+
+        if key == "data":
+            self._pos = pos + _byte_length(text, i) + 1  # skip the '['
+            self._state = _EVENTS
+            return True
+
+        end = self._parse_value(text, i, key)
+        if end is None:
+            return False
+        self._pos = pos + _byte_length(text, end)
+        return True
+
+    def _parse_value(self, text: str, pos: int, key: str) -> Optional[int]:
+        """Parse the value of a top level metadata key.  Returns its end, or None if more data is needed."""
+        try:
+            value, end = self._json.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            return None
+
+        # A number or literal at the end of the buffer may be truncated.  Wait until the next delimiter arrives.
+        if _TEXT_WS.match(text, end).end() >= len(text):
+            return None
+
+        self.metadata[key] = value
+        return end
+
+    def _parse_events(self, buf: bytearray, pos: int) -> bool:
+        """Parse the complete events available in the buffer.  Returns False if more data is needed."""
+        cut = buf.rfind(b"}", pos)
+        if cut < 0:
+            return False
+
+        # Fast path: decode every complete event in one call.  The bytes on either side of the events are replaced by
+        # '[' and ']' while the batch is copied out, so the events are copied once.
+        before, after = buf[pos - 1], buf[cut + 1:cut + 2]
+        buf[pos - 1] = _OPEN_ARRAY
+        buf[cut + 1:cut + 2] = b"]"
+        with memoryview(buf) as view:
+            batch = bytes(view[pos - 1:cut + 2])
+        buf[pos - 1] = before
+        buf[cut + 1:cut + 2] = after
+        try:
+            events = decoding.loads(batch)
+            end = cut + 1
+        except ValueError:
+            # The last '}' is inside a string.  Decode the events one at a time instead.
+            events, end = self._decode_events(buf, pos)
+            if len(events) == 0:
+                return False
+
+        self._add_events(events)
+        self._pos = end
+        return True
+
+    def _decode_events(self, buf: bytearray, pos: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Decode the complete events from pos one at a time.  Returns the events and the position after them."""
+        text = _decode(buf, pos)
+        events = []
+        end = 0
+        while True:
+            try:
+                event, next_end = self._json.raw_decode(text, end)
+            except json.JSONDecodeError:
+                break
+            events.append(event)
+            end = _TEXT_WS.match(text, next_end).end()
+            if end < len(text) and text[end] == ",":
+                end = _TEXT_WS.match(text, end + 1).end()
+        return events, pos + _byte_length(text, end)
+
+    def _init_buffers(self, ts_sample: Any) -> None:
+        """Choose the buffer dtypes from the first timestamp and the channel metadata."""
+        self.ts = GrowableArray(np.int64 if isinstance(ts_sample, int) else object)
+
+        datatype = self.metadata.get("datatype")
+        numeric = (self.metadata.get("datasize") == 1 and datatype in _NUMERIC_TYPES
+                   and not (datatype == "DBR_ENUM" and self.enums_as_strings))
+        self.values = GrowableArray(np.float64 if numeric else object)
+
+    def _add_events(self, events: List[Dict[str, Any]]) -> None:
+        """Append a batch of decoded events to the buffers."""
+        if self.ts is None:
+            self._init_buffers(ts_sample=events[0]['d'])
+
+        offset = len(self.ts)
+        self.ts.extend([event['d'] for event in events])
+        self.values.extend([None if 'x' in event else event['v'] for event in events])
+        for i, event in enumerate(events):
+            if 'x' in event:
+                self.disconnect_ts.append(event['d'])
+                self.disconnect_values.append(event['t'])
+                self.disconnect_index.append(offset + i)
+
+
+def _decode(buf: bytearray, pos: int) -> str:
+    """Decode the buffer from pos as UTF-8, leaving out a multibyte character cut off at the end."""
+    return codecs.utf_8_decode(buf[pos:], "strict", False)[0]
+
+
+def _byte_length(text: str, end: int) -> int:
+    """Return the number of UTF-8 bytes in text[:end]."""
+    return end if text.isascii() else len(text[:end].encode())
+
@@ -0,0 +1,92 @@
+"""Fast conversion of myquery timestamps.
+
+Without unix_timestamps_ms, myquery formats every timestamp as "YYYY-MM-DD HH:MM:SS", followed by a "." and exactly
+frac_time_digits fractional digits when frac_time_digits > 0.  Passing such strings to pd.to_datetime without a format
+makes pandas infer the format again on every call.  Since the layout is fixed and is ISO 8601 (with a space between the
+date and time), the strings are instead handed to NumPy's datetime64 parser, which reads that one layout in C without
+any inference.  Timestamps that do not match the layout are parsed with the explicit strptime format for their number
+of fractional digits, and only as a last resort with pandas' format inference.
+
+Integer timestamps (unix_timestamps_ms) are milliseconds since the epoch in UTC.  They are reinterpreted as
+datetime64[ms] without any parsing.  The index is left naive, so note that it is UTC while string timestamps are in the
+myquery server's local time.
+
+Example::
+
+    >>> from jlab_archiver_client.timestamps import to_datetime_index, timestamp_format
+    >>> timestamp_format(3)
+    '%Y-%m-%d %H:%M:%S.%f'
+    >>> to_datetime_index(["2019-08-12 00:00:00.250", "2019-08-12 00:00:01.500"])
+    DatetimeIndex(['2019-08-12 00:00:00.250000', '2019-08-12 00:00:01.500000'], dtype='datetime64[ns]', freq=None)
+
+See Also:
+    benchmarks/bench_timestamps.py: Compares the parsing paths on many timestamps
+"""
+import re
+from functools import lru_cache
+from typing import Any, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+__all__ = ["timestamp_format", "timestamp_pattern", "to_datetime_index"]
+
+# Fractional digits beyond nanoseconds cannot be represented
+_MAX_FRAC_DIGITS = 9
+
+
+@lru_cache(maxsize=None)
+def timestamp_format(frac_time_digits: int) -> str:
+    """Get the strptime format of myquery timestamps with the given number of fractional second digits."""
+    if frac_time_digits < 0:
+        raise ValueError(f"frac_time_digits must be at least zero, not {frac_time_digits}")
+    return "%Y-%m-%d %H:%M:%S" if frac_time_digits == 0 else "%Y-%m-%d %H:%M:%S.%f"
+
+
+@lru_cache(maxsize=None)
+def timestamp_pattern(frac_time_digits: Optional[int] = None) -> re.Pattern:
+    """Get a regular expression matching myquery timestamps with the given number of fractional second digits.
+
+    Args:
+        frac_time_digits: The number of fractional digits.  Any number up to nanoseconds is matched if None.
+    """
+    if frac_time_digits is None:
+        frac = rf"(\.\d{{1,{_MAX_FRAC_DIGITS}}})?"
+    else:
+        frac = rf"\.\d{{{frac_time_digits}}}" if frac_time_digits > 0 else ""
+    return re.compile(rf"\d{{4}}-\d\d-\d\d \d\d:\d\d:\d\d{frac}")
+
+
+def to_datetime_index(ts: Sequence[Any], frac_time_digits: Optional[int] = None) -> pd.DatetimeIndex:
+    """Convert the timestamps of a myquery response into a DatetimeIndex.
+
+    Integer timestamps are reinterpreted as epoch milliseconds.  Strings in myquery's layout are parsed by NumPy.
+    Others are parsed with the explicit format for frac_time_digits, or with pandas' format inference if that fails.
+
+    Args:
+        ts: The timestamps as returned by myquery, as a list or an array
+        frac_time_digits: The number of fractional second digits of string timestamps.  Taken from the first
+                          timestamp if None.
+
+    Returns:
+        A DatetimeIndex of the timestamps, in the same order
+    """
+    if (isinstance(ts, np.ndarray) and ts.dtype == np.int64) or (len(ts) > 0 and isinstance(ts[0], (int, np.integer))):
+        return pd.DatetimeIndex(np.asarray(ts, dtype=np.int64).view("datetime64[ms]"))
+    if len(ts) == 0 or not isinstance(ts[0], str):
+        return pd.DatetimeIndex(pd.to_datetime(ts))
+
+    # The layout is checked on the first timestamp only.  NumPy raises if a later one does not parse.
+    first = ts[0]
+    if timestamp_pattern(frac_time_digits).fullmatch(first):
+        try:
+            return pd.DatetimeIndex(np.asarray(ts, dtype="datetime64[ns]"))
+        except ValueError:
+            pass
+
+    if frac_time_digits is None:
+        frac_time_digits = len(first.partition(".")[2])
+    try:
+        return pd.DatetimeIndex(pd.to_datetime(ts, format=timestamp_format(frac_time_digits)))
+    except ValueError:
+        return pd.DatetimeIndex(pd.to_datetime(ts))
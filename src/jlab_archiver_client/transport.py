@@ -0,0 +1,315 @@
+"""HTTP transport shared by the myquery endpoint classes.
+
+This module provides the Transport class, a thin wrapper around a pooled requests.Session that is used by Interval,
+MySampler, MyStats, Point, and Channel to talk to the myquery web service.  Reusing a single session allows TCP (and
+TLS) connections to be kept alive between queries instead of paying a fresh handshake for every call.
+
+A module level default transport is shared by all endpoint classes unless a specific Transport is supplied.  Like the
+config singleton, the default transport is updated in place, so imported references never go stale.
+
+Interval and mysampler responses are highly compressible text.  Transports advertise every content encoding the
+installed urllib3 can decode (gzip and deflate, plus brotli when the brotli package is installed), and responses are
+decompressed incrementally as they are read, so a streamed response is never held in compressed form.  The bytes
+received on the wire and the bytes after decoding are recorded for every request.
+
+Key Features:
+    * Connection pooling and keep-alive shared across endpoint classes and threads
+    * Configurable number of host pools, connections per host, and blocking behavior
+    * Compressed transfers with wire and decoded byte counts per request
+    * Retries of transient failures with backoff, a retry budget and per-request deadlines (see RetryPolicy)
+    * Consistent error handling for non-OK responses
+    * Runtime reconfiguration without restart
+
+Attributes:
+    default_transport (Transport): The transport used by endpoint classes when none is supplied.
+
+Example::
+
+    >>> from jlab_archiver_client.transport import default_transport
+    >>> # Allow up to 32 concurrent connections to the myquery server
+    >>> default_transport.set(pool_maxsize=32)
+    >>>
+    >>> # Compare the bytes received with the bytes decoded
+    >>> default_transport.stats()
+    {'requests': 12, 'wire_bytes': 1520344, 'decoded_bytes': 9815527}
+    >>> last = default_transport.transfers()[-1]
+    >>> last.encoding, last.wire_bytes, last.decoded_bytes, round(last.ratio, 1)
+    ('gzip', 126693, 817961, 6.5)
+    >>>
+    >>> # Or use a dedicated transport for a block of work
+    >>> from datetime import datetime
+    >>> from jlab_archiver_client import Point, PointQuery
+    >>> from jlab_archiver_client.transport import Transport
+    >>> with Transport(pool_maxsize=4) as t:
+    ...     point = Point(PointQuery(channel="channel1", time=datetime(2019, 8, 12)), transport=t)
+    ...     point.run()
+
+See Also:
+    jlab_archiver_client.config: Configuration settings for archiver endpoints
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import RLock
+from typing import Optional, Dict, Any, Iterator, List, NamedTuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+from jlab_archiver_client.exceptions import MyqueryHTTPError
+from jlab_archiver_client.retry import RetryPolicy
+
+__all__ = ["DeadlineExceeded", "Transfer", "Transport", "default_transport"]
+
+
+class DeadlineExceeded(requests.Timeout):
+    """The deadline of the retry policy passed before a request succeeded"""
+
+
+class Transfer(NamedTuple):
+    """The size of one response body on the wire and after decoding"""
+    url: str
+    encoding: str
+    """The Content-Encoding of the response, or "identity" if it was not compressed"""
+    wire_bytes: int
+    decoded_bytes: int
+
+    @property
+    def ratio(self) -> float:
+        """The compression ratio (decoded bytes per wire byte)"""
+        return self.decoded_bytes / self.wire_bytes if self.wire_bytes > 0 else 1.0
+
+
+class Transport:
+    """A pooled HTTP client for issuing requests to myquery.
+
+    The underlying requests.Session is created lazily on first use and is safe to share between the threads used for
+    parallel queries.  Changing any setting through set() closes the current session so that the next request picks
+    up the new configuration.
+
+    The wire and decoded sizes of each response are recorded once its body has been read: immediately for regular
+    requests, and when iter_content is exhausted for streamed requests.  stats() reports the totals and transfers()
+    the most recent requests.
+
+    Failed requests are retried according to the retry policy.  Only obtaining the response is retried; an error while
+    reading a streamed body is raised to the caller.  stats() also reports the number of retries, the seconds spent
+    waiting between attempts, and the requests that were given up because the retry budget was exhausted or the
+    deadline passed.
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = False,
+                 keep_alive: bool = True, timeout: Optional[float] = None, compression: bool = True,
+                 history: int = 100, retry: Optional[RetryPolicy] = None):
+        """Construct a Transport.
+
+        Args:
+            pool_connections: The number of per-host connection pools to cache.
+            pool_maxsize: The maximum number of connections kept open to a single host.
+            pool_block: Should requests wait for a free connection when pool_maxsize connections to a host are in use
+                        (True), or open an extra, non-pooled connection (False).
+            keep_alive: Should connections be reused between requests.
+            timeout: Seconds to wait for the server to respond to each attempt.  None waits indefinitely.
+            compression: Should compressed responses be requested.  If False, only identity encoding is accepted.
+            history: The number of recent transfers kept for transfers().
+            retry: The retry policy.  A default RetryPolicy is used if None supplied.  RetryPolicy(max_retries=0)
+                   disables retries.
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.compression = compression
+        self.history = history
+        self.retry = RetryPolicy() if retry is None else retry
+
+        self._lock = RLock()
+        self._session: Optional[requests.Session] = None
+        self._transfers: List[Transfer] = []
+        self._requests = 0
+        self._wire_bytes = 0
+        self._decoded_bytes = 0
+        self._retries = 0
+        self._retry_wait = 0.0
+        self._budget_exhausted = 0
+        self._deadlines_exceeded = 0
+
+    def __enter__(self) -> Transport:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def set(self, **kwargs) -> None:
+        """mutate-in-place API so imports never go stale.  Closes the current session."""
+        with self._lock:
+            for k, v in kwargs.items():
+                if not hasattr(self, k) or k.startswith("_"):
+                    raise AttributeError(f"Unknown transport setting '{k}'")
+                setattr(self, k, v)
+            self.close()
+
+    @property
+    def session(self) -> requests.Session:
+        """The pooled requests.Session, created on first use."""
+        with self._lock:
+            if self._session is None:
+                self._session = self._create_session()
+            return self._session
+
+    def _create_session(self) -> requests.Session:
+        """Create a new session with pooled adapters mounted for http and https."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize,
+                              pool_block=self.pool_block)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        session.headers["Accept-Encoding"] = ACCEPT_ENCODING if self.compression else "identity"
+        return session
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, stream: bool = False) -> requests.Response:
+        """Issue a GET request and check that the server responded OK, retrying transient failures.
+
+        Args:
+            url: The endpoint to query
+            params: The query parameters to send
+            stream: Should the body be left on the connection to be read incrementally (e.g., with iter_content).
+                    The response should then be closed, or used as a context manager, to release the connection.
+                    Compressed bodies are decompressed chunk by chunk as they are read.
+
+        Returns:
+            The response from the server.
+
+        Raises:
+            RequestException when a problem making the query has occurred and was not resolved by retrying.  A
+            MyqueryHTTPError (an HTTPError) for a non-OK response, or a DeadlineExceeded (a Timeout) if the deadline of
+            the retry policy passed.
+        """
+        start = time.monotonic()
+        retries = 0
+        while True:
+            try:
+                r = self._attempt(url, params, stream, start)
+                break
+            except requests.RequestException as exc:
+                wait = self._wait_before_retry(exc, retries, start)
+                if wait is None:
+                    raise
+                with self._lock:
+                    self._retries += 1
+                    self._retry_wait += wait
+                time.sleep(wait)
+                retries += 1
+
+        if stream:
+            r.iter_content = self._metered(r, r.iter_content)
+        else:
+            self._record(r, len(r.content))
+        return r
+
+    def _attempt(self, url: str, params: Optional[Dict[str, Any]], stream: bool, start: float) -> requests.Response:
+        """Make one attempt at a GET request, limiting its timeout to the time left before the deadline."""
+        timeout = self.timeout
+        if self.retry is not None and self.retry.deadline is not None:
+            remaining = self.retry.deadline - (time.monotonic() - start)
+            if remaining <= 0:
+                with self._lock:
+                    self._deadlines_exceeded += 1
+                raise DeadlineExceeded(f"Deadline of {self.retry.deadline}s exceeded for {url}")
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+        r = self.session.get(url, params=params, timeout=timeout, stream=stream)
+        if r.status_code != requests.codes.OK:
+            message = f"Error contacting server. status={r.status_code} details={r.text}"
+            r.close()
+            raise MyqueryHTTPError(message, status=r.status_code, response=r)
+
+        if self.retry is not None:
+            self.retry.record_success()
+        return r
+
+    def _wait_before_retry(self, error: requests.RequestException, retries: int, start: float) -> Optional[float]:
+        """Get the seconds to wait before retrying a failed attempt, or None if the failure should be raised."""
+        policy = self.retry
+        if (policy is None or retries >= policy.max_retries or isinstance(error, DeadlineExceeded)
+                or not policy.is_retryable("GET", error)):
+            return None
+        if not policy.record_failure():
+            with self._lock:
+                self._budget_exhausted += 1
+            return None
+
+        retry_after = None if error.response is None else _retry_after(error.response.headers.get("Retry-After"))
+        wait = policy.wait_time(retries, retry_after)
+        if policy.deadline is not None and time.monotonic() - start + wait >= policy.deadline:
+            with self._lock:
+                self._deadlines_exceeded += 1
+            return None
+        return wait
+
+    def _metered(self, r: requests.Response, iter_content):
+        """Wrap the iter_content method of a streamed response so the transfer is recorded once the body is read."""
+        def iter_metered(*args, **kwargs) -> Iterator[bytes]:
+            decoded = 0
+            for chunk in iter_content(*args, **kwargs):
+                decoded += len(chunk)
+                yield chunk
+            self._record(r, decoded)
+        return iter_metered
+
+    def _record(self, r: requests.Response, decoded_bytes: int) -> None:
+        """Record the wire and decoded size of a response body that has been read."""
+        tell = getattr(r.raw, "tell", None)
+        wire_bytes = tell() if callable(tell) else decoded_bytes
+        transfer = Transfer(r.url, r.headers.get("Content-Encoding", "identity"), wire_bytes, decoded_bytes)
+        with self._lock:
+            self._requests += 1
+            self._wire_bytes += wire_bytes
+            self._decoded_bytes += decoded_bytes
+            self._transfers.append(transfer)
+            del self._transfers[:max(len(self._transfers) - self.history, 0)]
+
+    def stats(self) -> Dict[str, float]:
+        """Get a consistent snapshot of the transfer and retry counters.
+
+        Returns:
+            The number of successful requests, the bytes they received on the wire and after decoding, the number of
+            retries, the seconds spent waiting before retries, and the number of requests given up because the retry
+            budget was exhausted or the deadline passed.
+        """
+        with self._lock:
+            return {'requests': self._requests, 'wire_bytes': self._wire_bytes, 'decoded_bytes': self._decoded_bytes,
+                    'retries': self._retries, 'retry_wait': self._retry_wait,
+                    'budget_exhausted': self._budget_exhausted, 'deadlines_exceeded': self._deadlines_exceeded}
+
+    def transfers(self) -> List[Transfer]:
+        """Get the most recent transfers, oldest first."""
+        with self._lock:
+            return list(self._transfers)
+
+    def close(self) -> None:
+        """Close the session and any pooled connections.  A new session is created on the next request."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header, given in seconds or as an HTTP date, into seconds."""
+    if value is None:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+default_transport = Transport()  # shared default
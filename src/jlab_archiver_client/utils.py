@@ -1,9 +1,16 @@
 """Utility functions for processing data from myquery."""
-from typing import Any, Dict, List
+import itertools
+from urllib.parse import quote_plus
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
 
+from jlab_archiver_client.concurrency import AdaptiveLimiter
+from jlab_archiver_client.timestamps import to_datetime_index
+
 
 def convert_data_to_series(values: List[Any], ts: List[Any], name: str, metadata: Dict[str, Any],
                            enums_as_strings: bool) -> pd.Series:
@@ -26,30 +33,127 @@ def convert_data_to_series(values: List[Any], ts: List[Any], name: str, metadata
 
     if metadata['datasize'] == 1:
         if metadata["returnCount"] == 0:
-            data = pd.Series([], index=ts, name=name, dtype=object)
+            data = pd.Series([], index=to_datetime_index(ts), name=name, dtype=object)
         else:
-            data = pd.Series(values, index=ts, name=name)
+            data = pd.Series(values, index=to_datetime_index(ts), name=name)
     # myquery returns vector data as an array of strings.  Need to manually convert to desired format
-    elif metadata['datatype'] in ("DBR_DOUBLE", "DBR_FLOAT"):
-        # Cast to float (64-bit is adequate for both)
-        data = pd.Series(values, index=ts, name=name)
-        data = data.apply(lambda x: np.array(np.array(x), dtype=float))
-    elif metadata['datatype'] in ("DBR_SHORT", "DBR_LONG"):
-        # Cast to int (64-bit is adequate for both)
-        data = pd.Series(values, index=ts, name=name)
-        data = data.apply(lambda x: np.array(np.fromstring(x, sep=","), dtype=int))
-    elif metadata['datatype'] == "DBR_ENUM" and not enums_as_strings:
-        data = pd.Series(values, index=ts, name=name)
-        data = data.apply(lambda x: np.array(np.fromstring(x, sep=","), dtype=int))
+    elif _vector_dtype(metadata, enums_as_strings) is not None:
+        return convert_vector_data(values, ts, metadata, enums_as_strings).to_series(name)
     else:
         # This will return values as an array of str
-        data = pd.Series(values, index=ts, name=name)
-
-    data.index = pd.to_datetime(data.index)
+        data = pd.Series(values, index=to_datetime_index(ts), name=name)
 
     return data
 
 
+class VectorArray(NamedTuple):
+    """The values of a numeric vector (waveform) channel held in one contiguous block.
+
+    Attributes:
+        index: The timestamp of each row
+        values: A (rows x width) array of the values, where width is the length of the longest row.  Float channels
+                are float64 and integer channels are int64.  Missing entries hold NaN for floats and 0 for integers.
+        mask: A (rows x width) boolean array that is True where an entry is missing, i.e., past the end of a short row
+              or anywhere in the row of a non-update event.
+    """
+    index: pd.DatetimeIndex
+    values: np.ndarray
+    mask: np.ndarray
+
+    def to_series(self, name: str) -> pd.Series:
+        """Get a Series with one array per row.  Rows are views into values, and non-update events are None."""
+        return pd.Series(_row_views(self.values, self.mask), index=self.index, name=name)
+
+
+def _row_views(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Get an object array holding a view of each row of values, trimmed to its length, or None for empty rows."""
+    lengths = (~mask).sum(axis=1)
+    rows = np.empty(len(lengths), dtype=object)
+    for i, length in enumerate(lengths):
+        rows[i] = values[i, :length] if length > 0 else None
+    return rows
+
+
+def _vector_dtype(metadata: Dict[str, Any], enums_as_strings: bool) -> Optional[type]:
+    """Get the numeric type of a vector channel's values, or None if they are left as strings."""
+    if metadata['datatype'] in ("DBR_DOUBLE", "DBR_FLOAT"):
+        # 64-bit is adequate for both
+        return float
+    if metadata['datatype'] in ("DBR_SHORT", "DBR_LONG") or (metadata['datatype'] == "DBR_ENUM"
+                                                               and not enums_as_strings):
+        return int
+    return None
+
+
+def vectors_to_array(rows: Sequence[Any], dtype: type) -> Tuple[np.ndarray, np.ndarray]:
+    """Parse the rows of a vector channel into a single 2D array in one vectorized pass.
+
+    Args:
+        rows: The value of each event as myquery returns it (a list of strings or a comma separated string), or None
+              for non-update events.
+        dtype: The type to convert the values to (float or int)
+
+    Returns:
+        A (rows x width) array of the values and a mask of the same shape that is True where an entry is missing.
+    """
+    rows = [row.split(",") if isinstance(row, str) else row for row in rows]
+    lengths = np.fromiter((0 if row is None else len(row) for row in rows), dtype=np.int64, count=len(rows))
+    width = int(lengths.max()) if len(rows) > 0 else 0
+
+    # Parse straight from the strings into one flat array without building an intermediate list
+    flat = np.fromiter(itertools.chain.from_iterable(row for row in rows if row is not None), dtype=np.float64,
+                       count=int(lengths.sum()))
+    if dtype is not float:
+        flat = flat.astype(np.int64)
+
+    # Common case: every row is complete, so the flat array is the block
+    if np.all(lengths == width):
+        return flat.reshape(len(rows), width), np.zeros((len(rows), width), dtype=bool)
+
+    # Row and column of each parsed value in the block
+    row_idx = np.repeat(np.arange(len(rows)), lengths)
+    col_idx = np.arange(len(flat)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    values = np.full((len(rows), width), np.nan) if dtype is float else np.zeros((len(rows), width), dtype=np.int64)
+    values[row_idx, col_idx] = flat
+    mask = np.ones(values.shape, dtype=bool)
+    mask[row_idx, col_idx] = False
+    return values, mask
+
+
+def convert_vector_data(values: List[Any], ts: List[Any], metadata: Dict[str, Any],
+                        enums_as_strings: bool) -> Optional[VectorArray]:
+    """Convert the values of a numeric vector channel into a compact VectorArray.
+
+    Args:
+        values: Array of myquery values to process.
+        ts: Array of timestamps associated with the values.
+        metadata: Channel metadata returned by myquery.
+        enums_as_strings: Were enums returned as their string names?
+
+    Returns:
+        A VectorArray of the data, or None if the channel is scalar or its values are strings.
+    """
+    dtype = _vector_dtype(metadata, enums_as_strings)
+    if metadata['datasize'] == 1 or dtype is None:
+        return None
+    block, mask = vectors_to_array(values, dtype)
+    return VectorArray(to_datetime_index(ts), block, mask)
+
+
+def concat_vector_arrays(arrays: List[VectorArray]) -> VectorArray:
+    """Stack VectorArrays row-wise, padding narrower ones with missing entries."""
+    width = max(a.values.shape[1] for a in arrays)
+    values, masks = [], []
+    for a in arrays:
+        pad = width - a.values.shape[1]
+        fill = np.nan if a.values.dtype == np.float64 else 0
+        values.append(np.pad(a.values, ((0, 0), (0, pad)), constant_values=fill))
+        masks.append(np.pad(a.mask, ((0, 0), (0, pad)), constant_values=True))
+    return VectorArray(arrays[0].index.append([a.index for a in arrays[1:]]), np.concatenate(values),
+                       np.concatenate(masks))
+
+
 def convert_data_to_dataframe(samples: Dict[str, Any], metadata: Dict[str, Dict[str,Any]],
                            enums_as_strings: bool) -> pd.DataFrame:
     """Process the data response from myquery if multiple channels are included.
@@ -70,36 +174,18 @@ def convert_data_to_dataframe(samples: Dict[str, Any], metadata: Dict[str, Dict[
     # Iterate through the channels and convert them if needed.
     for channel_name, val in samples.items():
         if channel_name == "Date":
-            samples[channel_name] = pd.to_datetime(val)
+            samples[channel_name] = to_datetime_index(val)
             continue
 
         # Leave scalar valued series alone
         if metadata[channel_name]['metadata']['datasize'] == 1:
             continue
 
-        # Get the EPICS record type
-        rtyp = metadata[channel_name]['metadata']['datatype']
-
-        def _convert_row(row, dtype) -> np.ndarray:
-            """Convert a list of strings to a numpy array of the appropriate type and handle None"""
-            if row is None:
-                out = None
-            else:
-                out = np.array(row, dtype=dtype)
-            return out
-
-        # Since we only have vector valued channels, we need to convert from the str type that myquery supplies
-        if rtyp in ("DBR_DOUBLE", "DBR_FLOAT"):
-            # Cast to float (64-bit is adequate for both)
-            samples[channel_name] = list(map(lambda x: _convert_row(x, float), val))
-        elif rtyp in ("DBR_SHORT", "DBR_LONG"):
-            # Cast to int (64-bit is adequate for both)
-            samples[channel_name] = list(map(lambda x: _convert_row(x, int), val))
-        elif rtyp == "DBR_ENUM" and not enums_as_strings:
-            samples[channel_name] = list(map(lambda x: _convert_row(x, int), val))
-        else:
-            # We will leave them as a list of strings
-            pass
+        # Since we only have vector valued channels, we need to convert from the str type that myquery supplies.
+        # Strings (e.g., enums as strings) are left as a list of strings.
+        dtype = _vector_dtype(metadata[channel_name]['metadata'], enums_as_strings)
+        if dtype is not None:
+            samples[channel_name] = list(_row_views(*vectors_to_array(val, dtype)))
 
     data = pd.DataFrame(samples).set_index("Date", drop=True)
 
@@ -139,3 +225,66 @@ def json_normalize(obj: Any) -> Any:
         obj = [json_normalize(v) for v in obj]
 
     return obj
+
+
+def run_in_parallel(tasks: List[Callable[[], Any]], max_workers: Union[int, AdaptiveLimiter]) -> List[Any]:
+    """Run tasks concurrently on a thread pool and wait for all of them to finish.
+
+    Args:
+        tasks: Callables taking no arguments, e.g., the bound run methods of several endpoint objects.
+        max_workers: The maximum number of tasks to run at once, or an AdaptiveLimiter that adjusts it as tasks finish.
+
+    Returns:
+        The return values of the tasks, in the same order as tasks.
+
+    Raises:
+        The first exception (in task order) raised by any task.  All tasks are allowed to finish first.
+    """
+    if isinstance(max_workers, AdaptiveLimiter):
+        tasks = [partial(max_workers.run, task) for task in tasks]
+        max_workers = max_workers.max_limit
+
+    if len(tasks) == 1:
+        return [tasks[0]()]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(task) for task in tasks]
+
+    return [future.result() for future in futures]
+
+
+def batch_pvlist(pvlist: List[str], batch_size: Optional[int] = None,
+                 max_length: Optional[int] = None) -> List[List[str]]:
+    """Split a pvlist into consecutive batches that can be requested separately.
+
+    Args:
+        pvlist: The PVs to split
+        batch_size: The most PVs in a batch.  Unbounded if None.
+        max_length: The most characters the URL encoded, comma separated PVs of a batch may take up.  Unbounded if
+                    None.  A PV that is longer on its own is placed in a batch by itself.
+
+    Returns:
+        The batches, in order.  A pvlist that needs no splitting is returned as a single batch.
+    """
+    if batch_size is not None and batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    batches = []
+    batch = []
+    length = 0
+    for pv in pvlist:
+        # Commas are encoded as %2C
+        pv_length = len(quote_plus(pv)) + (3 if len(batch) > 0 else 0)
+        full = batch_size is not None and len(batch) >= batch_size
+        too_long = max_length is not None and length + pv_length > max_length
+        if len(batch) > 0 and (full or too_long):
+            batches.append(batch)
+            batch = []
+            pv_length = len(quote_plus(pv))
+            length = 0
+        batch.append(pv)
+        length += pv_length
+
+    if len(batch) > 0 or len(batches) == 0:
+        batches.append(batch)
+    return batches
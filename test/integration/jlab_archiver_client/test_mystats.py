@@ -171,3 +171,35 @@ class TestMyStats(unittest.TestCase):
 
         pd.testing.assert_frame_equal(exp_data, res_data)
         self.assertDictEqual(exp_metadata, res_metadata)
+
+    def test_get_mystats_sub_bins(self):
+        """Test that bins merged from sub-bins match the bins myquery computes, with summed counts"""
+        query = MyStatsQuery(
+            start=datetime.strptime("2019-08-12 00:00:00", "%Y-%m-%d %H:%M:%S"),
+            end=datetime.strptime("2019-08-13 00:00:00", "%Y-%m-%d %H:%M:%S"),
+            num_bins=2,
+            pvlist=["channel1"],
+            deployment="docker"
+        )
+        sub_bins = 4
+        coarse = MyStats(query)
+        coarse.run()
+        merged = MyStats(query, sub_bins=sub_bins)
+        merged.run()
+        fine = MyStats(MyStatsQuery(pvlist=query.pvlist, start=query.start, end=query.end,
+                                    num_bins=query.num_bins * sub_bins, deployment="docker"))
+        fine.run()
+
+        # myquery reports the statistics to a limited precision, so the merged values can differ in the last digits
+        for stat in ('duration', 'integration', 'max', 'mean', 'min', 'rms', 'stdev'):
+            with self.subTest(stat=stat):
+                pd.testing.assert_frame_equal(coarse.data.xs(stat, level="stat"), merged.data.xs(stat, level="stat"),
+                                              rtol=1e-4)
+        # The counts are the sums of myquery's sub-bin counts, which are upper bounds on its coarse bin counts
+        for stat in ('eventCount', 'updateCount'):
+            with self.subTest(stat=stat):
+                counts = fine.data.xs(stat, level="stat")
+                summed = counts.groupby(np.arange(len(counts)) // sub_bins).sum()
+                result = merged.data.xs(stat, level="stat")
+                pd.testing.assert_frame_equal(summed.set_axis(result.index), result)
+                self.assertTrue((result >= coarse.data.xs(stat, level="stat")).all().all())
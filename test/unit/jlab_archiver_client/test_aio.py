@@ -0,0 +1,140 @@
+import asyncio
+import unittest
+from datetime import datetime
+
+import requests
+from aiohttp import web
+
+from jlab_archiver_client import IntervalQuery, PointQuery, ChannelQuery, Interval, MyStatsQuery
+from jlab_archiver_client.aio import (AsyncTransport, AsyncInterval, AsyncMyStats, AsyncPoint, AsyncChannel,
+                                      _to_aiohttp_params)
+from jlab_archiver_client.exceptions import MyqueryException, MyqueryHTTPError
+
+
+class _FakeMyquery:
+    """A minimal myquery served by aiohttp that records the peak number of concurrent requests."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.params = []
+
+    async def interval(self, request):
+        self.params.append(dict(request.query))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        data = [{'d': '2019-08-12 00:00:00', 'v': 1.0},
+                {'d': '2019-08-12 00:00:05', 'x': True, 't': 'NETWORK_DISCONNECTION'},
+                {'d': '2019-08-12 00:00:10', 'v': 2.0}]
+        return web.json_response({'datatype': 'DBR_DOUBLE', 'datasize': 1, 'datahost': 'mya', 'ioc': None,
+                                  'active': True, 'sampled': False, 'data': data, 'returnCount': len(data)})
+
+    async def point(self, request):
+        return web.json_response({'datatype': 'DBR_DOUBLE', 'datasize': 1, 'datahost': 'mya',
+                                  'data': {'d': '2019-08-12 00:00:00', 'v': 1.0}})
+
+    async def channel(self, request):
+        self.params.append(dict(request.query))
+        return web.json_response([{'name': 'channel100', 'datatype': 'DBR_DOUBLE'}])
+
+    async def error(self, request):
+        return web.Response(status=503, text="busy")
+
+
+class TestAsync(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the asyncio endpoint classes."""
+
+    async def asyncSetUp(self):
+        self.fake = _FakeMyquery()
+        app = web.Application()
+        app.router.add_get("/myquery/interval", self.fake.interval)
+        app.router.add_get("/myquery/point", self.fake.point)
+        app.router.add_get("/myquery/channel", self.fake.channel)
+        app.router.add_get("/myquery/error", self.fake.error)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base = f"http://127.0.0.1:{port}/myquery"
+        self.transport = AsyncTransport(max_concurrency=3)
+
+    async def asyncTearDown(self):
+        await self.transport.close()
+        await self.runner.cleanup()
+
+    async def test_interval(self):
+        """Test that AsyncInterval produces the same fields as Interval."""
+        query = IntervalQuery("channel1", datetime(2019, 8, 12), datetime(2019, 8, 13))
+        interval = AsyncInterval(query, url=f"{self.base}/interval", transport=self.transport)
+        await interval.run()
+
+        self.assertEqual(interval.data.dtype, float)
+        self.assertEqual(len(interval.data), 3)
+        self.assertEqual(interval.disconnects.iloc[0], "NETWORK_DISCONNECTION")
+        self.assertEqual(interval.metadata['returnCount'], 3)
+
+    async def test_bounded_concurrency(self):
+        """Test that no more than max_concurrency requests are in flight at once."""
+        intervals = [AsyncInterval(IntervalQuery(f"channel{i}", datetime(2019, 8, 12), datetime(2019, 8, 13)),
+                                   url=f"{self.base}/interval", transport=self.transport) for i in range(20)]
+        await asyncio.gather(*(i.run() for i in intervals))
+        self.assertEqual(self.fake.peak, 3)
+        self.assertEqual([3] * len(intervals), [len(i.data) for i in intervals])
+
+    async def test_point(self):
+        """Test that AsyncPoint adds the channel name to the event."""
+        point = AsyncPoint(PointQuery("channel1", datetime(2019, 8, 12)), url=f"{self.base}/point",
+                           transport=self.transport)
+        await point.run()
+        self.assertEqual(point.event['name'], "channel1")
+        self.assertEqual(point.event['data']['v'], 1.0)
+
+    async def test_channel_drops_none_params(self):
+        """Test that unset parameters are not sent, matching requests."""
+        channel = AsyncChannel(ChannelQuery("channel10%"), url=f"{self.base}/channel", transport=self.transport)
+        await channel.run()
+        self.assertEqual(channel.matches[0]['name'], "channel100")
+        self.assertEqual(self.fake.params[0], {'q': 'channel10%', 'm': 'history'})
+
+    async def test_error_status(self):
+        """Test that a non-OK response raises the same MyqueryHTTPError as the blocking transport."""
+        with self.assertRaises(MyqueryHTTPError) as context:
+            await self.transport.get_json(f"{self.base}/error")
+        self.assertIn("status=503", str(context.exception))
+        self.assertIsInstance(context.exception, MyqueryException)
+        self.assertIsInstance(context.exception, requests.HTTPError)
+        self.assertEqual(context.exception.status, 503)
+
+    def test_blocking_options_unavailable(self):
+        """Test that options only the blocking classes implement are rejected rather than run synchronously."""
+        query = IntervalQuery("channel1", datetime(2019, 8, 12), datetime(2019, 8, 13))
+        interval = AsyncInterval(query, url=f"{self.base}/interval", transport=self.transport)
+        self.assertNotIsInstance(interval, Interval)
+        for name in ("iter_chunks", "run_bulk", "shards", "cache"):
+            self.assertFalse(hasattr(interval, name), name)
+        with self.assertRaises(TypeError):
+            AsyncInterval(query, shards=4)
+        with self.assertRaises(ValueError):
+            AsyncMyStats(MyStatsQuery(["channel1"], datetime(2019, 8, 12), datetime(2019, 8, 13)), layout="tall")
+
+    def test_to_aiohttp_params(self):
+        """Test conversion of query parameters."""
+        self.assertEqual(_to_aiohttp_params({'l': None, 'f': 0, 'c': 'a'}), {'f': '0', 'c': 'a'})
+        self.assertEqual(_to_aiohttp_params(None), {})
+
+
+class TestAsyncTransportLoops(unittest.TestCase):
+    """Test cases for using an AsyncTransport from successive event loops."""
+
+    def test_session_replaced(self):
+        """Test that the session of a previous event loop is closed when a new one is created."""
+        transport = AsyncTransport()
+        first = asyncio.run(transport._ensure_session())
+        second = asyncio.run(transport._ensure_session())
+        self.assertIsNot(first, second)
+        self.assertTrue(first.closed)
+        asyncio.run(transport.close())
+        self.assertTrue(second.closed)
@@ -0,0 +1,241 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from jlab_archiver_client import Channel, ChannelQuery, Point, PointQuery
+from jlab_archiver_client.cache import IntervalCache, ResultCache, _coalesce
+from jlab_archiver_client.interval import Interval
+from jlab_archiver_client.query import IntervalQuery
+from jlab_archiver_client.utils import run_in_parallel
+from .test_interval import FakeIntervalTransport
+
+URL = "http://localhost/myquery/interval"
+
+
+class TestIntervalCache(unittest.TestCase):
+    """Test cases for the IntervalCache class."""
+
+    events = [
+        {'d': '2019-08-12 00:00:00', 'v': 1.0},
+        {'d': '2019-08-12 00:10:00', 'v': 2.0},
+        {'d': '2019-08-12 00:30:00', 'x': True, 't': 'NETWORK_DISCONNECTION'},
+        {'d': '2019-08-12 01:00:00', 'v': 3.0},
+        {'d': '2019-08-12 01:00:01', 'v': 4.0},
+        {'d': '2019-08-12 02:00:00', 'v': 5.0},
+        {'d': '2019-08-12 03:59:59', 'v': 6.0},
+    ]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = IntervalCache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_query(self, transport, begin, end, cache=None, **kwargs):
+        interval = Interval(IntervalQuery("channel1", begin, end, **kwargs), url=URL, transport=transport,
+                            cache=cache)
+        interval.run()
+        return interval
+
+    def assert_same_results(self, exp, result):
+        pd.testing.assert_series_equal(exp.data, result.data)
+        pd.testing.assert_series_equal(exp.disconnects, result.disconnects)
+        self.assertEqual(exp.metadata, result.metadata)
+
+    def test_hit_needs_no_requests(self):
+        """Test that a repeated historical query is answered from disk."""
+        begin, end = datetime(2019, 8, 12), datetime(2019, 8, 12, 4)
+        exp = self.run_query(FakeIntervalTransport(self.events), begin, end)
+
+        transport = FakeIntervalTransport(self.events)
+        self.assert_same_results(exp, self.run_query(transport, begin, end, cache=self.cache))
+        self.assertEqual(len(transport.calls), 1)
+        self.assertEqual(len(os.listdir(self.tmp.name)), 1)
+
+        # A new cache object reads the same files
+        transport = FakeIntervalTransport(self.events)
+        self.assert_same_results(exp, self.run_query(transport, begin, end, cache=IntervalCache(self.tmp.name)))
+        self.assertEqual(len(transport.calls), 0)
+
+    def test_only_missing_ranges_requested(self):
+        """Test that overlapping queries only request what is not covered and that coverage is coalesced."""
+        transport = FakeIntervalTransport(self.events)
+        self.run_query(transport, datetime(2019, 8, 12, 0, 20), datetime(2019, 8, 12, 1), cache=self.cache)
+        self.run_query(transport, datetime(2019, 8, 12, 2), datetime(2019, 8, 12, 3), cache=self.cache)
+
+        transport.calls.clear()
+        result = self.run_query(transport, datetime(2019, 8, 12), datetime(2019, 8, 12, 4), cache=self.cache)
+        self.assertEqual([(c['b'], c['e']) for c in transport.calls],
+                         [('2019-08-12T00:00:00', '2019-08-12T00:20:00'),
+                          ('2019-08-12T01:00:00', '2019-08-12T02:00:00'),
+                          ('2019-08-12T03:00:00', '2019-08-12T04:00:00')])
+        self.assertEqual(self.cache.coverage(URL, IntervalQuery("channel1", datetime.now(), datetime.now())),
+                         [(datetime(2019, 8, 12), datetime(2019, 8, 12, 4))])
+
+        exp = self.run_query(FakeIntervalTransport(self.events), datetime(2019, 8, 12), datetime(2019, 8, 12, 4))
+        self.assert_same_results(exp, result)
+
+    def test_coalesce_missing_ranges(self):
+        """Test that missing ranges separated by a short covered range are requested together."""
+        cache = IntervalCache(self.tmp.name, coalesce=timedelta(hours=1))
+        transport = FakeIntervalTransport(self.events)
+        self.run_query(transport, datetime(2019, 8, 12, 1), datetime(2019, 8, 12, 2), cache=cache)
+
+        transport.calls.clear()
+        result = self.run_query(transport, datetime(2019, 8, 12), datetime(2019, 8, 12, 3), cache=cache)
+        self.assertEqual([(c['b'], c['e']) for c in transport.calls], [('2019-08-12T00:00:00', '2019-08-12T03:00:00')])
+        exp = self.run_query(FakeIntervalTransport(self.events), datetime(2019, 8, 12), datetime(2019, 8, 12, 3))
+        self.assert_same_results(exp, result)
+
+    def test_prior_point(self):
+        """Test that the prior point comes from the cache when possible and the point endpoint otherwise."""
+        begin, end = datetime(2019, 8, 12, 0, 45), datetime(2019, 8, 12, 3)
+        exp = self.run_query(FakeIntervalTransport(self.events), begin, end, prior_point=True)
+
+        # Nothing cached before begin, so the point endpoint is asked
+        transport = FakeIntervalTransport(self.events)
+        self.assert_same_results(exp, self.run_query(transport, begin, end, cache=self.cache, prior_point=True))
+        self.assertEqual(transport.calls[-1]['x'], "on")
+
+        # Cache now covers the prior event
+        self.run_query(transport, datetime(2019, 8, 12), begin, cache=self.cache)
+        transport.calls.clear()
+        self.assert_same_results(exp, self.run_query(transport, begin, end, cache=self.cache, prior_point=True))
+        self.assertEqual(len(transport.calls), 0)
+
+        # A disconnect as the prior event
+        begin = datetime(2019, 8, 12, 0, 40)
+        exp = self.run_query(FakeIntervalTransport(self.events), begin, end, prior_point=True)
+        self.assert_same_results(exp, self.run_query(transport, begin, end, cache=self.cache, prior_point=True))
+
+    def test_prior_point_repeated(self):
+        """Test that a repeated prior_point query is answered without any request."""
+        transport = FakeIntervalTransport(self.events)
+        for begin in (datetime(2019, 8, 12, 0, 45), datetime(2019, 8, 11)):
+            with self.subTest(begin=begin):
+                end = datetime(2019, 8, 12, 3)
+                exp = self.run_query(FakeIntervalTransport(self.events), begin, end, prior_point=True)
+                self.assert_same_results(exp, self.run_query(transport, begin, end, cache=self.cache,
+                                                             prior_point=True))
+                transport.calls.clear()
+                # A new IntervalCache reads the stored prior point from disk
+                cache = IntervalCache(self.tmp.name)
+                self.assert_same_results(exp, self.run_query(transport, begin, end, cache=cache, prior_point=True))
+                self.assertEqual(len(transport.calls), 0)
+
+    def test_recent_data_not_cached(self):
+        """Test that data newer than the horizon is always requested."""
+        cache = IntervalCache(self.tmp.name, horizon=timedelta(days=365 * 1000))
+        transport = FakeIntervalTransport(self.events)
+        begin, end = datetime(2019, 8, 12), datetime(2019, 8, 12, 4)
+        self.run_query(transport, begin, end, cache=cache)
+        self.run_query(transport, begin, end, cache=cache)
+        self.assertEqual(len(transport.calls), 2)
+        self.assertEqual(cache.coverage(URL, IntervalQuery("channel1", begin, end)), [])
+
+    def test_unsupported_query_bypasses_cache(self):
+        """Test that sampled queries are not cached."""
+        transport = FakeIntervalTransport(self.events)
+        self.run_query(transport, datetime(2019, 8, 12), datetime(2019, 8, 12, 4), cache=self.cache, bin_limit=10)
+        self.assertEqual(len(transport.calls), 1)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_vector_and_string_values(self):
+        """Test that non-numeric values survive a round trip through the cache files."""
+        begin, end = datetime(2019, 8, 12), datetime(2019, 8, 12, 4)
+        vectors = [dict(e, v=[str(e['v']), "0.5"]) if 'v' in e else e for e in self.events]
+        strings = [dict(e, v=f"state {e['v']}") if 'v' in e else e for e in self.events]
+        for events, datatype, datasize in ((vectors, 'DBR_DOUBLE', 2), (strings, 'DBR_STRING', 1)):
+            with self.subTest(datatype=datatype, datasize=datasize):
+                self.cache.clear()
+                exp = self.run_query(FakeIntervalTransport(events, datatype, datasize), begin, end)
+                transport = FakeIntervalTransport(events, datatype, datasize)
+                self.run_query(transport, begin, end, cache=self.cache)
+                result = self.run_query(transport, begin, end, cache=self.cache)
+                self.assertEqual(len(transport.calls), 1)
+                self.assertEqual([str(v) for v in exp.data], [str(v) for v in result.data])
+                pd.testing.assert_series_equal(exp.disconnects, result.disconnects)
+
+    def test_coalesce(self):
+        """Test merging of time ranges."""
+        t = [datetime(2019, 8, 12, h) for h in range(6)]
+        self.assertEqual(_coalesce([(t[2], t[3]), (t[0], t[1]), (t[1], t[2]), (t[4], t[5]), (t[5], t[5])]),
+                         [(t[0], t[3]), (t[4], t[5])])
+        self.assertEqual(_coalesce([(t[0], t[1]), (t[2], t[3])], timedelta(hours=1)), [(t[0], t[3])])
+
+
+class TestResultCache(unittest.TestCase):
+    """Test cases for the ResultCache class."""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted and that counters are kept."""
+        cache = ResultCache(maxsize=2)
+        cache.get_or_fetch("a", lambda: 1)
+        cache.get_or_fetch("b", lambda: 2)
+        self.assertEqual(cache.get_or_fetch("a", lambda: -1), 1)  # a is now most recently used
+        cache.get_or_fetch("c", lambda: 3)                         # evicts b
+
+        self.assertEqual(cache.get_or_fetch("b", lambda: 4), 4)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 4, 'evictions': 2, 'expirations': 0, 'size': 2,
+                                         'maxsize': 2})
+
+    def test_ttl(self):
+        """Test that entries older than the time-to-live are fetched again."""
+        cache = ResultCache(ttl=10)
+        with patch("jlab_archiver_client.cache.time.monotonic", return_value=100.0):
+            cache.get_or_fetch("a", lambda: 1)
+        with patch("jlab_archiver_client.cache.time.monotonic", return_value=105.0):
+            self.assertEqual(cache.get_or_fetch("a", lambda: 2), 1)
+        with patch("jlab_archiver_client.cache.time.monotonic", return_value=111.0):
+            self.assertEqual(cache.get_or_fetch("a", lambda: 3), 3)
+        self.assertEqual(cache.expirations, 1)
+        self.assertEqual(cache.hits, 1)
+
+    def test_key(self):
+        """Test that keys depend on the url and parameters but not their order."""
+        self.assertEqual(ResultCache.key("u", {'c': 'a', 'f': 0}), ResultCache.key("u", {'f': '0', 'c': 'a'}))
+        self.assertNotEqual(ResultCache.key("u", {'c': 'a'}), ResultCache.key("v", {'c': 'a'}))
+
+    def test_invalid_maxsize(self):
+        with self.assertRaises(ValueError):
+            ResultCache(maxsize=0)
+
+    def test_concurrent_lookups(self):
+        """Test that concurrent lookups keep the cache bounded and the counters consistent."""
+        cache = ResultCache(maxsize=10)
+        tasks = [lambda i=i: cache.get_or_fetch(i % 20, lambda: i % 20) for i in range(400)]
+        results = run_in_parallel(tasks, max_workers=8)
+        self.assertEqual(results, [i % 20 for i in range(400)])
+        stats = cache.stats()
+        self.assertEqual(stats['hits'] + stats['misses'], 400)
+        self.assertEqual(stats['size'], 10)
+
+    def test_point_and_channel(self):
+        """Test that repeated Point and Channel queries are answered from the cache with independent results."""
+        cache = ResultCache()
+        transport = MagicMock()
+        transport.get.return_value.content = json.dumps({'datatype': 'DBR_DOUBLE', 'datasize': 1,
+                                                         'data': {'d': '2019-08-12 00:00:00', 'v': 1.0}}).encode()
+        points = [Point(PointQuery("channel1", datetime(2019, 8, 12)), url="http://localhost/myquery/point",
+                        transport=transport, cache=cache) for _ in range(3)]
+        for point in points:
+            point.run()
+        self.assertEqual(transport.get.call_count, 1)
+        points[0].event['data']['v'] = 2.0
+        self.assertEqual(points[1].event['data']['v'], 1.0)
+        self.assertEqual(points[2].event['name'], "channel1")
+
+        transport.get.return_value.content = json.dumps([{'name': 'channel100'}]).encode()
+        for _ in range(2):
+            channel = Channel(ChannelQuery("channel10%"), url="http://localhost/myquery/channel", transport=transport,
+                              cache=cache)
+            channel.run()
+        self.assertEqual(transport.get.call_count, 2)
+        self.assertEqual(channel.matches, [{'name': 'channel100'}])
+        self.assertEqual(cache.stats()['hits'], 3)
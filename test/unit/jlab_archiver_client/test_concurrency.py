@@ -0,0 +1,112 @@
+import threading
+import time
+import unittest
+from datetime import datetime
+
+import requests
+
+from jlab_archiver_client import Interval
+from jlab_archiver_client.concurrency import AdaptiveLimiter
+from jlab_archiver_client.utils import run_in_parallel
+from .test_interval import FakeIntervalTransport
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    """Test cases for the AdaptiveLimiter class."""
+
+    def test_additive_increase(self):
+        """Test that successes grow a limit that is in use by about one per round, up to max_limit."""
+        limiter = AdaptiveLimiter(initial=2, max_limit=3)
+        limits = []
+        for _ in range(3):
+            tokens = [limiter.acquire(), limiter.acquire()]
+            for token in tokens:
+                limiter.release(token, 0.1, False)
+            limits.append(limiter.limit)
+        self.assertEqual([round(limit, 2) for limit in limits], [2.5, 2.9, 3.0])
+        self.assertEqual(limiter.stats()['completed'], 6)
+
+    def test_unused_limit_does_not_grow(self):
+        """Test that successes do not grow a limit that is mostly unused."""
+        limiter = AdaptiveLimiter(initial=4)
+        for _ in range(10):
+            limiter.release(limiter.acquire(), 0.1, False)
+        self.assertEqual(limiter.limit, 4.0)
+
+    def test_multiplicative_decrease(self):
+        """Test that failures of tasks started together decrease the limit once, down to min_limit."""
+        limiter = AdaptiveLimiter(initial=8, min_limit=2, backoff_ratio=0.5)
+        tokens = [limiter.acquire() for _ in range(4)]
+        for token in tokens:
+            limiter.release(token, 0.1, True)
+        self.assertEqual(limiter.limit, 4.0)
+        self.assertEqual((limiter.stats()['dropped'], limiter.stats()['decreases']), (4, 1))
+
+        for _ in range(3):
+            limiter.release(limiter.acquire(), 0.1, True)
+        self.assertEqual(limiter.limit, 2.0)
+
+    def test_latency_target(self):
+        """Test that tasks slower than the latency target count as failures."""
+        limiter = AdaptiveLimiter(initial=4, latency_target=1.0)
+        limiter.release(limiter.acquire(), 0.5, False)
+        self.assertEqual(limiter.limit, 4.0)
+        limiter.release(limiter.acquire(), 2.0, False)
+        self.assertEqual(limiter.limit, 3.0)
+
+    def test_invalid(self):
+        """Test that inconsistent limits are rejected."""
+        with self.assertRaises(ValueError):
+            AdaptiveLimiter(initial=8, max_limit=4)
+        with self.assertRaises(ValueError):
+            AdaptiveLimiter(min_limit=0)
+        with self.assertRaises(ValueError):
+            AdaptiveLimiter(backoff_ratio=1.0)
+
+
+class TestRunInParallelAdaptive(unittest.TestCase):
+    """Test cases for running tasks under an AdaptiveLimiter."""
+
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    def _task(self, value, fail=False):
+        def task():
+            with self.lock:
+                self.in_flight += 1
+                self.peak = max(self.peak, self.in_flight)
+            time.sleep(0.005)
+            with self.lock:
+                self.in_flight -= 1
+            if fail:
+                raise requests.ConnectionError("overloaded")
+            return value
+        return task
+
+    def test_grows_and_bounds_in_flight(self):
+        """Test that the limit grows with successes and bounds the tasks in flight."""
+        limiter = AdaptiveLimiter(initial=2, max_limit=6)
+        results = run_in_parallel([self._task(i) for i in range(60)], max_workers=limiter)
+        self.assertEqual(results, list(range(60)))
+        self.assertGreater(limiter.limit, 2)
+        self.assertLessEqual(self.peak, 6)
+        self.assertEqual(limiter.stats()['in_flight'], 0)
+
+    def test_failures_shrink(self):
+        """Test that request failures shrink the limit and are raised."""
+        limiter = AdaptiveLimiter(initial=4)
+        with self.assertRaises(requests.ConnectionError):
+            run_in_parallel([self._task(i, fail=i == 0) for i in range(4)], max_workers=limiter)
+        self.assertLess(limiter.limit, 4)
+
+    def test_interval_run_parallel(self):
+        """Test that Interval.run_parallel accepts a limiter in place of max_workers."""
+        events = [{'d': '2019-08-12 00:00:00', 'v': 1.0}, {'d': '2019-08-12 00:10:00', 'v': 2.0}]
+        limiter = AdaptiveLimiter(initial=1, max_limit=2)
+        data, _, _ = Interval.run_parallel([f"channel{i}" for i in range(5)], max_workers=limiter,
+                                           transport=FakeIntervalTransport(events),
+                                           begin=datetime(2019, 8, 12), end=datetime(2019, 8, 12, 1))
+        self.assertEqual(list(data.columns), [f"channel{i}" for i in range(5)])
+        self.assertEqual(limiter.stats()['completed'], 5)
@@ -0,0 +1,70 @@
+import json
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from jlab_archiver_client import Point, PointQuery, decoding
+from jlab_archiver_client.config import config
+from jlab_archiver_client.streaming import IntervalStreamParser
+
+
+class TestDecoding(unittest.TestCase):
+    """Test cases for selecting the JSON decoder."""
+
+    def setUp(self):
+        self.decoder = config.json_decoder
+
+    def tearDown(self):
+        config.set(json_decoder=self.decoder)
+        decoding._decoders.pop("test", None)
+
+    def test_auto(self):
+        """Test that auto prefers orjson and falls back to the standard library."""
+        config.set(json_decoder="auto")
+        exp = "orjson" if decoding.orjson is not None else "json"
+        self.assertIs(decoding.get_decoder(), decoding.get_decoder(exp))
+        self.assertIn("json", decoding.available_decoders())
+
+    def test_loads_bytes(self):
+        """Test that every available decoder decodes bytes and str and raises ValueError for malformed input."""
+        body = '{"datatype":"DBR_DOUBLE","data":{"d":"2019-08-12 00:00:00","v":1.5,"s":"µA"}}'
+        exp = json.loads(body)
+        for name in decoding.available_decoders():
+            with self.subTest(name=name):
+                config.set(json_decoder=name)
+                self.assertEqual(decoding.loads(body.encode()), exp)
+                self.assertEqual(decoding.loads(body), exp)
+                with self.assertRaises(ValueError):
+                    decoding.loads(b'{"data": [1, 2')
+
+    def test_register_decoder(self):
+        """Test that registered decoders are used by the endpoint classes."""
+        calls = []
+
+        def decoder(data):
+            calls.append(data)
+            return json.loads(data)
+
+        decoding.register_decoder("test", decoder)
+        config.set(json_decoder="test")
+        t = MagicMock()
+        t.get.return_value.content = b'{"datatype":"DBR_DOUBLE","data":{"d":"2019-08-12 00:00:00","v":1.0}}'
+        point = Point(PointQuery(channel="channel1", time=datetime(2019, 8, 12)), url="http://localhost/myquery/point",
+                      transport=t)
+        point.run()
+        self.assertEqual(calls, [t.get.return_value.content])
+        self.assertEqual(point.event['data']['v'], 1.0)
+
+        parser = IntervalStreamParser()
+        parser.feed(b'{"datatype":"DBR_DOUBLE","datasize":1,"data":[{"d":"2019-08-12 00:00:00","v":1.5}],'
+                    b'"returnCount":1}')
+        parser.close()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(parser.values.to_array().tolist(), [1.5])
+
+    def test_unknown_decoder(self):
+        """Test that unknown and reserved decoder names are rejected."""
+        with self.assertRaises(ValueError):
+            decoding.get_decoder("missing")
+        with self.assertRaises(ValueError):
+            decoding.register_decoder("auto", json.loads)
@@ -0,0 +1,117 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from jlab_archiver_client.follow import IntervalFollower, RingBuffer
+from .test_interval import FakeIntervalTransport
+
+
+def _ts(*times):
+    return pd.to_datetime(list(times)).to_numpy()
+
+
+class TestRingBuffer(unittest.TestCase):
+    """Test cases for the RingBuffer class."""
+
+    def test_wraps(self):
+        """Test that the oldest events are overwritten once the buffer is full."""
+        buffer = RingBuffer(3, np.float64)
+        buffer.extend(_ts("2019-08-12 00:00", "2019-08-12 00:01"), np.array([1.0, 2.0]), np.array([None, None]))
+        buffer.extend(_ts("2019-08-12 00:02", "2019-08-12 00:03"), np.array([3.0, np.nan]),
+                      np.array([None, "NETWORK_DISCONNECTION"]))
+        self.assertEqual(len(buffer), 3)
+        series = buffer.to_series("channel1")
+        self.assertEqual(list(series.index), list(pd.to_datetime(["2019-08-12 00:01", "2019-08-12 00:02",
+                                                                   "2019-08-12 00:03"])))
+        np.testing.assert_array_equal(series.to_numpy(), [2.0, 3.0, np.nan])
+        self.assertEqual(buffer.disconnects().to_dict(),
+                         {pd.Timestamp("2019-08-12 00:03"): "NETWORK_DISCONNECTION"})
+
+    def test_extend_past_capacity(self):
+        """Test that only the newest events of a batch larger than the buffer are kept."""
+        buffer = RingBuffer(2, object)
+        buffer.extend(_ts("2019-08-12 00:00"), np.array(["a"], dtype=object), np.array([None]))
+        buffer.extend(_ts("2019-08-12 00:01", "2019-08-12 00:02", "2019-08-12 00:03"),
+                      np.array(["b", "c", "d"], dtype=object), np.array([None] * 3))
+        self.assertEqual(list(buffer.to_series()), ["c", "d"])
+
+    def test_invalid(self):
+        """Test that an empty buffer is rejected."""
+        with self.assertRaises(ValueError):
+            RingBuffer(0, np.float64)
+
+
+class TestIntervalFollower(unittest.TestCase):
+    """Test cases for the IntervalFollower class."""
+
+    def setUp(self):
+        self.events = {
+            'channel1': [{'d': '2019-08-12 00:01:00', 'v': 1.0}, {'d': '2019-08-12 00:04:30.250', 'v': 2.0}],
+            'channel2': [],
+        }
+        self.transport = FakeIntervalTransport(self.events)
+        self.follower = IntervalFollower(["channel1", "channel2", "channel1"], capacity=5, url="http://localhost",
+                                         transport=self.transport, lookback=timedelta(minutes=5),
+                                         frac_time_digits=3)
+
+    def test_incremental(self):
+        """Test that later polls only append events that were not seen before."""
+        self.assertEqual(self.follower.poll(end=datetime(2019, 8, 12, 0, 5)), {'channel1': 2, 'channel2': 0})
+
+        self.events['channel1'].append({'d': '2019-08-12 00:05:10', 'x': True, 't': 'NETWORK_DISCONNECTION'})
+        self.events['channel1'].append({'d': '2019-08-12 00:06:00', 'v': 3.0})
+        self.assertEqual(self.follower.poll(end=datetime(2019, 8, 12, 0, 7)), {'channel1': 2, 'channel2': 0})
+
+        data = self.follower.data("channel1")
+        np.testing.assert_array_equal(data.to_numpy(), [1.0, 2.0, np.nan, 3.0])
+        self.assertEqual(list(self.follower.disconnects("channel1")), ["NETWORK_DISCONNECTION"])
+        self.assertEqual(self.follower.last()['channel1'], pd.Timestamp("2019-08-12 00:06:00"))
+        self.assertIsNone(self.follower.last()['channel2'])
+        self.assertEqual(self.follower.stats(), {'polls': 2, 'queries': 4, 'events': 4, 'duplicates': 1})
+
+    def test_query_ranges(self):
+        """Test that polls begin at the last event seen, or at the end of the previous poll if there was none."""
+        self.follower.poll(end=datetime(2019, 8, 12, 0, 5))
+        self.follower.poll(end=datetime(2019, 8, 12, 0, 7))
+        calls = {(c['c'], c['b']) for c in self.transport.calls[2:]}
+        self.assertEqual(calls, {("channel1", "2019-08-12T00:04:30"), ("channel2", "2019-08-12T00:05:00")})
+        self.assertTrue(all('p' not in c for c in self.transport.calls[2:]))
+
+    def test_same_timestamp(self):
+        """Test that an event archived later at the timestamp of the last event seen is still appended."""
+        self.follower.poll(end=datetime(2019, 8, 12, 0, 5))
+        self.events['channel1'].append({'d': '2019-08-12 00:04:30.250', 'v': 2.5})
+        self.assertEqual(self.follower.poll(end=datetime(2019, 8, 12, 0, 7))['channel1'], 1)
+        self.assertEqual(self.follower.poll(end=datetime(2019, 8, 12, 0, 8))['channel1'], 0)
+        np.testing.assert_array_equal(self.follower.data("channel1").to_numpy(), [1.0, 2.0, 2.5])
+
+    def test_empty_channel(self):
+        """Test that a channel without events has empty results."""
+        self.follower.poll(end=datetime(2019, 8, 12, 0, 5))
+        self.assertEqual(len(self.follower.data("channel2")), 0)
+        self.assertEqual(len(self.follower.disconnects("channel2")), 0)
+        self.assertEqual(self.follower.metadata("channel2")['returnCount'], 0)
+        self.assertEqual(self.follower.channels, ["channel1", "channel2"])
+
+    @patch("jlab_archiver_client.follow.time.sleep")
+    def test_follow(self, sleep):
+        """Test that follow polls the requested number of times and waits between polls."""
+        with patch("jlab_archiver_client.follow.datetime") as dt:
+            dt.now.side_effect = [datetime(2019, 8, 12, 0, 5), datetime(2019, 8, 12, 0, 7)]
+            results = list(self.follower.follow(interval=10, polls=2))
+        self.assertEqual([r['channel1'] for r in results], [2, 0])
+        self.assertEqual(sleep.call_count, 1)
+
+    def test_invalid(self):
+        """Test that invalid settings are rejected."""
+        with self.assertRaises(ValueError):
+            IntervalFollower(["channel1"], capacity=0)
+        with self.assertRaises(ValueError):
+            IntervalFollower(["channel1"], integrate=True)
+        with self.assertRaises(ValueError):
+            IntervalFollower(["channel1"], unix_timestamps_ms=True)
+        with self.assertRaises(ValueError):
+            IntervalFollower(["channel1"], adjust_time_to_server_offset=True)
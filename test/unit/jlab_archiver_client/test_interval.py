@@ -1,16 +1,94 @@
+import json
 import os
 import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
 
 import numpy as np
 import pandas as pd
+import requests
 
 from jlab_archiver_client.interval import Interval
+from jlab_archiver_client.query import IntervalQuery
 
 
 DIR = os.path.dirname(__file__)
 
 
+def _display(d, frac_time_digits):
+    """Truncate a timestamp to the given number of fractional second digits."""
+    t = datetime.fromisoformat(d)
+    shown = t.strftime("%Y-%m-%d %H:%M:%S")
+    return shown if frac_time_digits == 0 else f"{shown}.{t.strftime('%f')[:frac_time_digits]}"
+
+
+class FakeIntervalTransport:
+    """Serves interval responses from a fixed list of events, or a dictionary of events per channel.  Both ends of the
+    range are inclusive."""
+
+    def __init__(self, events, datatype='DBR_DOUBLE', datasize=1):
+        self.events = events
+        self.datatype = datatype
+        self.datasize = datasize
+        self.calls = []
+
+    def get(self, url, params, stream=False):
+        self.calls.append(params)
+        if 't' in params:
+            return self._point(params)
+        events = self._events(params)
+        b = datetime.fromisoformat(params['b'])
+        e = datetime.fromisoformat(params['e'])
+        # Events are selected by their full time but shown with only f fractional digits, like myquery
+        data = [dict(ev, d=_display(ev['d'], int(params.get('f', 0)))) for ev in events
+                if b <= datetime.fromisoformat(ev['d']) <= e]
+        if 'p' in params:
+            prior = [ev for ev in events if datetime.fromisoformat(ev['d']) < b]
+            if len(prior) > 0:
+                data = [dict(prior[-1], d=b.strftime("%Y-%m-%d %H:%M:%S"))] + data
+        body = json.dumps({'datatype': self.datatype, 'datasize': self.datasize, 'datahost': 'mya', 'ioc': None,
+                           'active': True, 'sampled': False, 'data': data, 'returnCount': len(data)}).encode()
+        r = MagicMock()
+        r.__enter__.return_value = r
+        r.iter_content.side_effect = lambda chunk_size: (body[i:i + 64] for i in range(0, len(body), 64))
+        return r
+
+    def _events(self, params):
+        return self.events[params['c']] if isinstance(self.events, dict) else self.events
+
+    def _point(self, params):
+        """Emulate the point endpoint's search for the last event before (or at) a time."""
+        t = datetime.fromisoformat(params['t'])
+        prior = [ev for ev in self._events(params) if datetime.fromisoformat(ev['d']) < t
+                 or ('x' not in params and datetime.fromisoformat(ev['d']) == t)]
+        r = MagicMock()
+        r.content = json.dumps({'datatype': self.datatype, 'datasize': self.datasize, 'datahost': 'mya',
+                                'data': prior[-1] if len(prior) > 0 else {}}).encode()
+        return r
+
+
 class TestInterval(unittest.TestCase):
+    events = [
+        {'d': '2019-08-12 00:00:00', 'v': 1.0},
+        {'d': '2019-08-12 00:10:00', 'v': 2.0},
+        {'d': '2019-08-12 00:30:00', 'x': True, 't': 'NETWORK_DISCONNECTION'},
+        {'d': '2019-08-12 01:00:00', 'v': 3.0},
+        {'d': '2019-08-12 01:00:01', 'v': 4.0},
+        {'d': '2019-08-12 02:00:00', 'v': 5.0},
+        {'d': '2019-08-12 03:59:59', 'v': 6.0},
+    ]
+
+    # Several events in the displayed second of the boundary between two shards of 00:00-02:00
+    same_second_events = [
+        {'d': '2019-08-12 00:30:00', 'v': 1.0},
+        {'d': '2019-08-12 01:00:00', 'v': 2.0},
+        {'d': '2019-08-12 01:00:00', 'x': True, 't': 'NETWORK_DISCONNECTION'},
+        {'d': '2019-08-12 01:00:00.250', 'v': 3.0},
+        {'d': '2019-08-12 01:00:00.500', 'x': True, 't': 'NETWORK_DISCONNECTION'},
+        {'d': '2019-08-12 01:00:00.750', 'v': 4.0},
+        {'d': '2019-08-12 01:30:00', 'v': 5.0},
+    ]
+
     s1 = pd.Series(
         [7.930, 0.000, 6.996, 7.930, 7.755, np.nan, 7.755, np.nan],
         index=pd.to_datetime([
@@ -67,3 +145,246 @@ class TestInterval(unittest.TestCase):
         exp = self.df_s1_s2
         result = Interval._combine_series([self.s1, self.s2])
         self.assertTrue(exp.equals(result), f"\nExp:\n{exp}\nResult:\n{result}\n")
+
+    def test__combine_series_unsorted(self):
+        """Test that NaNs are restored correctly when a series is not in chronological order."""
+        exp = self.df_s1_s2
+        result = Interval._combine_series([self.s1.iloc[::-1], self.s2])
+        self.assertTrue(exp.equals(result), f"\nExp:\n{exp}\nResult:\n{result}\n")
+
+    def test_run_shards(self):
+        """Test that a sharded query matches the unsharded query, including boundary events and prior points."""
+        query = IntervalQuery("channel1", begin=datetime(2019, 8, 12, 0, 5), end=datetime(2019, 8, 12, 4),
+                              prior_point=True)
+        exp = Interval(query, url="http://localhost", transport=FakeIntervalTransport(self.events))
+        exp.run()
+
+        transport = FakeIntervalTransport(self.events)
+        result = Interval(query, url="http://localhost", transport=transport, shards=4)
+        result.run()
+
+        self.assertEqual(len(transport.calls), 4)
+        self.assertEqual([c['b'] for c in transport.calls],
+                         ["2019-08-12T00:05:00", "2019-08-12T01:03:45", "2019-08-12T02:02:30", "2019-08-12T03:01:15"])
+        self.assertEqual(['p' in c for c in transport.calls], [True, False, False, False])
+        pd.testing.assert_series_equal(exp.data, result.data)
+        pd.testing.assert_series_equal(exp.disconnects, result.disconnects)
+        self.assertDictEqual(exp.metadata, result.metadata)
+
+    def test_run_shards_boundary_duplicate(self):
+        """Test that an event on a shard boundary returned by both shards is kept once."""
+        query = IntervalQuery("channel1", begin=datetime(2019, 8, 12), end=datetime(2019, 8, 12, 2))
+        result = Interval(query, url="http://localhost", transport=FakeIntervalTransport(self.events), shards=2)
+        result.run()
+
+        exp = pd.Series([1.0, 2.0, np.nan, 3.0, 4.0, 5.0], name="channel1",
+                        index=pd.to_datetime([e['d'] for e in self.events[:6]]))
+        pd.testing.assert_series_equal(exp, result.data)
+        self.assertEqual(result.metadata['returnCount'], 6)
+
+    def test_run_shards_same_second(self):
+        """Test that distinct events in the displayed second of a shard boundary are all kept."""
+        query = IntervalQuery("channel1", begin=datetime(2019, 8, 12), end=datetime(2019, 8, 12, 2))
+        exp = Interval(query, url="http://localhost", transport=FakeIntervalTransport(self.same_second_events))
+        exp.run()
+        transport = FakeIntervalTransport(self.same_second_events)
+        result = Interval(query, url="http://localhost", transport=transport, shards=2)
+        result.run()
+
+        self.assertEqual(transport.calls[1]['b'], "2019-08-12T01:00:00")
+        self.assertEqual(len(exp.data), 7)
+        pd.testing.assert_series_equal(exp.data, result.data)
+        pd.testing.assert_series_equal(exp.disconnects, result.disconnects)
+        self.assertEqual(result.metadata['returnCount'], 7)
+
+    def test_run_shards_empty(self):
+        """Test that empty shards do not change the dtype of the combined data."""
+        query = IntervalQuery("channel1", begin=datetime(2019, 8, 12, 1, 30), end=datetime(2019, 8, 12, 3, 30))
+        result = Interval(query, url="http://localhost", transport=FakeIntervalTransport(self.events), shards=4)
+        result.run()
+
+        self.assertEqual(result.data.dtype, float)
+        self.assertEqual(list(result.data.values), [5.0])
+
+    def test_run_shards_vectors(self):
+        """Test that the compact vector block of a sharded query matches the unsharded query."""
+        events = [dict(e, v=[str(e['v'])] * (2 + i % 2)) if 'v' in e else e for i, e in enumerate(self.events)]
+        query = IntervalQuery("channel1", begin=datetime(2019, 8, 12), end=datetime(2019, 8, 12, 4))
+        exp = Interval(query, url="http://localhost", transport=FakeIntervalTransport(events, datasize=3))
+        exp.run()
+        result = Interval(query, url="http://localhost", transport=FakeIntervalTransport(events, datasize=3), shards=3)
+        result.run()
+
+        self.assertEqual(exp.vectors.values.shape, (7, 3))
+        np.testing.assert_array_equal(exp.vectors.values, result.vectors.values)
+        np.testing.assert_array_equal(exp.vectors.mask, result.vectors.mask)
+        self.assertTrue(exp.vectors.index.equals(result.data.index))
+        self.assertIsNone(result.data.iloc[2])
+        np.testing.assert_array_equal(result.data.iloc[1], [2.0, 2.0, 2.0])
+
+    def test_fetch_events(self):
+        """Test that fetch_events returns the events of a single request as arrays."""
+        query = IntervalQuery("channel1", begin=datetime(2019, 8, 12), end=datetime(2019, 8, 12, 2))
+        exp = Interval(query, url="http://localhost", transport=FakeIntervalTransport(self.events))
+        exp.run()
+        transport = FakeIntervalTransport(self.events)
+        result = Interval(query, url="http://localhost", transport=transport, shards=2)
+        ts, values, disconnects, metadata = result.fetch_events()
+
+        self.assertEqual(len(transport.calls), 1)
+        self.assertIsNone(result.data)
+        np.testing.assert_array_equal(ts, exp.data.index.to_numpy())
+        np.testing.assert_array_equal(values, exp.data.to_numpy())
+        self.assertEqual(disconnects.tolist(), [None, None, 'NETWORK_DISCONNECTION', None, None, None])
+        self.assertEqual(metadata, exp.metadata)
+
+    def test_fetch_events_empty(self):
+        """Test that fetch_events returns empty arrays when there are no events."""
+        query = IntervalQuery("channel1", begin=datetime(2019, 8, 13), end=datetime(2019, 8, 14))
+        ts, values, disconnects, _ = Interval(query, url="http://localhost",
+                                              transport=FakeIntervalTransport(self.events)).fetch_events()
+        self.assertEqual((ts.dtype, len(ts), len(values), len(disconnects)), (np.dtype("datetime64[ns]"), 0, 0, 0))
+
+    def test_shards_invalid(self):
+        """Test that invalid shard settings are rejected."""
+        query = IntervalQuery("channel1", begin=datetime(2019, 8, 12), end=datetime(2019, 8, 13), integrate=True)
+        with self.assertRaises(ValueError):
+            Interval(query, shards=2)
+        with self.assertRaises(ValueError):
+            Interval(query, shards=0)
+
+
+class TestIntervalChunks(unittest.TestCase):
+    """Test cases for iterating over interval events in chunks."""
+    events = TestInterval.events
+
+    def _interval(self, events=None, shards=1, datasize=1, **kwargs):
+        query = IntervalQuery("channel1", begin=datetime(2019, 8, 12, 0, 5), end=datetime(2019, 8, 12, 4), **kwargs)
+        transport = FakeIntervalTransport(self.events if events is None else events, datasize=datasize)
+        return Interval(query, url="http://localhost", transport=transport, shards=shards)
+
+    def test_frames_match_run(self):
+        """Test that the chunks of a sharded query hold the same events as run, each event once."""
+        exp = self._interval(prior_point=True)
+        exp.run()
+
+        chunks = list(self._interval(shards=4, prior_point=True).iter_chunks(chunk_size=2, prefetch=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 2, 1])
+        result = pd.concat(chunks)
+        self.assertTrue(result.index.equals(exp.data.index))
+        np.testing.assert_array_equal(result['value'].to_numpy(), exp.data.to_numpy())
+        self.assertEqual(list(result['disconnect'].dropna()), list(exp.disconnects.values))
+        self.assertEqual(result.index.name, "timestamp")
+
+    def test_same_second(self):
+        """Test that distinct events in the displayed second of a shard boundary are all yielded."""
+        query = IntervalQuery("channel1", begin=datetime(2019, 8, 12), end=datetime(2019, 8, 12, 2))
+        transport = FakeIntervalTransport(TestInterval.same_second_events)
+        result = pd.concat(Interval(query, url="http://localhost", transport=transport, shards=2)
+                           .iter_chunks(chunk_size=3))
+        self.assertEqual(transport.calls[1]['b'], "2019-08-12T01:00:00")
+        np.testing.assert_array_equal(result['value'].to_numpy(), [1.0, 2.0, np.nan, 3.0, np.nan, 4.0, 5.0])
+        self.assertEqual(result['disconnect'].count(), 2)
+
+    def test_records(self):
+        """Test that chunks can be NumPy record arrays."""
+        chunks = list(self._interval(shards=2).iter_chunks(chunk_size=4, output="records"))
+        self.assertEqual(chunks[0].dtype.names, ("timestamp", "value", "disconnect"))
+        records = np.concatenate(chunks)
+        self.assertEqual(records['timestamp'][0], np.datetime64("2019-08-12T00:10:00"))
+        np.testing.assert_array_equal(records['value'], [2.0, np.nan, 3.0, 4.0, 5.0, 6.0])
+        self.assertEqual(records['disconnect'][1], "NETWORK_DISCONNECTION")
+
+    def test_vectors(self):
+        """Test that vector values are yielded as arrays."""
+        events = [dict(e, v=[str(e['v'])] * 2) if 'v' in e else e for e in self.events]
+        result = pd.concat(self._interval(events, datasize=2).iter_chunks(chunk_size=3))
+        np.testing.assert_array_equal(result['value'].iloc[0], [2.0, 2.0])
+        self.assertIsNone(result['value'].iloc[1])
+
+    def test_stop_early(self):
+        """Test that readers stop when the caller stops iterating."""
+        chunks = self._interval(shards=4).iter_chunks(chunk_size=1, prefetch=3)
+        self.assertEqual(len(next(chunks)), 1)
+        chunks.close()
+
+    def test_error(self):
+        """Test that a failed read is raised to the caller."""
+        interval = self._interval(shards=2)
+        interval.transport.get = MagicMock(side_effect=requests.ConnectionError("reset"))
+        with self.assertRaises(requests.ConnectionError):
+            list(interval.iter_chunks())
+
+    def test_invalid(self):
+        """Test that invalid arguments are rejected before iterating."""
+        interval = self._interval()
+        with self.assertRaises(ValueError):
+            interval.iter_chunks(chunk_size=0)
+        with self.assertRaises(ValueError):
+            interval.iter_chunks(prefetch=-1)
+        with self.assertRaises(ValueError):
+            interval.iter_chunks(output="series")
+
+
+class TestIntervalBulk(unittest.TestCase):
+    """Test cases for creating and running interval queries for many channels."""
+    events = {
+        'channel1': [{'d': '2019-08-12 00:00:00', 'v': 1.0}, {'d': '2019-08-12 00:10:00', 'v': 2.0},
+                     {'d': '2019-08-12 00:30:00', 'x': True, 't': 'NETWORK_DISCONNECTION'}],
+        'channel2': [{'d': '2019-08-11 23:00:00', 'v': 9.0}, {'d': '2019-08-12 00:10:00', 'v': 3.0},
+                     {'d': '2019-08-12 00:20:00', 'v': 4.0}],
+    }
+    begin = datetime(2019, 8, 12)
+    end = datetime(2019, 8, 12, 1)
+
+    def test_create_queries(self):
+        """Test that one query is made per distinct PV with the shared options."""
+        queries = Interval.create_queries(["channel1", "channel2", "channel1"], begin=self.begin, end=self.end,
+                                          channel="ignored", enums_as_strings=True)
+        self.assertEqual([q.channel for q in queries], ["channel1", "channel2"])
+        self.assertTrue(all(q.begin == self.begin and q.enums_as_strings for q in queries))
+
+    def test_series(self):
+        """Test that the raw Series of each channel are returned without a prior point or merging."""
+        transport = FakeIntervalTransport(self.events)
+        data, disconnects, metadata = Interval.run_bulk(["channel1", "channel2"], transport=transport,
+                                                        begin=self.begin, end=self.end)
+        for channel in ("channel1", "channel2"):
+            exp = Interval(IntervalQuery(channel, self.begin, self.end), url="http://localhost",
+                           transport=transport)
+            exp.run()
+            pd.testing.assert_series_equal(data[channel], exp.data)
+            pd.testing.assert_series_equal(disconnects[channel], exp.disconnects)
+            self.assertEqual(metadata[channel], exp.metadata)
+        self.assertTrue(all('p' not in params for params in transport.calls))
+
+    def test_long(self):
+        """Test the long table of events, ordered by timestamp and then by channel."""
+        data, _, _ = Interval.run_bulk(["channel2", "channel1"], output="long",
+                                       transport=FakeIntervalTransport(self.events), begin=self.begin, end=self.end)
+        self.assertEqual(list(data.columns), ["timestamp", "channel", "value"])
+        self.assertEqual(list(data['channel'].cat.categories), ["channel2", "channel1"])
+        self.assertEqual(data['channel'].tolist(), ["channel1", "channel2", "channel1", "channel2", "channel1"])
+        self.assertEqual(data['timestamp'].tolist(), pd.to_datetime(
+            ["2019-08-12 00:00:00", "2019-08-12 00:10:00", "2019-08-12 00:10:00", "2019-08-12 00:20:00",
+             "2019-08-12 00:30:00"]).tolist())
+        np.testing.assert_array_equal(data['value'].to_numpy(), [1.0, 3.0, 2.0, 4.0, np.nan])
+
+        data, _, _ = Interval.run_bulk([], output="long", transport=FakeIntervalTransport(self.events),
+                                       begin=self.begin, end=self.end)
+        self.assertEqual((len(data), list(data.columns)), (0, ["timestamp", "channel", "value"]))
+
+    def test_wide(self):
+        """Test that the wide output merges the channels like run_parallel."""
+        transport = FakeIntervalTransport(self.events)
+        data, _, _ = Interval.run_bulk(["channel1", "channel2"], output="wide", transport=transport,
+                                       begin=self.begin, end=self.end, prior_point=True)
+        exp, _, _ = Interval.run_parallel(["channel1", "channel2"], transport=transport, begin=self.begin,
+                                          end=self.end)
+        pd.testing.assert_frame_equal(data, exp)
+        self.assertEqual(data.loc[self.begin, "channel2"], 9.0)
+
+    def test_invalid_output(self):
+        """Test that unknown outputs are rejected."""
+        with self.assertRaises(ValueError):
+            Interval.run_bulk(["channel1"], output="tall", begin=self.begin, end=self.end)
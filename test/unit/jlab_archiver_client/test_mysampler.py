@@ -0,0 +1,136 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pandas as pd
+import requests
+
+from jlab_archiver_client import MySampler, MySamplerQuery
+from jlab_archiver_client.config import config
+
+
+class FakeMySamplerTransport:
+    """Serves mysampler responses for any channel.  Channels ending in 2 are disconnected on odd seconds."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params):
+        self.calls.append(params)
+        start = datetime.fromisoformat(params['b'])
+        times = [start + timedelta(milliseconds=i * params['s']) for i in range(params['n'])]
+        channels = {}
+        for channel in params['c'].split(","):
+            data = []
+            for t in times:
+                d = t.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+                if channel.endswith("2") and t.second % 2 == 1:
+                    data.append({'d': d, 't': 'NETWORK_DISCONNECTION'})
+                else:
+                    data.append({'d': d, 'v': len(channel) + t.timestamp() % 60})
+            channels[channel] = {'metadata': {'name': channel, 'datatype': 'DBR_DOUBLE', 'datasize': 1},
+                                 'data': data, 'returnCount': len(data)}
+        r = MagicMock()
+        r.content = json.dumps({'channels': channels}).encode()
+        return r
+
+
+class TestMySamplerBatches(unittest.TestCase):
+    """Test cases for splitting large pvlists into batches."""
+
+    query = MySamplerQuery(datetime(2019, 8, 12), interval=1000, num_samples=3,
+                           pvlist=[f"channel{i}" for i in range(1, 13)])
+
+    def run_query(self, query=None, **kwargs):
+        transport = FakeMySamplerTransport()
+        mysampler = MySampler(self.query if query is None else query, url="http://localhost/myquery/mysampler",
+                              transport=transport, **kwargs)
+        mysampler.run()
+        return mysampler, transport
+
+    def assert_same_results(self, exp, result):
+        pd.testing.assert_frame_equal(exp.data, result.data)
+        self.assertEqual(exp.metadata, result.metadata)
+        self.assertEqual(exp.disconnects.keys(), result.disconnects.keys())
+        for channel, disconnects in exp.disconnects.items():
+            pd.testing.assert_series_equal(disconnects, result.disconnects[channel])
+
+    def test_batch_size(self):
+        """Test that batched results match a single request."""
+        exp, _ = self.run_query()
+        result, transport = self.run_query(batch_size=5)
+
+        self.assertEqual([p['c'].count(",") + 1 for p in transport.calls], [5, 5, 2])
+        self.assert_same_results(exp, result)
+        self.assertEqual(list(result.data.columns), self.query.pvlist)
+
+    def test_url_length(self):
+        """Test that no request URL is longer than config.max_url_length."""
+        original = config.max_url_length
+        try:
+            config.set(max_url_length=150)
+            result, transport = self.run_query()
+        finally:
+            config.set(max_url_length=original)
+
+        self.assertGreater(len(transport.calls), 1)
+        for params in transport.calls:
+            url = requests.Request("GET", result.url, params=params).prepare().url
+            self.assertLessEqual(len(url), 150, url)
+        self.assertEqual(list(result.data.columns), self.query.pvlist)
+
+    def test_invalid_batch_size(self):
+        with self.assertRaises(ValueError):
+            MySampler(self.query, batch_size=0)
+
+
+class TestMySamplerShards(unittest.TestCase):
+    """Test cases for splitting a query into windows of sample times."""
+
+    def run_query(self, query, **kwargs):
+        transport = FakeMySamplerTransport()
+        mysampler = MySampler(query, url="http://localhost/myquery/mysampler", transport=transport, **kwargs)
+        mysampler.run()
+        return mysampler, transport
+
+    def test_windows_aligned(self):
+        """Test that windows start on whole seconds and that every sample instant is returned exactly once."""
+        query = MySamplerQuery(datetime(2019, 8, 12), interval=750, num_samples=25, pvlist=["channel1", "channel2"])
+        exp, _ = self.run_query(query)
+        result, transport = self.run_query(query, shards=3, batch_size=1)
+
+        # Four samples of 750 ms span three seconds, so windows hold a multiple of four samples
+        self.assertEqual(sorted((p['b'], p['n']) for p in transport.calls),
+                         [('2019-08-12T00:00:00', 12)] * 2 + [('2019-08-12T00:00:09', 12)] * 2
+                         + [('2019-08-12T00:00:18', 1)] * 2)
+        self.assertFalse(result.data.index.has_duplicates)
+        TestMySamplerBatches.assert_same_results(self, exp, result)
+        self.assertEqual(result.metadata['channel1']['returnCount'], 25)
+
+    def test_window_of_disconnects(self):
+        """Test that a window where a channel is always disconnected does not change the column dtype."""
+        query = MySamplerQuery(datetime(2019, 8, 12), interval=1000, num_samples=6, pvlist=["channel1", "channel2"])
+        exp, _ = self.run_query(query)
+        result, _ = self.run_query(query, shards=6)
+        self.assertEqual(result.data.channel2.dtype, float)
+        TestMySamplerBatches.assert_same_results(self, exp, result)
+
+    def test_more_shards_than_samples(self):
+        query = MySamplerQuery(datetime(2019, 8, 12), interval=1000, num_samples=2, pvlist=["channel1"])
+        exp, _ = self.run_query(query)
+        result, transport = self.run_query(query, shards=8)
+        self.assertEqual(len(transport.calls), 2)
+        TestMySamplerBatches.assert_same_results(self, exp, result)
+
+    def test_no_samples(self):
+        """Test that a query for no samples is sent unsplit."""
+        query = MySamplerQuery(datetime(2019, 8, 12), interval=1000, num_samples=0, pvlist=["channel1"])
+        exp, _ = self.run_query(query)
+        result, transport = self.run_query(query, shards=4)
+        self.assertEqual([p['n'] for p in transport.calls], [0])
+        TestMySamplerBatches.assert_same_results(self, exp, result)
+
+    def test_invalid_shards(self):
+        with self.assertRaises(ValueError):
+            MySampler(MySamplerQuery(datetime(2019, 8, 12), 1000, 2, ["channel1"]), shards=0)
@@ -0,0 +1,225 @@
+import copy
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+
+from jlab_archiver_client import MyStats, MyStatsQuery
+
+
+class FakeMyStatsTransport:
+    """Serves mystats responses with two bins for each requested channel.  Channels named 'string*' are rejected."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params):
+        self.calls.append(params)
+        channels = {}
+        for channel in params['c'].split(","):
+            if channel.startswith("string"):
+                channels[channel] = {'error': "Only float types are supported"}
+                continue
+            data = [{'begin': f"2019-08-12 0{h}:00:00", 'mean': float(len(channel) + h), 'min': 0.0, 'max': 10.0}
+                    for h in range(2)]
+            channels[channel] = {'metadata': {'name': channel, 'datatype': 'DBR_DOUBLE', 'datasize': 1},
+                                 'data': data}
+        r = MagicMock()
+        r.content = json.dumps({'channels': channels}).encode()
+        return r
+
+
+class TestMyStatsChannelSeries(unittest.TestCase):
+    """Test cases for building the (timestamp, stat) Series of a channel."""
+
+    def test_channel_series(self):
+        """Test that stats are sorted within each bin and that missing stats are NaN."""
+        channel_obj = {'data': [{'begin': '2019-08-12 00:00:00', 'mean': 1.5, 'max': 2, 'min': 1},
+                                {'begin': '2019-08-12 01:00:00', 'mean': 2.5, 'max': 3}]}
+        exp = pd.Series([2.0, 1.5, 1.0, 3.0, 2.5, np.nan], index=pd.MultiIndex.from_tuples(
+            [(pd.Timestamp(f"2019-08-12 0{h}:00:00"), stat) for h in range(2) for stat in ("max", "mean", "min")],
+            names=["timestamp", "stat"]))
+        pd.testing.assert_series_equal(exp, MyStats._channel_series(channel_obj))
+
+
+class TestMyStatsBatches(unittest.TestCase):
+    """Test cases for splitting large pvlists into batches."""
+
+    query = MyStatsQuery(["channel1", "channel100", "string1", "string2", "channel2", "channel1000"],
+                         start=datetime(2019, 8, 12), end=datetime(2019, 8, 12, 2), num_bins=2)
+
+    def run_query(self, **kwargs):
+        transport = FakeMyStatsTransport()
+        mystats = MyStats(self.query, url="http://localhost/myquery/mystats", transport=transport, **kwargs)
+        with self.assertWarns(UserWarning):
+            mystats.run()
+        return mystats, transport
+
+    def test_batch_size(self):
+        """Test that batched results match a single request, including a batch with only rejected channels."""
+        exp, _ = self.run_query()
+        result, transport = self.run_query(batch_size=2, max_workers=2)
+
+        self.assertEqual([p['c'] for p in transport.calls],
+                         ["channel1,channel100", "string1,string2", "channel2,channel1000"])
+        pd.testing.assert_frame_equal(exp.data, result.data)
+        self.assertEqual(list(result.data.columns), ["channel1", "channel100", "channel2", "channel1000"])
+        self.assertEqual(exp.metadata, result.metadata)
+
+
+class FakeMyStatsSignalTransport:
+    """Computes mystats statistics of a step signal.  The signal changes value every 7 minutes from 00:03:30."""
+
+    def __init__(self):
+        self.calls = []
+        start = datetime(2019, 8, 11, 23, 56, 30)
+        self.times = [start + timedelta(minutes=7 * i) for i in range(300)]
+        self.values = [float((i * 37) % 11) for i in range(300)]
+
+    def bin_stats(self, b0, b1):
+        """Time weighted statistics with the value in effect at b0 counted as an update."""
+        edges = [b0] + [t for t in self.times if b0 < t < b1] + [b1]
+        values = [self.values[max(i for i, t in enumerate(self.times) if t <= e)] for e in edges[:-1]]
+        dt = np.diff([(e - b0).total_seconds() for e in edges])
+        duration = dt.sum()
+        mean = np.dot(values, dt) / duration
+        rms = np.sqrt(np.dot(np.square(values), dt) / duration)
+        return {'duration': duration, 'eventCount': len(values) + 1, 'integration': np.dot(values, dt),
+                'max': max(values), 'mean': mean, 'min': min(values), 'rms': rms,
+                'stdev': np.sqrt(max(rms ** 2 - mean ** 2, 0)), 'updateCount': len(values)}
+
+    def get(self, url, params):
+        self.calls.append(params)
+        begin = datetime.fromisoformat(params['b'])
+        width = (datetime.fromisoformat(params['e']) - begin) / params['n']
+        data = [dict(begin=(begin + width * i).isoformat(sep=" "),
+                     **self.bin_stats(begin + width * i, begin + width * (i + 1))) for i in range(params['n'])]
+        r = MagicMock()
+        channels = {c: {'metadata': {'name': c}, 'data': data} for c in params['c'].split(",")}
+        r.content = json.dumps({'channels': channels}).encode()
+        return r
+
+
+class TestMyStatsShards(unittest.TestCase):
+    """Test cases for splitting the time range of a query and merging sub-bins."""
+
+    query = MyStatsQuery(["channel1", "channel2"], start=datetime(2019, 8, 12), end=datetime(2019, 8, 13), num_bins=6)
+
+    def run_query(self, query=None, **kwargs):
+        transport = FakeMyStatsSignalTransport()
+        mystats = MyStats(self.query if query is None else query, url="http://localhost/myquery/mystats",
+                          transport=transport, **kwargs)
+        mystats.run()
+        return mystats, transport
+
+    def test_shards(self):
+        """Test that shards split along bin boundaries and concatenate to the single request."""
+        exp, _ = self.run_query()
+        result, transport = self.run_query(shards=4)
+        self.assertEqual(sorted((p['b'], p['e'], p['n']) for p in transport.calls),
+                         [('2019-08-12T00:00:00', '2019-08-12T08:00:00', 2),
+                          ('2019-08-12T08:00:00', '2019-08-12T16:00:00', 2),
+                          ('2019-08-12T16:00:00', '2019-08-13T00:00:00', 2)])
+        pd.testing.assert_frame_equal(exp.data, result.data)
+        self.assertEqual(exp.metadata, result.metadata)
+
+    def test_shards_whole_seconds(self):
+        """Test that shards only start a whole number of seconds into the query."""
+        query = MyStatsQuery(["channel1"], start=datetime(2019, 8, 12), end=datetime(2019, 8, 12, 0, 0, 10),
+                             num_bins=4)
+        _, transport = self.run_query(query, shards=4)
+        self.assertEqual([(p['b'], p['n']) for p in transport.calls],
+                         [('2019-08-12T00:00:00', 2), ('2019-08-12T00:00:05', 2)])
+
+    def assert_merged(self, query, result, sub_bins):
+        """Check that merged statistics match the coarse bins and that the counts are the sums of sub-bin counts."""
+        exp, _ = self.run_query(query)
+        fine_query = copy.copy(query)
+        fine_query.num_bins *= sub_bins
+        fine, _ = self.run_query(fine_query)
+
+        counts = ["eventCount", "updateCount"]
+        pd.testing.assert_frame_equal(exp.data.drop(index=counts, level="stat"),
+                                      result.data.drop(index=counts, level="stat"), check_exact=False, rtol=1e-9)
+        for stat in counts:
+            fine_counts = fine.data.xs(stat, level="stat")
+            summed = fine_counts.groupby(np.arange(len(fine_counts)) // sub_bins).sum()
+            merged = result.data.xs(stat, level="stat")
+            pd.testing.assert_frame_equal(summed.set_axis(merged.index), merged)
+            self.assertTrue((merged >= exp.data.xs(stat, level="stat")).all().all())
+
+    def test_sub_bins(self):
+        """Test that statistics merged from sub-bins match those of the coarse bins."""
+        result, transport = self.run_query(shards=5, sub_bins=8)
+        self.assertEqual(sum(p['n'] for p in transport.calls), 48)
+        self.assertEqual(len(transport.calls), 5)
+        self.assert_merged(self.query, result, 8)
+
+    def test_single_bin(self):
+        """Test that a single bin can be split into shards."""
+        query = MyStatsQuery(["channel1"], start=datetime(2019, 8, 12), end=datetime(2019, 8, 12, 9), num_bins=1)
+        result, transport = self.run_query(query, shards=3, sub_bins=3)
+        self.assertEqual(len(transport.calls), 3)
+        self.assert_merged(query, result, 3)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            MyStats(self.query, shards=0)
+        with self.assertRaises(ValueError):
+            MyStats(self.query, sub_bins=0)
+
+
+class TestMyStatsLayout(unittest.TestCase):
+    """Test cases for the wide layout and the array of statistics."""
+
+    def run_query(self, layout, **kwargs):
+        mystats = MyStats(TestMyStatsShards.query, url="http://localhost/myquery/mystats",
+                          transport=FakeMyStatsSignalTransport(), layout=layout, **kwargs)
+        mystats.run()
+        return mystats
+
+    def test_wide(self):
+        """Test that the wide layout holds the same statistics as the long layout in one block."""
+        long = self.run_query("long")
+        wide = self.run_query("wide")
+        self.assertEqual(wide.data.index.name, "timestamp")
+        self.assertEqual(list(wide.data.columns.names), ["channel", "stat"])
+        exp = long.data.loc[(pd.Timestamp("2019-08-12 04:00:00"), "mean"), "channel2"]
+        self.assertEqual(wide.data["channel2", "mean"].iloc[1], exp)
+        pd.testing.assert_frame_equal(wide.data, MyStats._wide_frame(long.data))
+        pd.testing.assert_frame_equal(MyStats._wide_frame(self.run_query("long", shards=3, sub_bins=2).data),
+                                      self.run_query("wide", shards=3, sub_bins=2).data)
+
+    def test_wide_unaligned_bins(self):
+        """Test that channels with different bins are aligned on the union of the bin starts."""
+        records = {"channel1": [{'begin': '2019-08-12 00:00:00', 'mean': 1.0},
+                                {'begin': '2019-08-12 01:00:00', 'mean': 2.0}],
+                   "channel2": [{'begin': '2019-08-12 01:00:00', 'mean': 3.0, 'max': 4.0}]}
+        data = MyStats._wide_records(records)
+        np.testing.assert_array_equal(data.to_numpy(), [[np.nan, 1.0, np.nan, np.nan], [np.nan, 2.0, 4.0, 3.0]])
+        self.assertEqual(list(data.columns), [("channel1", "max"), ("channel1", "mean"), ("channel2", "max"),
+                                              ("channel2", "mean")])
+
+    def test_to_array(self):
+        """Test the shape of the array and that it is a view of wide data."""
+        for layout in ("long", "wide"):
+            with self.subTest(layout=layout):
+                mystats = self.run_query(layout)
+                array = mystats.to_array()
+                self.assertEqual(array.values.shape, (6, 2, 9))
+                self.assertEqual(array.channels, ["channel1", "channel2"])
+                self.assertEqual(array.stats[4], "mean")
+                mean = array.stat("mean")
+                self.assertEqual(list(mean.columns), ["channel1", "channel2"])
+                self.assertEqual(mean.iloc[2, 1], array.values[2, 1, 4])
+                self.assertEqual(mean.iloc[2, 1], self.run_query("long").data.xs("mean", level="stat").iloc[2, 1])
+        self.assertTrue(np.shares_memory(array.values, mystats.data.to_numpy()))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            MyStats(TestMyStatsShards.query, layout="tall")
+        with self.assertRaises(ValueError):
+            MyStats(TestMyStatsShards.query).to_array()
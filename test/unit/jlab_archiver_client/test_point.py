@@ -0,0 +1,79 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from jlab_archiver_client.cache import ResultCache
+from jlab_archiver_client.point import Point
+from .test_interval import FakeIntervalTransport
+
+
+class TestPointBatch(unittest.TestCase):
+    """Test cases for Point.run_batch."""
+
+    events = [
+        {'d': '2019-08-12 00:00:00', 'v': 1.0},
+        {'d': '2019-08-12 00:10:00', 'v': 2.0},
+        {'d': '2019-08-12 00:30:00', 'x': True, 't': 'NETWORK_DISCONNECTION'},
+        {'d': '2019-08-12 01:00:00', 'v': 3.0},
+        {'d': '2019-08-12 01:00:01', 'v': 4.0},
+    ]
+
+    times = [datetime(2019, 8, 12, 0, 20), datetime(2019, 8, 11, 23), datetime(2019, 8, 12, 0, 40),
+             datetime(2019, 8, 12, 1, 0, 0, 500000), datetime(2019, 8, 12, 0, 20), datetime(2019, 8, 12, 2)]
+
+    exp = pd.DataFrame({'channel1': [np.nan, 2.0, np.nan, 3.0, 4.0], 'channel2': [np.nan, 2.0, np.nan, 3.0, 4.0]},
+                       index=pd.to_datetime(["2019-08-11 23:00:00", "2019-08-12 00:20:00", "2019-08-12 00:40:00",
+                                             "2019-08-12 01:00:00.5", "2019-08-12 02:00:00"]))
+
+    def test_point_queries(self):
+        """Test that each distinct (channel, time) pair is looked up once."""
+        transport = FakeIntervalTransport(self.events)
+        df = Point.run_batch(["channel1", "channel2", "channel1"], self.times, transport=transport)
+        pd.testing.assert_frame_equal(self.exp, df)
+        self.assertEqual(len(transport.calls), 10)
+        self.assertTrue(all('t' in params for params in transport.calls))
+
+    def test_dense_grid(self):
+        """Test that dense grids are answered from one interval query per channel."""
+        transport = FakeIntervalTransport(self.events)
+        df = Point.run_batch(["channel1", "channel2"], self.times, transport=transport, dense_threshold=5)
+        pd.testing.assert_frame_equal(self.exp, df)
+        self.assertEqual(len(transport.calls), 2)
+        self.assertEqual([(p['b'], p['e'], p['p']) for p in transport.calls],
+                         [('2019-08-11T23:00:00', '2019-08-12T02:00:00', 'on')] * 2)
+
+    def test_forward_search_not_dense(self):
+        """Test that options an interval query cannot answer fall back to point queries."""
+        transport = FakeIntervalTransport(self.events)
+        Point.run_batch(["channel1"], self.times, transport=transport, dense_threshold=1, exclude_given_time=True)
+        self.assertEqual(len(transport.calls), 5)
+
+    def test_dense_options(self):
+        """Test that the dense path passes supported options to its interval queries."""
+        transport = FakeIntervalTransport(self.events)
+        df = Point.run_batch(["channel1"], self.times, transport=transport, dense_threshold=5, deployment="docker",
+                             frac_time_digits=0, forward_time_search=False)
+        pd.testing.assert_series_equal(self.exp['channel1'], df['channel1'])
+        self.assertEqual(len(transport.calls), 1)
+        self.assertEqual((transport.calls[0]['m'], transport.calls[0]['f']), ('docker', 6))
+
+    def test_dense_cache(self):
+        """Test that a shared ResultCache answers repeated dense batches."""
+        transport = FakeIntervalTransport(self.events)
+        cache = ResultCache()
+        Point.run_batch(["channel1"], self.times, transport=transport, cache=cache, dense_threshold=5)
+        df = Point.run_batch(["channel1"], self.times, transport=transport, cache=cache, dense_threshold=5)
+        self.assertEqual(len(transport.calls), 1)
+        self.assertEqual(cache.hits, 1)
+        pd.testing.assert_series_equal(self.exp['channel1'], df['channel1'])
+
+    def test_cache(self):
+        """Test that a shared ResultCache answers repeated batches."""
+        transport = FakeIntervalTransport(self.events)
+        cache = ResultCache()
+        Point.run_batch(["channel1"], self.times, transport=transport, cache=cache)
+        df = Point.run_batch(["channel1"], self.times, transport=transport, cache=cache)
+        self.assertEqual(len(transport.calls), 5)
+        pd.testing.assert_series_equal(self.exp['channel1'], df['channel1'])
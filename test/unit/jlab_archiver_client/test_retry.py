@@ -0,0 +1,147 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from jlab_archiver_client.exceptions import MyqueryHTTPError
+from jlab_archiver_client.retry import RetryPolicy
+from jlab_archiver_client.transport import DeadlineExceeded, Transport, _retry_after
+
+
+def _response(status, headers=None):
+    r = MagicMock(status_code=status, text="details", headers={} if headers is None else headers)
+    r.content = b"{}"
+    return r
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Test cases for the RetryPolicy class."""
+
+    def test_wait_time(self):
+        """Test that waits grow exponentially up to max_backoff and that jitter stays within the backoff."""
+        policy = RetryPolicy(backoff=0.5, max_backoff=3.0, jitter=False)
+        self.assertEqual([policy.wait_time(n) for n in range(5)], [0.5, 1.0, 2.0, 3.0, 3.0])
+        self.assertEqual(policy.wait_time(0, retry_after=2.0), 2.0)
+        self.assertEqual(policy.wait_time(0, retry_after=60.0), 3.0)
+
+        policy = RetryPolicy(backoff=0.5, max_backoff=3.0)
+        waits = [policy.wait_time(2) for _ in range(100)]
+        self.assertTrue(all(0 <= w <= policy.backoff * 4 for w in waits))
+        self.assertGreater(len(set(waits)), 1)
+
+    def test_is_retryable(self):
+        """Test that only transient failures of idempotent methods are retryable."""
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable("GET", requests.ConnectionError("reset")))
+        self.assertTrue(policy.is_retryable("get", requests.ReadTimeout("slow")))
+        self.assertTrue(policy.is_retryable("GET", requests.HTTPError("busy", response=_response(503))))
+        self.assertFalse(policy.is_retryable("GET", requests.HTTPError("missing", response=_response(404))))
+        self.assertFalse(policy.is_retryable("POST", requests.ConnectionError("reset")))
+
+    def test_budget(self):
+        """Test that retries stop when half the budget is used and resume as requests succeed."""
+        policy = RetryPolicy(budget_tokens=4, budget_ratio=0.5)
+        self.assertTrue(policy.record_failure())
+        self.assertFalse(policy.record_failure())
+        self.assertEqual(policy.budget, 2)
+        policy.record_success()
+        self.assertEqual(policy.budget, 2.5)
+        for _ in range(10):
+            policy.record_success()
+        self.assertEqual(policy.budget, 4)
+
+    def test_invalid(self):
+        """Test that a negative max_retries is rejected."""
+        with self.assertRaises(ValueError):
+            RetryPolicy(max_retries=-1)
+
+    def test_retry_after(self):
+        """Test parsing Retry-After headers in seconds and as HTTP dates."""
+        self.assertIsNone(_retry_after(None))
+        self.assertEqual(_retry_after("5"), 5.0)
+        self.assertAlmostEqual(_retry_after(format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30),
+                                                            usegmt=True)), 30, delta=2)
+        self.assertEqual(_retry_after(format_datetime(datetime(2000, 1, 1, tzinfo=timezone.utc), usegmt=True)), 0.0)
+        self.assertIsNone(_retry_after("soon"))
+
+
+@patch("jlab_archiver_client.transport.time.sleep")
+class TestTransportRetry(unittest.TestCase):
+    """Test cases for retrying requests in the Transport class."""
+
+    def _transport(self, responses, **kwargs):
+        t = Transport(retry=RetryPolicy(**kwargs))
+        t._session = MagicMock()
+        t._session.get.side_effect = responses
+        return t
+
+    def test_retry_then_succeed(self, sleep):
+        """Test that transient failures are retried with backoff and counted."""
+        t = self._transport([_response(503), requests.ConnectionError("reset"), _response(200)], jitter=False)
+        r = t.get("http://localhost/myquery/point")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(t._session.get.call_count, 3)
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [0.5, 1.0])
+        stats = t.stats()
+        self.assertEqual((stats['requests'], stats['retries'], stats['retry_wait']), (1, 2, 1.5))
+
+    def test_retry_after_header(self, sleep):
+        """Test that the server's Retry-After is respected."""
+        t = self._transport([_response(503, {'Retry-After': "4"}), _response(200)], jitter=False)
+        t.get("http://localhost/myquery/point")
+        sleep.assert_called_once_with(4.0)
+
+    def test_not_retryable(self, sleep):
+        """Test that non-transient failures are raised immediately."""
+        t = self._transport([_response(404)])
+        with self.assertRaises(requests.HTTPError) as context:
+            t.get("http://localhost/myquery/point")
+        self.assertIn("status=404", str(context.exception))
+        self.assertIsInstance(context.exception, MyqueryHTTPError)
+        self.assertEqual(context.exception.status, 404)
+        self.assertEqual(t._session.get.call_count, 1)
+        sleep.assert_not_called()
+
+    def test_max_retries(self, sleep):
+        """Test that the last failure is raised once the retries are used up."""
+        t = self._transport([_response(502)] * 3, max_retries=2)
+        with self.assertRaises(requests.HTTPError):
+            t.get("http://localhost/myquery/point")
+        self.assertEqual(t._session.get.call_count, 3)
+        self.assertEqual(t.stats()['retries'], 2)
+
+        t = self._transport([_response(502)], max_retries=0)
+        with self.assertRaises(requests.HTTPError):
+            t.get("http://localhost/myquery/point")
+        self.assertEqual(t._session.get.call_count, 1)
+
+    def test_budget_exhausted(self, sleep):
+        """Test that retries stop when the retry budget is exhausted."""
+        t = self._transport([_response(503)] * 3, budget_tokens=4)
+        with self.assertRaises(requests.HTTPError):
+            t.get("http://localhost/myquery/point")
+        self.assertEqual(t._session.get.call_count, 2)
+        self.assertEqual((t.stats()['retries'], t.stats()['budget_exhausted']), (1, 1))
+
+    def test_deadline(self, sleep):
+        """Test that attempt timeouts are limited to the deadline and that waits past it are not made."""
+        t = self._transport([_response(200)], deadline=10)
+        t.get("http://localhost/myquery/point")
+        self.assertLessEqual(t._session.get.call_args.kwargs['timeout'], 10)
+
+        t = self._transport([_response(503)] * 2, deadline=10, backoff=20, jitter=False)
+        with self.assertRaises(requests.HTTPError):
+            t.get("http://localhost/myquery/point")
+        self.assertEqual(t._session.get.call_count, 1)
+        self.assertEqual(t.stats()['deadlines_exceeded'], 1)
+
+    def test_deadline_passed(self, sleep):
+        """Test that no attempt is made once the deadline has passed."""
+        t = self._transport([requests.ConnectTimeout("slow")] * 2, deadline=1, jitter=False)
+        with patch("jlab_archiver_client.transport.time.monotonic", side_effect=[0, 0, 0, 5]):
+            with self.assertRaises(DeadlineExceeded):
+                t.get("http://localhost/myquery/point")
+        self.assertEqual(t._session.get.call_count, 1)
+        self.assertEqual(t.stats()['deadlines_exceeded'], 1)
@@ -1,15 +1,19 @@
+import os
+import tempfile
 import unittest
 import json
 from unittest.mock import patch, MagicMock, mock_open
 from datetime import datetime
 from io import StringIO
 
+import numpy as np
 import pandas as pd
 
 # noinspection PyProtectedMember
 from jlab_archiver_client.scripts import (
     _parse_datetime,
     _configure_server,
+    _write_arrow,
     interval_main,
     mysampler_main,
     mystats_main,
@@ -17,6 +21,7 @@ from jlab_archiver_client.scripts import (
     channel_main
 )
 from jlab_archiver_client.config import config
+from jlab_archiver_client import scripts
 
 
 class TestParseDatetime(unittest.TestCase):
@@ -242,7 +247,7 @@ class TestIntervalMain(unittest.TestCase):
 
         # Verify error message
         error_output = mock_stderr.getvalue()
-        self.assertIn("Output file must be .csv or .json", error_output)
+        self.assertIn("Output file must be .csv, .json, .parquet, .arrow or .feather", error_output)
         mock_exit.assert_called_once_with(1)
 
     @patch('jlab_archiver_client.scripts.Interval')
@@ -292,6 +297,31 @@ class TestIntervalMain(unittest.TestCase):
         self.assertTrue(query.integrate)
 
 
+    @patch('jlab_archiver_client.scripts.Interval')
+    @patch('sys.argv')
+    def test_interval_main_with_shards(self, mock_argv, mock_interval_class):
+        """Test interval_main passes sharding options to Interval."""
+        mock_argv.__getitem__ = lambda s, i: [
+            'jac-interval',
+            '-c', 'channel100',
+            '-b', '2023-05-09 00:00:00',
+            '-e', '2023-05-10 00:00:00',
+            '--shards', '8',
+            '--max-workers', '4'
+        ][i]
+
+        mock_interval = MagicMock()
+        mock_interval.data.to_dict.return_value = {}
+        mock_interval.disconnects = None
+        mock_interval.metadata = {}
+        mock_interval_class.return_value = mock_interval
+
+        with patch('sys.stdout', new_callable=StringIO):
+            interval_main()
+
+        self.assertEqual(mock_interval_class.call_args[1], {'shards': 8, 'max_workers': 4, 'cache': None})
+
+
 class TestMySamplerMain(unittest.TestCase):
     """Test cases for mysampler_main function."""
 
@@ -814,5 +844,143 @@ class TestErrorHandling(unittest.TestCase):
         mock_exit.assert_called_once_with(1)
 
 
+@unittest.skipIf(scripts.pa is None, "pyarrow is not installed")
+class TestArrowOutput(unittest.TestCase):
+    """Test cases for Parquet and Arrow IPC output."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = pd.DatetimeIndex(pd.to_datetime(['2023-05-09 00:00:00', '2023-05-09 00:00:01',
+                                                      '2023-05-09 00:00:02', '2023-05-09 00:00:03']), name='Date')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    @staticmethod
+    def _file_metadata(schema, key):
+        return json.loads(schema.metadata[f"jlab_archiver_client.{key}".encode()])
+
+    @patch('jlab_archiver_client.scripts.Interval')
+    @patch('sys.argv')
+    def test_interval_main_parquet(self, mock_argv, mock_interval_class):
+        """Test interval_main writes Parquet with the requested codec, row groups and file-level metadata."""
+        path = self._path('output.parquet')
+        mock_argv.__getitem__ = lambda s, i: [
+            'jac-interval',
+            '-c', 'channel100',
+            '-b', '2023-05-09 00:00:00',
+            '-e', '2023-05-09 01:00:00',
+            '-o', path,
+            '--compression', 'zstd',
+            '--row-group-size', '3'
+        ][i]
+
+        mock_interval = MagicMock()
+        mock_interval.data = pd.Series([1.0, 2.0, np.nan, 4.0], index=self.index, name='channel100')
+        mock_interval.disconnects = pd.Series(['NETWORK_DISCONNECTION'], index=self.index[2:3], name='channel100')
+        mock_interval.metadata = {'name': 'channel100', 'returnCount': 4}
+        mock_interval_class.return_value = mock_interval
+
+        with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            interval_main()
+        self.assertIn(f"Successfully saved results to {path}", mock_stdout.getvalue())
+
+        parquet_file = scripts.parquet.ParquetFile(path)
+        self.assertEqual(parquet_file.num_row_groups, 2)
+        self.assertEqual(parquet_file.metadata.row_group(0).column(0).compression, 'ZSTD')
+        self.assertEqual(self._file_metadata(parquet_file.schema_arrow, 'metadata'),
+                         {'name': 'channel100', 'returnCount': 4})
+        self.assertEqual(self._file_metadata(parquet_file.schema_arrow, 'disconnects'),
+                         {'__type__': 'series', '2023-05-09 00:00:02': 'NETWORK_DISCONNECTION'})
+
+        pd.testing.assert_frame_equal(pd.read_parquet(path), mock_interval.data.to_frame())
+
+    @patch('jlab_archiver_client.scripts.MySampler')
+    @patch('sys.argv')
+    def test_mysampler_main_feather(self, mock_argv, mock_mysampler_class):
+        """Test mysampler_main writes an Arrow IPC file with record batches of the requested size."""
+        path = self._path('output.feather')
+        mock_argv.__getitem__ = lambda s, i: [
+            'jac-mysampler',
+            '-c', 'channel1', 'channel2',
+            '-b', '2023-05-09 00:00:00',
+            '-i', '1000',
+            '-n', '4',
+            '-o', path,
+            '--row-group-size', '2'
+        ][i]
+
+        mock_mysampler = MagicMock()
+        mock_mysampler.data = pd.DataFrame({'channel1': [1.0, 2.0, 3.0, 4.0], 'channel2': ['a', None, 'b', 'c']},
+                                           index=self.index)
+        mock_mysampler.disconnects = {'channel2': pd.Series(['UNDEFINED'], index=self.index[1:2])}
+        mock_mysampler.metadata = {'channel1': {'datatype': 'DBR_DOUBLE'}, 'channel2': {'datatype': 'DBR_ENUM'}}
+        mock_mysampler_class.return_value = mock_mysampler
+
+        with patch('sys.stdout', new_callable=StringIO):
+            mysampler_main()
+
+        with scripts.pa.memory_map(path) as source:
+            reader = scripts.pa.ipc.open_file(source)
+            self.assertEqual(reader.num_record_batches, 2)
+            self.assertEqual(self._file_metadata(reader.schema, 'metadata'), mock_mysampler.metadata)
+            self.assertEqual(self._file_metadata(reader.schema, 'disconnects'),
+                             {'channel2': {'__type__': 'series', '2023-05-09 00:00:01': 'UNDEFINED'}})
+        pd.testing.assert_frame_equal(pd.read_feather(path), mock_mysampler.data)
+
+    @patch('jlab_archiver_client.scripts.MyStats')
+    @patch('sys.argv')
+    def test_mystats_main_arrow_wide(self, mock_argv, mock_mystats_class):
+        """Test mystats_main writes the wide layout with its (channel, stat) columns restored when read."""
+        path = self._path('output.arrow')
+        mock_argv.__getitem__ = lambda s, i: [
+            'jac-mystats',
+            '-c', 'channel1', 'channel2',
+            '-b', '2023-05-09 00:00:00',
+            '-e', '2023-05-09 23:59:59',
+            '-o', path,
+            '--layout', 'wide',
+            '--compression', 'uncompressed'
+        ][i]
+
+        columns = pd.MultiIndex.from_product([['channel1', 'channel2'], ['max', 'mean']], names=['channel', 'stat'])
+        mock_mystats = MagicMock()
+        mock_mystats.data = pd.DataFrame(np.arange(16, dtype=float).reshape(4, 4),
+                                         index=self.index.rename('timestamp'), columns=columns)
+        mock_mystats.metadata = {'channel1': {'datatype': 'DBR_DOUBLE'}}
+        mock_mystats_class.return_value = mock_mystats
+
+        with patch('sys.stdout', new_callable=StringIO):
+            mystats_main()
+
+        schema = scripts.pa.ipc.open_file(path).schema
+        self.assertIsNone(self._file_metadata(schema, 'disconnects'))
+        self.assertEqual(self._file_metadata(schema, 'metadata'), mock_mystats.metadata)
+        pd.testing.assert_frame_equal(pd.read_feather(path), mock_mystats.data)
+
+    def test_long_layout(self):
+        """Test that the (timestamp, stat) index of the long layout is kept."""
+        path = self._path('output.parquet')
+        data = pd.DataFrame({'channel1': [1.0, 2.0, 3.0, 4.0]},
+                            index=pd.MultiIndex.from_product([self.index[:2], ['max', 'mean']],
+                                                             names=['timestamp', 'stat']))
+        _write_arrow(path, data, None, {}, compression='gzip')
+        pd.testing.assert_frame_equal(pd.read_parquet(path), data)
+
+    def test_invalid_row_group_size(self):
+        """Test that a row group size below one is rejected."""
+        with self.assertRaises(ValueError):
+            _write_arrow(self._path('output.parquet'), pd.Series([1.0]), None, {}, row_group_size=0)
+
+    @patch('jlab_archiver_client.scripts.pa', None)
+    def test_pyarrow_missing(self):
+        """Test that writing without pyarrow raises an ImportError with an install hint."""
+        with self.assertRaisesRegex(ImportError, r"jlab_archiver_client\[arrow\]"):
+            _write_arrow(self._path('output.parquet'), pd.Series([1.0]), None, {})
+
+
 if __name__ == '__main__':
     unittest.main()
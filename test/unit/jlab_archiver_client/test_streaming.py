@@ -0,0 +1,154 @@
+import json
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from jlab_archiver_client.exceptions import MyqueryException
+from jlab_archiver_client.interval import Interval
+from jlab_archiver_client.query import IntervalQuery
+from jlab_archiver_client.streaming import GrowableArray, IntervalStreamParser
+
+
+def _parse(body: bytes, chunk_size: int, enums_as_strings: bool = False) -> IntervalStreamParser:
+    parser = IntervalStreamParser(enums_as_strings=enums_as_strings)
+    for i in range(0, len(body), chunk_size):
+        parser.feed(body[i:i + chunk_size])
+    parser.close()
+    return parser
+
+
+def _response(datatype, datasize, data):
+    return {'datatype': datatype, 'datasize': datasize, 'datahost': 'mya', 'ioc': None, 'active': True,
+            'sampled': False, 'data': data, 'returnCount': len(data)}
+
+
+class TestGrowableArray(unittest.TestCase):
+    """Test cases for the GrowableArray class."""
+
+    def test_grow_numeric(self):
+        """Test that values are kept as the buffer grows."""
+        a = GrowableArray(np.float64, capacity=2)
+        for i in range(10):
+            a.extend([float(i), float(i)])
+        self.assertEqual(len(a), 20)
+        np.testing.assert_array_equal(a.to_array(), np.repeat(np.arange(10.0), 2))
+
+    def test_grow_object(self):
+        """Test that list values are stored as single elements and survive growth."""
+        a = GrowableArray(object, capacity=1)
+        a.extend([["1", "2"], None, "a"])
+        a.extend([["3"]])
+        self.assertEqual(a.to_array().tolist(), [["1", "2"], None, "a", ["3"]])
+
+
+class TestIntervalStreamParser(unittest.TestCase):
+    """Test cases for the IntervalStreamParser class."""
+
+    def assert_matches_process_response(self, content, enums_as_strings=False):
+        """Check that the streamed results match those of decoding the whole response at once."""
+        query = IntervalQuery("channel1", datetime(2019, 8, 12), datetime(2019, 8, 13),
+                              enums_as_strings=enums_as_strings)
+        exp = Interval(query)
+        exp._process_response(content)
+
+        body = json.dumps(content, indent=1).encode()
+        for chunk_size in (1, 7, 100, len(body)):
+            with self.subTest(chunk_size=chunk_size):
+                parser = _parse(body, chunk_size, enums_as_strings)
+                result = Interval(query)
+                result._set_results(parser.values.to_array(), parser.ts.to_array(), parser.disconnect_values,
+                                    parser.disconnect_ts, parser.metadata)
+                pd.testing.assert_series_equal(exp.data, result.data)
+                pd.testing.assert_series_equal(exp.disconnects, result.disconnects)
+                self.assertEqual(exp.metadata, result.metadata)
+
+    def test_scalar_double(self):
+        """Test a scalar channel with disconnects."""
+        data = [{'d': '2019-08-12 00:00:00', 'v': 1.5},
+                {'d': '2019-08-12 00:00:05', 'x': True, 't': 'NETWORK_DISCONNECTION'},
+                {'d': '2019-08-12 00:00:10', 'v': 2.5}]
+        self.assert_matches_process_response(_response('DBR_DOUBLE', 1, data))
+
+    def test_scalar_int(self):
+        """Test that integer channels without disconnects are int64, as pandas would infer."""
+        data = [{'d': '2019-08-12 00:00:00', 'v': 1}, {'d': '2019-08-12 00:00:10', 'v': 2}]
+        self.assert_matches_process_response(_response('DBR_LONG', 1, data))
+        parser = _parse(json.dumps(_response('DBR_LONG', 1, data)).encode(), 10)
+        self.assertEqual(parser.values.dtype, np.int64)
+
+    def test_enums_as_strings(self):
+        """Test that string enum values are kept as strings."""
+        data = [{'d': '2019-08-12 00:00:00', 'v': 'ON'}, {'d': '2019-08-12 00:00:10', 'v': 'OFF {x}'}]
+        self.assert_matches_process_response(_response('DBR_ENUM', 1, data), enums_as_strings=True)
+
+    def test_vector(self):
+        """Test that vector values are converted the same way."""
+        data = [{'d': '2019-08-12 00:00:00', 'v': ["1.0", "2.0"]},
+                {'d': '2019-08-12 00:00:05', 'x': True, 't': 'NETWORK_DISCONNECTION'},
+                {'d': '2019-08-12 00:00:10', 'v': ["3.0", "4.0"]}]
+        self.assert_matches_process_response(_response('DBR_DOUBLE', 2, data))
+
+    def test_empty(self):
+        """Test a response with no events."""
+        self.assert_matches_process_response(_response('DBR_DOUBLE', 1, []))
+
+    def test_utf8(self):
+        """Test that multibyte characters split between chunks are decoded in metadata and values."""
+        data = [{'d': '2019-08-12 00:00:00', 'v': 'ÉTAT {ü}'}, {'d': '2019-08-12 00:00:10', 'v': '温度'}]
+        content = dict(_response('DBR_STRING', 1, data), datahost='mýa')
+        body = json.dumps(content, ensure_ascii=False).encode()
+        for chunk_size in (1, 2, 3, 5):
+            with self.subTest(chunk_size=chunk_size):
+                parser = _parse(body, chunk_size)
+                self.assertEqual(parser.values.to_array().tolist(), ['ÉTAT {ü}', '温度'])
+                self.assertEqual((parser.metadata['datahost'], parser.metadata['returnCount']), ('mýa', 2))
+
+    def test_epoch_timestamps(self):
+        """Test that integer timestamps are collected into an int64 buffer."""
+        data = [{'d': 1565582400000, 'v': 1.0}, {'d': 1565582410000, 'v': 2.0}]
+        parser = _parse(json.dumps(_response('DBR_DOUBLE', 1, data)).encode(), 5)
+        self.assertEqual(parser.ts.dtype, np.int64)
+        self.assertEqual(parser.ts.to_array().tolist(), [1565582400000, 1565582410000])
+
+    def test_drain(self):
+        """Test that drained events are removed from the buffers with disconnect positions relative to the batch."""
+        data = [{'d': '2019-08-12 00:00:00', 'v': 1},
+                {'d': '2019-08-12 00:00:05', 'v': 2},
+                {'d': '2019-08-12 00:00:10', 'x': True, 't': 'NETWORK_DISCONNECTION'}]
+        body = json.dumps(_response('DBR_LONG', 1, data)).encode()
+        cut = body.index(b'{"d": "2019-08-12 00:00:10"')
+        parser = IntervalStreamParser()
+        parser.feed(body[:cut])
+        ts, values, disconnect_index, _ = parser.drain()
+        self.assertEqual(values.tolist(), [1.0, 2.0])
+        self.assertEqual((len(ts), disconnect_index), (2, []))
+
+        parser.feed(body[cut:])
+        parser.close()
+        ts, values, disconnect_index, disconnect_values = parser.drain()
+        self.assertEqual(ts.tolist(), ['2019-08-12 00:00:10'])
+        self.assertTrue(np.isnan(values[0]))
+        self.assertEqual((disconnect_index, disconnect_values), ([0], ['NETWORK_DISCONNECTION']))
+        self.assertEqual(len(parser.ts), 0)
+
+    def test_drain_keeps_float(self):
+        """Test that integer values are not converted on close once events have been drained."""
+        data = [{'d': '2019-08-12 00:00:00', 'v': 1}, {'d': '2019-08-12 00:00:10', 'v': 2}]
+        parser = IntervalStreamParser()
+        parser.drain()
+        parser.feed(json.dumps(_response('DBR_LONG', 1, data)).encode())
+        parser.close()
+        self.assertEqual(parser.drain()[1].dtype, np.float64)
+
+    def test_truncated(self):
+        """Test that an incomplete response raises a MyqueryException."""
+        body = json.dumps(_response('DBR_DOUBLE', 1, [{'d': '2019-08-12 00:00:00', 'v': 1.5}])).encode()
+        with self.assertRaises(MyqueryException):
+            _parse(body[:-20], 8)
+
+    def test_not_json(self):
+        """Test that a non-JSON response raises a MyqueryException."""
+        with self.assertRaises(MyqueryException):
+            _parse(b"<html>Server Error</html>", 8)
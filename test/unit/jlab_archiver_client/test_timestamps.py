@@ -0,0 +1,40 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from jlab_archiver_client.timestamps import timestamp_format, timestamp_pattern, to_datetime_index
+
+
+class TestTimestamps(unittest.TestCase):
+    """Test cases for converting myquery timestamps."""
+
+    def test_format(self):
+        """Test the explicit format and pattern for each number of fractional digits."""
+        self.assertEqual(timestamp_format(0), "%Y-%m-%d %H:%M:%S")
+        self.assertEqual(timestamp_format(3), "%Y-%m-%d %H:%M:%S.%f")
+        self.assertTrue(timestamp_pattern(3).fullmatch("2019-08-12 00:00:01.250"))
+        self.assertFalse(timestamp_pattern(3).fullmatch("2019-08-12 00:00:01"))
+        self.assertTrue(timestamp_pattern().fullmatch("2019-08-12 00:00:01.25"))
+        with self.assertRaises(ValueError):
+            timestamp_format(-1)
+
+    def test_myquery_layout(self):
+        """Test that myquery timestamps match pandas' inferred parse for lists and arrays."""
+        for ts in (["2019-08-12 00:00:00", "2019-08-12 23:59:59"],
+                   ["2000-02-29 12:00:00.001", "2019-08-12 00:00:01.500"],
+                   np.array(["2019-08-12 00:00:00.123456"], dtype=object)):
+            with self.subTest(ts=ts[0]):
+                self.assertTrue(to_datetime_index(ts).equals(pd.DatetimeIndex(pd.to_datetime(ts))))
+
+    def test_fallback(self):
+        """Test that timestamps in other layouts are still parsed."""
+        self.assertEqual(to_datetime_index(["2019-08-12T00:00:01"])[0], pd.Timestamp("2019-08-12 00:00:01"))
+        self.assertEqual(to_datetime_index(["08/12/2019 10:00"])[0], pd.Timestamp("2019-08-12 10:00:00"))
+        with self.assertRaises(ValueError):
+            to_datetime_index(["2019-08-12 00:00:00", "not a time"])
+
+    def test_empty(self):
+        """Test that no timestamps give an empty index."""
+        self.assertEqual(len(to_datetime_index([])), 0)
+        self.assertIsInstance(to_datetime_index([]), pd.DatetimeIndex)
@@ -0,0 +1,178 @@
+import gzip
+import json
+import threading
+import unittest
+import zlib
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from jlab_archiver_client import Interval, IntervalQuery, Point, PointQuery
+from jlab_archiver_client.transport import Transport, default_transport
+
+_EVENTS = [{'d': f"2019-08-12 00:{i // 60:02d}:{i % 60:02d}", 'v': float(i % 7)} for i in range(2000)]
+_BODY = json.dumps({'datatype': 'DBR_DOUBLE', 'datasize': 1, 'data': _EVENTS, 'returnCount': len(_EVENTS)}).encode()
+
+
+class _CompressingHandler(BaseHTTPRequestHandler):
+    """Serves an interval response compressed with the first of gzip or deflate the client accepts."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802
+        accepted = self.headers.get("Accept-Encoding", "")
+        self.server.accept_encoding.append(accepted)
+        body, encoding = _BODY, None
+        if "gzip" in accepted:
+            body, encoding = gzip.compress(_BODY), "gzip"
+        elif "deflate" in accepted:
+            body, encoding = zlib.compress(_BODY), "deflate"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+
+class TestTransport(unittest.TestCase):
+    """Test cases for the Transport class."""
+
+    def test_session_is_reused(self):
+        """Test that the same pooled session is used across calls."""
+        t = Transport()
+        self.assertIs(t.session, t.session)
+        t.close()
+
+    def test_pool_settings(self):
+        """Test that the pool settings are applied to the mounted adapters."""
+        t = Transport(pool_connections=3, pool_maxsize=7, pool_block=True)
+        adapter = t.session.get_adapter("https://epicsweb.jlab.org")
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertTrue(adapter._pool_block)
+        self.assertIs(adapter, t.session.get_adapter("http://localhost:8080"))
+        t.close()
+
+    def test_keep_alive_disabled(self):
+        """Test that disabling keep-alive asks the server to close the connection."""
+        t = Transport(keep_alive=False)
+        self.assertEqual(t.session.headers["Connection"], "close")
+        t.close()
+
+    def test_set_replaces_session(self):
+        """Test that changing a setting closes the session so a new one is built."""
+        t = Transport()
+        first = t.session
+        t.set(pool_maxsize=20)
+        self.assertEqual(t.pool_maxsize, 20)
+        self.assertIsNot(first, t.session)
+        t.close()
+
+    def test_set_unknown_setting(self):
+        """Test that unknown settings are rejected."""
+        t = Transport()
+        with self.assertRaises(AttributeError):
+            t.set(not_a_setting=1)
+
+    def test_get_non_ok_raises(self):
+        """Test that a non-OK response raises a RequestException."""
+        t = Transport()
+        t._session = MagicMock()
+        t._session.get.return_value = MagicMock(status_code=500, text="oops")
+        with self.assertRaises(requests.RequestException) as context:
+            t.get("http://localhost/myquery/point", params={'c': 'channel1'})
+        self.assertIn("status=500", str(context.exception))
+
+    def test_context_manager_closes(self):
+        """Test that leaving the context closes the session."""
+        with Transport() as t:
+            session = t.session
+        with patch.object(session, "close") as mock_close:
+            t.close()
+        mock_close.assert_not_called()
+        self.assertIsNone(t._session)
+
+    def test_endpoint_uses_transport(self):
+        """Test that endpoint classes issue requests through their transport."""
+        t = MagicMock()
+        t.get.return_value.content = json.dumps({'datatype': 'DBR_DOUBLE',
+                                                'data': {'d': '2019-08-12 00:00:00', 'v': 1.0}}).encode()
+        point = Point(PointQuery(channel="channel1", time=datetime(2019, 8, 12)), url="http://localhost/myquery/point",
+                      transport=t)
+        point.run()
+        t.get.assert_called_once()
+        self.assertEqual(point.event['name'], "channel1")
+
+    def test_default_transport(self):
+        """Test that endpoint classes fall back to the shared default transport."""
+        point = Point(PointQuery(channel="channel1", time=datetime(2019, 8, 12)))
+        self.assertIs(point.transport, default_transport)
+
+
+class TestTransportCompression(unittest.TestCase):
+    """Test cases for compressed transfers and their byte counts."""
+
+    def setUp(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _CompressingHandler)
+        self.httpd.accept_encoding = []
+        threading.Thread(target=self.httpd.serve_forever, args=(0.01,), daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/myquery/interval"
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def test_compressed_get(self):
+        """Test that compressed responses are decoded and their wire and decoded sizes recorded."""
+        with Transport() as t:
+            r = t.get(self.url)
+            self.assertEqual(r.content, _BODY)
+            self.assertIn("gzip", self.httpd.accept_encoding[-1])
+            self.assertIn("deflate", self.httpd.accept_encoding[-1])
+            transfer = t.transfers()[-1]
+            self.assertEqual(transfer.encoding, "gzip")
+            self.assertEqual(transfer.wire_bytes, len(gzip.compress(_BODY)))
+            self.assertEqual(transfer.decoded_bytes, len(_BODY))
+            self.assertGreater(transfer.ratio, 5)
+            stats = t.stats()
+            self.assertEqual((stats['requests'], stats['wire_bytes'], stats['decoded_bytes']),
+                             (1, transfer.wire_bytes, len(_BODY)))
+
+    def test_compression_disabled(self):
+        """Test that only identity encoding is accepted when compression is disabled."""
+        with Transport(compression=False) as t:
+            t.get(self.url)
+            self.assertEqual(self.httpd.accept_encoding[-1], "identity")
+            transfer = t.transfers()[-1]
+            self.assertEqual(transfer.encoding, "identity")
+            self.assertEqual(transfer.wire_bytes, transfer.decoded_bytes)
+            self.assertEqual(transfer.ratio, 1.0)
+
+    def test_streamed_interval(self):
+        """Test that a streamed interval response is decompressed incrementally and recorded once read."""
+        with Transport() as t:
+            interval = Interval(IntervalQuery("channel1", datetime(2019, 8, 12), datetime(2019, 8, 13)),
+                                url=self.url, transport=t)
+            interval.run()
+            self.assertEqual(len(interval.data), len(_EVENTS))
+            self.assertEqual(interval.data.iloc[-1], _EVENTS[-1]['v'])
+            transfer = t.transfers()[-1]
+            self.assertEqual(transfer.decoded_bytes, len(_BODY))
+            self.assertLess(transfer.wire_bytes, transfer.decoded_bytes)
+
+    def test_history(self):
+        """Test that only the most recent transfers are kept, while the totals count every request."""
+        with Transport(history=2) as t:
+            for _ in range(3):
+                t.get(self.url)
+            self.assertEqual(len(t.transfers()), 2)
+            self.assertEqual(t.stats()['requests'], 3)
+            t.set(history=0)
+            t.get(self.url)
+            self.assertEqual(t.transfers(), [])
@@ -0,0 +1,112 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from jlab_archiver_client import utils
+
+
+class TestVectorConversion(unittest.TestCase):
+    """Test cases for the conversion of vector (waveform) channels."""
+
+    rows = [["1.5", "2.5", "3.5"], None, ["4", "5"], ["6", "7", "8"]]
+    ts = ["2019-08-12 00:00:00", "2019-08-12 00:00:01", "2019-08-12 00:00:02", "2019-08-12 00:00:03"]
+
+    def test_vectors_to_array(self):
+        """Test that ragged and missing rows are masked."""
+        values, mask = utils.vectors_to_array(self.rows, float)
+        np.testing.assert_array_equal(values, [[1.5, 2.5, 3.5], [np.nan] * 3, [4, 5, np.nan], [6, 7, 8]])
+        np.testing.assert_array_equal(mask, [[False] * 3, [True] * 3, [False, False, True], [False] * 3])
+        self.assertTrue(values.flags.c_contiguous)
+
+        values, mask = utils.vectors_to_array(["1,2", "3,4"], int)
+        self.assertEqual(values.dtype, np.int64)
+        np.testing.assert_array_equal(values, [[1, 2], [3, 4]])
+
+    def test_vectors_to_array_empty(self):
+        values, mask = utils.vectors_to_array([], float)
+        self.assertEqual(values.shape, (0, 0))
+        self.assertEqual(mask.shape, (0, 0))
+
+    def test_convert_data_to_series(self):
+        """Test that rows are views into one block and that non-update events are None."""
+        metadata = {'datatype': 'DBR_DOUBLE', 'datasize': 3, 'returnCount': 4}
+        data = utils.convert_data_to_series(self.rows, self.ts, "channel3", metadata, False)
+        self.assertEqual(data.dtype, object)
+        self.assertIsNone(data.iloc[1])
+        np.testing.assert_array_equal(data.iloc[2], [4.0, 5.0])
+        self.assertIs(data.iloc[0].base, data.iloc[3].base)
+        self.assertEqual(data.index[3], pd.Timestamp("2019-08-12 00:00:03"))
+
+    def test_convert_vector_data(self):
+        """Test the compact representation and that strings and scalars are not converted."""
+        metadata = {'datatype': 'DBR_LONG', 'datasize': 3, 'returnCount': 4}
+        vectors = utils.convert_vector_data([["1", "2", "3"], None], self.ts[:2], metadata, False)
+        self.assertEqual(vectors.values.dtype, np.int64)
+        self.assertEqual(list(vectors.index), list(pd.to_datetime(self.ts[:2])))
+
+        self.assertIsNone(utils.convert_vector_data(self.rows, self.ts, dict(metadata, datatype="DBR_STRING"), False))
+        self.assertIsNone(utils.convert_vector_data(self.rows, self.ts, dict(metadata, datatype="DBR_ENUM"), True))
+        self.assertIsNone(utils.convert_vector_data([1.0], self.ts[:1], dict(metadata, datasize=1), False))
+
+    def test_concat_vector_arrays(self):
+        """Test that narrower blocks are padded with masked entries."""
+        a = utils.convert_vector_data(self.rows[:2], self.ts[:2], {'datatype': 'DBR_DOUBLE', 'datasize': 3}, False)
+        b = utils.convert_vector_data([["9"]], self.ts[2:3], {'datatype': 'DBR_DOUBLE', 'datasize': 3}, False)
+        c = utils.concat_vector_arrays([b, a])
+        self.assertEqual(c.values.shape, (3, 3))
+        np.testing.assert_array_equal(c.mask[0], [False, True, True])
+        self.assertEqual(c.index[0], pd.Timestamp(self.ts[2]))
+
+    def test_convert_data_to_dataframe(self):
+        """Test that vector columns of a mysampler response are converted to arrays."""
+        samples = {"Date": self.ts[:2], "channel3": [["1", "2"], None], "channel4": ["a", "b"]}
+        metadata = {"channel3": {'metadata': {'datatype': 'DBR_SHORT', 'datasize': 2}},
+                    "channel4": {'metadata': {'datatype': 'DBR_STRING', 'datasize': 2}}}
+        df = utils.convert_data_to_dataframe(samples, metadata, False)
+        np.testing.assert_array_equal(df.channel3.iloc[0], [1, 2])
+        self.assertIsNone(df.channel3.iloc[1])
+        self.assertEqual(list(df.channel4), ["a", "b"])
+
+
+class TestToDatetimeIndex(unittest.TestCase):
+    """Test cases for converting myquery timestamps to a DatetimeIndex."""
+    exp = pd.DatetimeIndex(["2019-08-12 04:00:00", "2019-08-12 04:00:01.5"])
+
+    def test_epoch_ms(self):
+        """Test that epoch millisecond arrays and lists are converted as UTC without parsing."""
+        ms = [1565582400000, 1565582401500]
+        self.assertTrue(utils.to_datetime_index(np.array(ms, dtype=np.int64)).equals(self.exp))
+        self.assertTrue(utils.to_datetime_index(ms).equals(self.exp))
+
+    def test_strings(self):
+        """Test that timestamp strings are parsed as given."""
+        self.assertTrue(utils.to_datetime_index(["2019-08-12 04:00:00", "2019-08-12 04:00:01.5"]).equals(self.exp))
+        self.assertEqual(len(utils.to_datetime_index([])), 0)
+
+    def test_series(self):
+        """Test that interval data with epoch timestamps gets a datetime index."""
+        metadata = {'datatype': 'DBR_DOUBLE', 'datasize': 1, 'returnCount': 2}
+        data = utils.convert_data_to_series([1.0, 2.0], [1565582400000, 1565582401500], "channel1", metadata, False)
+        self.assertTrue(data.index.equals(self.exp))
+
+
+class TestBatchPvlist(unittest.TestCase):
+    """Test cases for splitting pvlists into batches."""
+
+    pvlist = ["a", "bb", "ccc", "dddd", "e"]
+
+    def test_batch_size(self):
+        self.assertEqual(utils.batch_pvlist(self.pvlist, batch_size=2), [["a", "bb"], ["ccc", "dddd"], ["e"]])
+        self.assertEqual(utils.batch_pvlist(self.pvlist), [self.pvlist])
+        self.assertEqual(utils.batch_pvlist([], batch_size=2), [[]])
+        with self.assertRaises(ValueError):
+            utils.batch_pvlist(self.pvlist, batch_size=0)
+
+    def test_max_length(self):
+        """Test that the encoded, comma separated batches fit the length and that long PVs get their own batch."""
+        # "a%2Cbb" is 6 characters, "ccc" is 3, "dddd%2Ce" is 8
+        self.assertEqual(utils.batch_pvlist(self.pvlist, max_length=8), [["a", "bb"], ["ccc"], ["dddd", "e"]])
+        self.assertEqual(utils.batch_pvlist(["a", "x:y", "b"], max_length=5), [["a"], ["x:y"], ["b"]])
+        self.assertEqual(utils.batch_pvlist(["long_name", "a"], max_length=2), [["long_name"], ["a"]])
+        self.assertEqual(utils.batch_pvlist(self.pvlist, batch_size=1, max_length=100), [[pv] for pv in self.pvlist])